@@ -1,4 +1,17 @@
-from ._misc import ForecastNotAvailableError, set_grib_defs, set_test_mode
+from ._batch import FetchRequest, fetch_many
+from ._cache import cache_info, clear_cache, disable_cache, set_cache
+from ._misc import (
+    ForecastNotAvailableError,
+    set_bandwidth_limit,
+    set_base_url,
+    set_grib_defs,
+    set_grib_engine,
+    set_test_mode,
+)
+from ._points import PointExtractor, extract_points
+from ._pool import DecodePool, disable_decode_pool, set_decode_pool
+from ._retry import RetryPolicy, set_retry_policy
+from ._sync import SyncResult
 from .ecmwf.aifs import Aifs
 from .ecmwf.ifs import Ifs
 from .meteofrance.arome import (
@@ -17,7 +30,20 @@ from .meteofrance.mfwam import MFWAM0025, MFWAM01
 __all__ = [
     "ForecastNotAvailableError",
     "set_grib_defs",
+    "set_grib_engine",
     "set_test_mode",
+    "set_cache",
+    "disable_cache",
+    "cache_info",
+    "clear_cache",
+    "set_bandwidth_limit",
+    "FetchRequest",
+    "fetch_many",
+    "DecodePool",
+    "set_decode_pool",
+    "disable_decode_pool",
+    "PointExtractor",
+    "extract_points",
     "Aifs",
     "Ifs",
     "Arome001",
@@ -32,4 +58,8 @@ __all__ = [
     "Arpege025",
     "MFWAM0025",
     "MFWAM01",
+    "RetryPolicy",
+    "set_retry_policy",
+    "SyncResult",
+    "set_base_url",
 ]
@@ -0,0 +1,243 @@
+"""
+Asynchronous download engine, based on ``httpx`` (optional dependency: ``pip install meteofetch[async]``).
+
+All files of a call go through a single ``httpx.AsyncClient``, whose connection pool is
+shared by every request, with a bounded number of concurrent requests per host. The same
+client can be shared by several ``aget_forecast`` calls running on one event loop: the
+bound then applies to all of them. Files are opened and written in the default executor,
+so that the event loop is never blocked on the disk.
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from ._cache import get_cache
+from ._misc import get_rate_limiter
+from ._resume import finalize, part_path, resume_headers, resume_offset, resume_plan
+from ._retry import CircuitOpenError, get_retry_policy
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def import_httpx():
+    """Import ``httpx``, with an explicit message if the optional dependency is missing."""
+    try:
+        import httpx
+    except ImportError as e:
+        raise ImportError(
+            "The async backend requires httpx: pip install httpx (or pip install meteofetch[async])"
+        ) from e
+    return httpx
+
+
+def make_client(max_connections: int = 16, timeout: float = 10) -> "httpx.AsyncClient":
+    """Create an ``httpx.AsyncClient`` with a bounded, keep-alive connection pool."""
+    httpx = import_httpx()
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=True)
+
+
+class HostLimiter:
+    """Per-host semaphores bounding the number of concurrent requests to each server."""
+
+    def __init__(self, max_per_host: int):
+        self.max_per_host = max_per_host
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    def __call__(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._semaphores[host]
+
+
+# Limites par hôte de chaque client, partagées par tous les appels qui l'utilisent
+_host_limiters: "weakref.WeakKeyDictionary[httpx.AsyncClient, HostLimiter]" = weakref.WeakKeyDictionary()
+
+
+def host_limiter(client: "httpx.AsyncClient", max_per_host: int) -> HostLimiter:
+    """The ``HostLimiter`` of *client*, created with *max_per_host* on first use."""
+    limiter = _host_limiters.get(client)
+    if limiter is None:
+        limiter = _host_limiters[client] = HostLimiter(max_per_host)
+    return limiter
+
+
+@asynccontextmanager
+async def _open(path: Path, mode: str):
+    """``open`` (and ``close``) run in the default executor."""
+    loop = asyncio.get_running_loop()
+    f = await loop.run_in_executor(None, open, path, mode)
+    try:
+        yield f
+    finally:
+        await loop.run_in_executor(None, f.close)
+
+
+async def _write_body(r: "httpx.Response", f) -> None:
+    """Write the body of a streamed response to *f*, within the bandwidth limit if one is set."""
+    loop = asyncio.get_running_loop()
+    limiter = get_rate_limiter()
+    async for chunk in r.aiter_bytes(CHUNK_SIZE):
+        await loop.run_in_executor(None, f.write, chunk)
+        if limiter is not None:
+            await asyncio.sleep(limiter.reserve(len(chunk)))
+
+
+async def _adownload_ranges(
+    client: "httpx.AsyncClient", url: str, ranges: List[Tuple[int, int]], part: Path, timeout
+) -> bool:
+    """Asynchronous counterpart of ``_model._download_ranges``."""
+    async with _open(part, "wb") as f:
+        for a, b in ranges:
+            async with client.stream("GET", url, headers={"Range": f"bytes={a}-{b}"}, timeout=timeout) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    return False
+                await _write_body(r, f)
+    return True
+
+
+async def aurl_to_file(
+    cls, client: "httpx.AsyncClient", url: str, path: str, num_retries: int = 1, variables: Optional[list] = None
+) -> Union[Path, bool]:
+    """Asynchronous counterpart of ``Model._url_to_file``."""
+    httpx = import_httpx()
+    loop = asyncio.get_running_loop()
+    if url.startswith("file:"):
+        # Miroir local (voir set_base_url) : httpx ne lit pas les URL file://
+        return await loop.run_in_executor(None, cls._url_to_file, url, path, num_retries, variables)
+    temp_path = Path(path) / os.path.basename(url).replace(":", "-")
+    policy = get_retry_policy()
+    connect, read = policy.timeout(cls.TIMEOUT)
+    timeout = httpx.Timeout(read, connect=connect)
+    for attempt in range(num_retries + 1):
+        try:
+            await asyncio.sleep(policy.wait_time(url))
+            ranges = await loop.run_in_executor(None, cls._get_ranges, url, variables) if variables else None
+            # Fichier partiel distinct par plages : son contenu n'est pas un début du fichier distant
+            if ranges is not None:
+                ranges_part = part_path(temp_path, ranges=True)
+                if await _adownload_ranges(client, url, ranges, ranges_part, timeout):
+                    part, size = ranges_part, sum(b - a + 1 for a, b in ranges)
+                else:
+                    logger.warning("Range requests ignored by the server for %s, downloading the whole file", url)
+                    await loop.run_in_executor(None, ranges_part.unlink)
+                    ranges = None
+            if ranges is None:
+                part = part_path(temp_path)
+                offset = resume_offset(part)
+                async with client.stream("GET", url, headers=resume_headers(part, offset), timeout=timeout) as r:
+                    start, size = resume_plan(part, offset, r.status_code, r.headers)
+                    r.raise_for_status()
+                    if start:
+                        logger.debug("Resuming %s at byte %d", url, start)
+                    async with _open(part, "ab" if start else "wb") as f:
+                        await _write_body(r, f)
+            await loop.run_in_executor(None, finalize, part, temp_path, size)
+            if variables and ranges is None:
+                await loop.run_in_executor(None, cls._record_layout, url, temp_path)
+            policy.record_success(url)
+            logger.debug("Downloaded %s", url)
+            return temp_path
+        except CircuitOpenError as e:
+            logger.error("Download of %s skipped: %s", url, e)
+            return False
+        except (httpx.HTTPError, OSError) as e:
+            if not policy.record_failure(url, e):
+                logger.error("Download of %s failed: %s", url, e)
+                return False
+            if attempt < num_retries:
+                delay = policy.delay(attempt)
+                logger.warning(
+                    "Download attempt %d/%d failed for %s: %s — retrying in %.1f s",
+                    attempt + 1,
+                    num_retries + 1,
+                    url,
+                    e,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+            else:
+                logger.error("All %d download attempt(s) failed for %s: %s", num_retries + 1, url, e)
+    return False
+
+
+async def afetch_url(
+    cls,
+    client: "httpx.AsyncClient",
+    limiter: HostLimiter,
+    url: str,
+    path: str,
+    num_retries: int = 1,
+    variables: Optional[list] = None,
+) -> Union[Path, bool]:
+    """Asynchronous counterpart of ``Model._fetch_url``.
+
+    As in the threaded backend, the lock file of the cache entry is held while the file is
+    looked up and downloaded, so that it is downloaded only once; the lock is taken in the
+    default executor.
+    """
+    cache = get_cache()
+    if cache is None:
+        async with limiter(url):
+            return await aurl_to_file(cls, client, url, path, num_retries, variables)
+    loop = asyncio.get_running_loop()
+    key = cache.key(cls.__name__, url, variables)
+    target = Path(path) / os.path.basename(url).replace(":", "-")
+    lock = cache.lock(key)
+    await loop.run_in_executor(None, lock.__enter__)
+    try:
+        if await loop.run_in_executor(None, cache.get, key, target):
+            return target
+        async with limiter(url):
+            local_path = await aurl_to_file(cls, client, url, path, num_retries, variables)
+        if local_path:
+            await loop.run_in_executor(None, cache.put, key, local_path)
+        return local_path
+    finally:
+        await loop.run_in_executor(None, lock.__exit__, None, None, None)
+
+
+async def adownload_urls(
+    cls,
+    urls: List[str],
+    path: str,
+    num_workers: int,
+    num_retries: int = 1,
+    variables: Optional[list] = None,
+    client: Optional["httpx.AsyncClient"] = None,
+) -> List[Union[Path, bool]]:
+    """Asynchronous counterpart of ``Model._download_urls``.
+
+    Args:
+        urls: Remote URLs to download.
+        path: Directory where files are saved.
+        num_workers: Maximum number of concurrent requests per host.
+        num_retries: Number of additional attempts per file on failure.
+        variables: If given, byte-range mode (see ``Model._url_to_file``).
+        client: Client to use. If ``None``, a client is created for this call and closed afterwards.
+            The concurrent requests per host of all the calls sharing a client are bounded by the
+            *num_workers* of the first one.
+
+    Returns:
+        List of ``Path`` objects for successful downloads, ``False`` for failures.
+    """
+    if client is None:
+        async with make_client(max_connections=num_workers, timeout=cls.TIMEOUT) as client:
+            return await adownload_urls(cls, urls, path, num_workers, num_retries, variables, client)
+    limiter = host_limiter(client, num_workers)
+    return list(
+        await asyncio.gather(*(afetch_url(cls, client, limiter, url, path, num_retries, variables) for url in urls))
+    )
@@ -0,0 +1,143 @@
+"""
+Batch fetching of several models, runs and paquets through shared pools.
+
+All the files of all the requests are downloaded by a single thread pool (the global
+download budget) and decoded by a single process pool (the CPU budget), instead of one
+pair of pools per ``get_forecast`` call. Files are queued by decreasing priority, and
+each file is decoded as soon as it is downloaded.
+"""
+
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Dict, List, NamedTuple, Optional, Sequence, Type, Union
+
+import pandas as pd
+import xarray as xr
+
+from ._misc import ForecastNotAvailableError, Packing, RateLimiter
+from ._model import Model
+from ._pool import decode_pool
+from ._spatial import BBox, Points
+
+logger = logging.getLogger(__name__)
+
+
+class FetchRequest(NamedTuple):
+    """A forecast to fetch with ``fetch_many``.
+
+    Attributes:
+        model: Model class, e.g. ``Arome0025``.
+        date: Run date/time; ``None`` for the latest available run.
+        paquet: Paquet of Météo-France models (``"SP1"`` if ``None``); must be ``None`` for ECMWF models.
+        variables: Field names to keep. If ``None``, all fields are returned.
+        priority: Files of requests with a higher priority are downloaded first.
+        byte_range: Only download the GRIB messages of *variables* (see ``get_forecast``).
+        bbox: ``(lon_min, lat_min, lon_max, lat_max)`` crop (see ``get_forecast``).
+        points: ``[(lon, lat), ...]`` nearest grid points (see ``get_forecast``).
+        name: Key of the result in the dict returned by ``fetch_many``. Defaults to the
+            model name, followed by the paquet if one is given.
+        dtype: Cast fields to this dtype when decoded (see ``get_forecast``).
+        packing: CF integer packing of the fields (see ``get_forecast``).
+    """
+
+    model: Type[Model]
+    date: Optional[Union[str, pd.Timestamp]] = None
+    paquet: Optional[str] = None
+    variables: Optional[list] = None
+    priority: int = 0
+    byte_range: bool = False
+    bbox: Optional[BBox] = None
+    points: Optional[Points] = None
+    name: Optional[str] = None
+    dtype: Optional[str] = None
+    packing: Optional[Packing] = None
+
+    @property
+    def key(self) -> str:
+        if self.name is not None:
+            return self.name
+        return self.model.__name__ if self.paquet is None else f"{self.model.__name__}_{self.paquet}"
+
+
+def fetch_many(
+    requests: Sequence[Union[FetchRequest, Type[Model]]],
+    num_workers: int = 16,
+    num_processes: Optional[int] = None,
+    num_retries: int = 1,
+    max_bandwidth: Optional[float] = None,
+) -> Dict[str, Dict[str, xr.DataArray]]:
+    """Fetch several forecasts at once, sharing one download pool and one decoding pool.
+
+    Args:
+        requests: ``FetchRequest`` objects, or model classes (latest run, all fields).
+        num_workers: Maximum number of concurrent downloads, over all requests.
+        num_processes: Number of decoding processes. Defaults to the number of CPUs. Ignored if a
+            persistent pool is active (see ``DecodePool``).
+        num_retries: Extra download attempts per file on failure.
+        max_bandwidth: If given, total bandwidth cap in MB/s of the downloads of this call,
+            instead of the one of ``set_bandwidth_limit``.
+
+    Returns:
+        Dict mapping each request key (see ``FetchRequest.name``) to its dict of fields.
+        Requests whose run is not available, or whose files cannot all be downloaded,
+        map to an empty dict.
+
+    Raises:
+        ValueError: If two requests have the same key, or a paquet is invalid.
+    """
+    requests = [r if isinstance(r, FetchRequest) else FetchRequest(model=r) for r in requests]
+    keys = [r.key for r in requests]
+    if len(set(keys)) != len(keys):
+        raise ValueError(f"Requests must have distinct keys (set FetchRequest.name), got {keys}")
+
+    limiter = None if max_bandwidth is None else RateLimiter(max_bandwidth * 1e6)
+    with TemporaryDirectory(prefix="meteofetch_") as tempdir, ThreadPoolExecutor(
+        max_workers=num_workers
+    ) as executor, decode_pool(num_processes or os.cpu_count()) as pool:
+        runs = list(executor.map(_resolve, requests))
+        decoding: Dict[str, List[Future]] = {}
+        leads: Dict[str, int] = {}
+        # Les fichiers sont mis en file par priorité décroissante (puis dans l'ordre des requêtes)
+        for i in sorted(range(len(requests)), key=lambda i: -requests[i].priority):
+            request, run = requests[i], runs[i]
+            if run is None:
+                continue
+            date, urls = run
+            logger.info("Queuing %s run %s (%d files)", request.key, date, len(urls))
+            leads[request.key] = request.model._count_leads(urls)
+            path = Path(tempdir) / str(i)
+            path.mkdir()
+            decoding[request.key] = request.model._submit_download_and_read(
+                urls,
+                str(path),
+                request.variables,
+                executor,
+                pool,
+                num_retries=num_retries,
+                byte_range=request.byte_range,
+                limiter=limiter,
+                bbox=request.bbox,
+                points=request.points,
+                dtype=request.dtype,
+                packing=request.packing,
+            )
+        ret = {}
+        for request in requests:
+            futures = decoding.get(request.key)
+            if futures is None:
+                ret[request.key] = {}
+            else:
+                ret[request.key] = request.model._collect_fields(futures, delete=True, leads=leads[request.key])
+        return ret
+
+
+def _resolve(request: FetchRequest):
+    """Run date and URLs of *request*, or ``None`` if no run is available."""
+    try:
+        return request.model._resolve_run(request.date, request.paquet)
+    except ForecastNotAvailableError as e:
+        logger.error("%s: %s", request.key, e)
+        return None
@@ -0,0 +1,99 @@
+"""
+Assembly of the pieces of a field along ``time``, in an array allocated up front.
+
+``xr.concat`` needs every piece in memory before copying them into the result, so reading
+a run temporarily holds it twice. A ``FieldBuffer`` allocates the final array as soon as
+the first piece arrives, sized from the lead times expected in the run, and copies each
+piece into place so that it can be released right away. Pages of the array that are never
+written (lead times over-estimated) are not committed to memory.
+"""
+
+from typing import Dict, List, Optional
+
+import numpy as np
+import xarray as xr
+
+
+class FieldBuffer:
+    """Pieces of one field, written one after the other along ``time``.
+
+    The result is the same as ``xr.concat(pieces, dim="time", coords="minimal", compat="override")``.
+    If a piece does not fit (other grid, levels or dtype), the buffer falls back to ``xr.concat``.
+
+    Args:
+        capacity: Number of lead times expected. The array grows if more pieces arrive.
+    """
+
+    def __init__(self, capacity: int = 1):
+        self.capacity = max(capacity, 1)
+        self.first: Optional[xr.DataArray] = None
+        self.data: Optional[np.ndarray] = None
+        self.axis = 0
+        self.size = 0
+        self.time_coords: Dict[str, List[np.ndarray]] = {}
+        self.pieces: Optional[List[xr.DataArray]] = None
+
+    def __len__(self):
+        return self.size
+
+    def _fits(self, da: xr.DataArray) -> bool:
+        first = self.first
+        if da.dims != first.dims or da.dtype != first.dtype or set(da.coords) != set(first.coords):
+            return False
+        if any(da.sizes[dim] != size for dim, size in first.sizes.items() if dim != "time"):
+            return False
+        if any("time" in da[name].dims and da[name].dims != ("time",) for name in da.coords):
+            return False
+        return all(
+            da.indexes[dim].equals(first.indexes[dim]) for dim in first.indexes if dim != "time" and dim in da.indexes
+        )
+
+    def _grow(self, size: int) -> None:
+        capacity = max(size, 2 * self.capacity)
+        shape = list(self.data.shape)
+        shape[self.axis] = capacity
+        data = np.empty(shape, dtype=self.data.dtype)
+        data[self._slice(0, self.size)] = self.data[self._slice(0, self.size)]
+        self.data, self.capacity = data, capacity
+
+    def _slice(self, start: int, stop: int) -> tuple:
+        return (slice(None),) * self.axis + (slice(start, stop),)
+
+    def append(self, da: xr.DataArray) -> None:
+        """Copy the values of *da* (a DataArray with a ``time`` dimension) at the end of the buffer."""
+        if self.pieces is not None:
+            self.pieces.append(da)
+            return
+        if self.first is None:
+            # Gabarit sans valeurs, pour ne pas retenir la première pièce
+            self.first = da.isel(time=slice(0, 0)).copy()
+            self.axis = da.dims.index("time")
+            shape = list(da.shape)
+            shape[self.axis] = max(self.capacity, da.sizes["time"])
+            self.capacity = shape[self.axis]
+            self.data = np.empty(shape, dtype=da.dtype)
+            self.time_coords = {name: [] for name in da.coords if "time" in da[name].dims}
+        elif not self._fits(da):
+            # Pièce incompatible : on revient à xr.concat sur les pièces déjà copiées
+            self.pieces = [self.result(), da]
+            return
+        n = da.sizes["time"]
+        if self.size + n > self.capacity:
+            self._grow(self.size + n)
+        self.data[self._slice(self.size, self.size + n)] = da.values
+        for name, values in self.time_coords.items():
+            values.append(da[name].values)
+        self.size += n
+
+    def result(self) -> xr.DataArray:
+        """The field along ``time``."""
+        if self.pieces is not None:
+            return xr.concat(self.pieces, dim="time", coords="minimal", compat="override")
+        first = self.first
+        coords = {name: first[name].variable for name in first.coords if name not in self.time_coords}
+        for name, values in self.time_coords.items():
+            coords[name] = xr.Variable(("time",), np.concatenate(values), first[name].attrs, first[name].encoding)
+        data = self.data[self._slice(0, self.size)]
+        da = xr.DataArray(data, dims=first.dims, coords=coords, name=first.name, attrs=dict(first.attrs))
+        da.encoding = dict(first.encoding)
+        return da
@@ -0,0 +1,232 @@
+"""
+Persistent on-disk cache of downloaded GRIB files, shared between calls and processes.
+
+Files are stored under ``<directory>/<model>/<file name>``: the file name published by
+Météo-France and the ECMWF already identifies the paquet, run and group (or step). Files
+downloaded partially (byte-range mode) get a suffix derived from the requested variables.
+
+Files are copied in and out of the cache (as copy-on-write clones where the file system
+supports it), never hard-linked: editing a file returned to the user cannot alter the cache.
+"""
+
+import hashlib
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from os.path import basename
+from pathlib import Path
+from shutil import copyfile
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from ._index import get_cache_dir
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_SUFFIXES = (".lock", ".tmp")
+
+# ioctl FICLONE de Linux : copie instantanée, en copie sur écriture (btrfs, XFS...)
+_FICLONE = 0x40049409
+
+
+def copy_file(source: Path, target: Path) -> None:
+    """Copy *source* to *target* atomically, as a copy-on-write clone if possible."""
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if fcntl is not None and sys.platform.startswith("linux"):
+            try:
+                with open(source, "rb") as src, open(tmp, "wb") as dst:
+                    fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            except OSError:
+                copyfile(source, tmp)
+        else:
+            copyfile(source, tmp)
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class RunCache:
+    """LRU cache of GRIB files on disk.
+
+    Writes are atomic (temporary file then ``os.replace``) and each entry is protected by
+    a lock file while it is being downloaded, so that concurrent processes sharing the same
+    directory download each file only once.
+
+    Args:
+        directory: Root directory of the cache.
+        max_size_gb: Maximum total size of the cache. Least recently used files are evicted first.
+        max_age_days: If given, files older than this are evicted regardless of the size.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_size_gb: float = 10.0, max_age_days: Optional[float] = None):
+        self.directory = Path(directory)
+        self.max_size = int(max_size_gb * 1024**3)
+        self.max_age = None if max_age_days is None else max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def __repr__(self):
+        return f"RunCache({str(self.directory)!r})"
+
+    def key(self, model: str, url: str, variables: Optional[list] = None) -> Path:
+        """Return the cache path of *url* downloaded for *model* (and *variables* if partial)."""
+        name = basename(url).replace(":", "-")
+        if variables:
+            digest = hashlib.sha1(",".join(sorted(variables)).encode()).hexdigest()[:10]
+            name = f"{name}.{digest}"
+        return self.directory / model / name
+
+    def get(self, key: Path, target: Path) -> bool:
+        """Copy the cached file *key* to *target* (see ``copy_file``). Returns ``False`` on miss."""
+        try:
+            os.utime(key)
+            copy_file(key, target)
+        except FileNotFoundError:
+            self._count(hit=False)
+            return False
+        self._count(hit=True)
+        logger.debug("Cache hit for %s", key)
+        return True
+
+    def put(self, key: Path, source: Path) -> None:
+        """Store a copy of *source* under *key* atomically, then evict old entries if needed."""
+        key.parent.mkdir(parents=True, exist_ok=True)
+        copy_file(source, key)
+        self.evict()
+
+    @contextmanager
+    def lock(self, key: Path, timeout: float = 3600.0, stale: float = 3600.0) -> Iterator[None]:
+        """Hold the lock file of *key*. Locks older than *stale* seconds are considered abandoned."""
+        key.parent.mkdir(parents=True, exist_ok=True)
+        lock_path = key.with_name(key.name + ".lock")
+        start = time.monotonic()
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.close(fd)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - lock_path.stat().st_mtime > stale:
+                        logger.warning("Removing stale cache lock %s", lock_path)
+                        lock_path.unlink()
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() - start > timeout:
+                    raise TimeoutError(f"Could not acquire cache lock {lock_path}")
+                time.sleep(0.1)
+        try:
+            yield
+        finally:
+            try:
+                lock_path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _files(self) -> List[Tuple[Path, os.stat_result]]:
+        files = []
+        for path in self.directory.glob("*/*"):
+            if path.name.endswith(_SUFFIXES):
+                continue
+            try:
+                files.append((path, path.stat()))
+            except FileNotFoundError:
+                continue
+        return files
+
+    def evict(self) -> None:
+        """Remove expired files, then least recently used files until the cache fits in ``max_size``."""
+        files = sorted(self._files(), key=lambda item: item[1].st_mtime)
+        now = time.time()
+        size = sum(stat.st_size for _, stat in files)
+        for path, stat in files:
+            expired = self.max_age is not None and now - stat.st_mtime > self.max_age
+            if not expired and size <= self.max_size:
+                break
+            try:
+                path.unlink()
+                logger.debug("Evicted %s from cache", path)
+            except FileNotFoundError:
+                pass
+            size -= stat.st_size
+
+    def clear(self) -> None:
+        """Remove every cached file."""
+        for path, _ in self._files():
+            path.unlink(missing_ok=True)
+
+    def info(self) -> Dict[str, Union[str, int]]:
+        """Return hit/miss statistics and the current size of the cache."""
+        files = self._files()
+        return {
+            "directory": str(self.directory),
+            "hits": self.hits,
+            "misses": self.misses,
+            "files": len(files),
+            "size_bytes": sum(stat.st_size for _, stat in files),
+            "max_size_bytes": self.max_size,
+        }
+
+    def _count(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+_cache: Optional[RunCache] = None
+
+
+def get_cache() -> Optional[RunCache]:
+    """Return the active cache, or ``None`` if caching is disabled (default)."""
+    return _cache
+
+
+def set_cache(
+    directory: Optional[Union[str, Path]] = None, max_size_gb: float = 10.0, max_age_days: Optional[float] = None
+) -> None:
+    """Enable the persistent cache of downloaded GRIB files.
+
+    Once enabled, every download first looks for the file in the cache, so repeated calls
+    for the same run (from the same process or from concurrent processes) hit the network
+    only once per file.
+
+    Args:
+        directory: Cache directory. Defaults to ``runs/`` under ``~/.cache/meteofetch``
+            (or under ``METEOFETCH_CACHE_DIR`` if set).
+        max_size_gb: Maximum size of the cache, in GB. Least recently used files are evicted first.
+        max_age_days: If given, files older than this number of days are evicted.
+    """
+    global _cache
+    if directory is None:
+        directory = get_cache_dir() / "runs"
+    _cache = RunCache(directory, max_size_gb=max_size_gb, max_age_days=max_age_days)
+    logger.info("Cache enabled in %s", _cache.directory)
+
+
+def disable_cache() -> None:
+    """Disable the persistent cache (files already cached are kept on disk)."""
+    global _cache
+    _cache = None
+
+
+def cache_info() -> Optional[Dict[str, Union[str, int]]]:
+    """Return the statistics of the active cache (hits, misses, number of files, size), or ``None``."""
+    return None if _cache is None else _cache.info()
+
+
+def clear_cache() -> None:
+    """Remove every file of the active cache."""
+    if _cache is not None:
+        _cache.clear()
@@ -0,0 +1,87 @@
+"""
+Command line interface, installed as ``meteofetch`` (or ``python -m meteofetch``).
+
+``meteofetch mirror DEST MODEL[:PAQUET,...]...`` copies the latest run (or ``--date``) of each
+model into *DEST*, laid out as on the upstream servers (see ``sync_run`` with ``mirror=True``).
+Run periodically on one node, it only downloads new or changed files; the other nodes then
+read the mirror with ``set_base_url`` (or the ``METEOFETCH_BASE_URL`` environment variable).
+"""
+
+import argparse
+import logging
+import sys
+from typing import Dict, List, Optional
+
+from ._misc import ForecastNotAvailableError
+from ._model import Model
+
+
+def _models() -> Dict[str, type]:
+    """Concrete models (subclasses of ``Model`` with a ``url_``), by class name."""
+    models, todo = {}, list(Model.__subclasses__())
+    while todo:
+        cls = todo.pop()
+        todo.extend(cls.__subclasses__())
+        if hasattr(cls, "url_"):
+            models[cls.__name__] = cls
+    return models
+
+
+def _mirror(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    models = _models()
+    status = 0
+    for spec in args.models:
+        name, _, paquets = spec.partition(":")
+        cls = models.get(name)
+        if cls is None:
+            parser.error(f"unknown model {name!r} (available: {', '.join(sorted(models))})")
+        if paquets and not hasattr(cls, "paquets_"):
+            parser.error(f"{name} has no paquets, got {paquets!r}")
+        for paquet in paquets.split(",") if paquets else [None]:
+            label = name if paquet is None else f"{name}:{paquet}"
+            kwargs = {} if paquet is None else {"paquet": paquet}
+            try:
+                result = cls.sync_run(
+                    args.dest,
+                    date=args.date,
+                    num_workers=args.workers,
+                    num_retries=args.retries,
+                    max_lead=args.max_lead,
+                    mirror=True,
+                    **kwargs,
+                )
+            except (ForecastNotAvailableError, ValueError) as e:
+                print(f"{label}: {e}", file=sys.stderr)
+                status = 1
+                continue
+            print(f"{label}: {len(result.updated)} of {len(result.paths)} file(s) updated")
+    return status
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Entry point of the ``meteofetch`` command."""
+    parser = argparse.ArgumentParser(
+        prog="meteofetch", description="Weather forecast data from Météo-France and ECMWF."
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    commands.required = True
+    mirror = commands.add_parser(
+        "mirror",
+        help="copy runs into a local directory laid out as the upstream servers",
+        description="Copy the latest run (or --date) of each model into DEST, laid out as the upstream servers. "
+        "Only new or changed files are downloaded. Read the mirror with set_base_url, or by setting the "
+        "METEOFETCH_BASE_URL environment variable to the URL of DEST (http:// or file://).",
+    )
+    mirror.add_argument("dest", help="directory of the mirror")
+    mirror.add_argument(
+        "models", nargs="+", metavar="MODEL[:PAQUET,...]", help="model class name, e.g. Ifs or Arome0025:SP1,SP2"
+    )
+    mirror.add_argument("--date", help="run timestamp, e.g. 2025-01-01T00 (default: latest available run)")
+    mirror.add_argument("--max-lead", type=int, help="last lead hour to mirror")
+    mirror.add_argument("--workers", type=int, default=4, help="number of parallel downloads (default: 4)")
+    mirror.add_argument("--retries", type=int, default=1, help="additional attempts per file (default: 1)")
+    mirror.add_argument("-v", "--verbose", action="store_true", help="log the progress")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    return _mirror(mirror, args)
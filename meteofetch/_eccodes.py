@@ -0,0 +1,341 @@
+"""
+Direct eccodes decoding of GRIB files, bypassing the construction of cfgrib datasets.
+
+``cfgrib.open_datasets`` indexes every message through its Python wrappers, then opens one
+dataset per parameter and merges them, which dominates the decoding time of files made of
+many small messages (e.g. the IP/HP paquets of AROME). ``open_datasets`` reads the headers
+once with eccodes, allocates one array per variable, and decodes each message directly
+into its slot. It returns the same datasets as ``cfgrib.open_datasets`` (names, dimensions,
+coordinates and attributes), so that they go through the same processing.
+
+Only grids with latitude/longitude dimensions (``regular_ll``, ``regular_gg``) are
+supported (see ``supported``); ``open_datasets`` returns ``None`` for other files, which are
+left to cfgrib.
+
+The attribute keys and coordinate attributes set by cfgrib are copied from ``cfgrib.dataset``
+(version 0.9.15), which does not expose them publicly; ``test_eccodes_engine_matches_cfgrib``
+checks that both engines still return identical datasets.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import eccodes
+import numpy as np
+import xarray as xr
+
+# Tables de cfgrib.dataset (cfgrib 0.9.15), réduites aux grilles et coordonnées prises en charge
+GLOBAL_ATTRIBUTES_KEYS = ["edition", "centre", "centreDescription", "subCentre"]
+
+DATA_ATTRIBUTES_KEYS = [
+    "paramId",
+    "dataType",
+    "numberOfPoints",
+    "typeOfLevel",
+    "stepUnits",
+    "stepType",
+    "gridType",
+    "uvRelativeToGrid",
+]
+
+EXTRA_DATA_ATTRIBUTES_KEYS = [
+    "shortName",
+    "units",
+    "name",
+    "cfName",
+    "cfVarName",
+    "missingValue",
+    "totalNumber",
+    "numberOfDirections",
+    "numberOfFrequencies",
+    "NV",
+    "gridDefinitionDescription",
+]
+
+GRID_TYPE_MAP = {
+    "regular_ll": [
+        "Nx",
+        "iDirectionIncrementInDegrees",
+        "iScansNegatively",
+        "longitudeOfFirstGridPointInDegrees",
+        "longitudeOfLastGridPointInDegrees",
+        "Ny",
+        "jDirectionIncrementInDegrees",
+        "jPointsAreConsecutive",
+        "jScansPositively",
+        "latitudeOfFirstGridPointInDegrees",
+        "latitudeOfLastGridPointInDegrees",
+    ],
+    "regular_gg": [
+        "N",
+        "Ni",
+        "Nj",
+        "iDirectionIncrementInDegrees",
+        "iScansNegatively",
+        "jScansPositively",
+        "jPointsAreConsecutive",
+        "longitudeOfFirstGridPointInDegrees",
+        "longitudeOfLastGridPointInDegrees",
+        "latitudeOfFirstGridPointInDegrees",
+        "latitudeOfLastGridPointInDegrees",
+    ],
+}
+
+_DEPTH = {"units": "m", "positive": "down", "long_name": "soil depth", "standard_name": "depth"}
+_PRESSURE = {
+    "positive": "down",
+    "stored_direction": "decreasing",
+    "standard_name": "air_pressure",
+    "long_name": "pressure",
+}
+_TIME = {"units": "seconds since 1970-01-01T00:00:00", "calendar": "proleptic_gregorian"}
+
+COORD_ATTRS = {
+    "latitude": {"units": "degrees_north", "standard_name": "latitude", "long_name": "latitude"},
+    "longitude": {"units": "degrees_east", "standard_name": "longitude", "long_name": "longitude"},
+    "depthBelowLand": _DEPTH,
+    "depthBelowLandLayer": _DEPTH,
+    "hybrid": {
+        "units": "1",
+        "positive": "down",
+        "long_name": "hybrid level",
+        "standard_name": "atmosphere_hybrid_sigma_pressure_coordinate",
+    },
+    "heightAboveGround": {
+        "units": "m",
+        "positive": "up",
+        "long_name": "height above the surface",
+        "standard_name": "height",
+    },
+    "isobaricInhPa": {"units": "hPa", **_PRESSURE},
+    "isobaricInPa": {"units": "Pa", **_PRESSURE},
+    "isobaricLayer": {"units": "Pa", "positive": "down", "standard_name": "air_pressure", "long_name": "pressure"},
+    "number": {"units": "1", "standard_name": "realization", "long_name": "ensemble member numerical id"},
+    "step": {
+        "units": "hours",
+        "standard_name": "forecast_period",
+        "long_name": "time since forecast_reference_time",
+        "dtype": "timedelta64[ns]",
+    },
+    "time": {**_TIME, "standard_name": "forecast_reference_time", "long_name": "initial time of forecast"},
+    "valid_time": {**_TIME, "standard_name": "time", "long_name": "time"},
+}
+
+# Valeur des points manquants dans les messages décodés (comme cfgrib)
+MISSING_VALUE = np.finfo(np.float32).max
+
+STEP_UNITS_TO_SECONDS = {0: 60, 1: 3600, 2: 86400, 10: 10800, 11: 21600, 12: 43200, 13: 1, 14: 900, 15: 1800}
+
+DIMENSION_GRIDS = tuple(GRID_TYPE_MAP)
+
+# Attributs des coordonnées temporelles que xarray déplace dans l'encodage au décodage CF
+TIME_ENCODING_KEYS = ("units", "calendar", "dtype")
+
+
+class _Variable:
+    """Messages of one GRIB parameter, on one grid and type of level."""
+
+    def __init__(self, name: str, attrs: dict, global_attrs: dict, grid: tuple):
+        self.name = name
+        self.attrs = attrs
+        self.global_attrs = global_attrs
+        self.grid = grid
+        self.messages: List[Tuple[int, tuple]] = []
+
+    def coordinate_values(self, i: int, decreasing: bool = False) -> list:
+        return sorted({header[i] for _, header in self.messages}, reverse=decreasing)
+
+
+def _get(h, key: str, ktype=None):
+    """Value of *key*, or ``None`` if it is not defined in the message."""
+    if not eccodes.codes_is_defined(h, key):
+        return None
+    try:
+        return eccodes.codes_get(h, key, ktype)
+    except eccodes.KeyValueNotFoundError:
+        return None
+
+
+def supported(h) -> bool:
+    """Whether the message *h* can be decoded by this module (grid with latitude/longitude dimensions)."""
+    return (
+        eccodes.codes_get(h, "gridType") in DIMENSION_GRIDS
+        and not _get(h, "alternativeRowScanning")
+        and _get(h, "stepUnits", int) in STEP_UNITS_TO_SECONDS
+    )
+
+
+def _level_name(type_of_level: Optional[str]) -> str:
+    return type_of_level if type_of_level not in (None, "undef", "unknown") else "level"
+
+
+def _read_attrs(h) -> Tuple[dict, dict]:
+    """Attributes of the variable and of the dataset, as set by cfgrib."""
+    attrs = {}
+    for key in DATA_ATTRIBUTES_KEYS:
+        value = _get(h, key)
+        if value is not None and value not in ("undef", "unknown"):
+            attrs[f"GRIB_{key}"] = value
+    attrs["GRIB_stepUnits"] = 1  # cfgrib indexe toujours les échéances en heures
+    grid_keys = GRID_TYPE_MAP.get(attrs.get("GRIB_gridType"), [])
+    for key in sorted(EXTRA_DATA_ATTRIBUTES_KEYS + grid_keys):
+        value = MISSING_VALUE.item() if key == "missingValue" else _get(h, key)
+        if value is not None:
+            attrs[f"GRIB_{key}"] = value
+    attrs["long_name"] = attrs.get("GRIB_name", f"original GRIB paramId: {attrs.get('GRIB_paramId', 'undef')}")
+    attrs["units"] = attrs.get("GRIB_units", "1")
+    if "GRIB_cfName" in attrs:
+        attrs["standard_name"] = attrs["GRIB_cfName"]
+
+    global_attrs = {}
+    for key in GLOBAL_ATTRIBUTES_KEYS:
+        value = _get(h, key)
+        if value is not None and value not in ("undef", "unknown"):
+            global_attrs[f"GRIB_{key}"] = value
+    global_attrs["Conventions"] = "CF-1.7"
+    if "GRIB_centreDescription" in global_attrs:
+        global_attrs["institution"] = global_attrs["GRIB_centreDescription"]
+    return attrs, global_attrs
+
+
+def _variable_name(attrs: dict) -> str:
+    name = attrs.get("GRIB_cfVarName", "unknown")
+    if name not in ("undef", "unknown"):
+        return name
+    return attrs.get("GRIB_shortName", f"paramId_{attrs.get('GRIB_paramId')}")
+
+
+def _read_headers(path) -> Optional[List[_Variable]]:
+    """First pass: group the messages of *path* by variable, without decoding any value.
+
+    Returns ``None`` if the file has no message, or a message that is not ``supported``.
+    """
+    variables: Dict[tuple, _Variable] = {}
+    with open(path, "rb") as f:
+        while True:
+            h = eccodes.codes_grib_new_from_file(f, headers_only=True)
+            if h is None:
+                break
+            try:
+                if not supported(h):
+                    return None
+                step_units = STEP_UNITS_TO_SECONDS[eccodes.codes_get(h, "stepUnits", int)]
+                date, hhmm = eccodes.codes_get(h, "dataDate", int), eccodes.codes_get(h, "dataTime", int)
+                time = np.datetime64(datetime(date // 10000, date // 100 % 100, date % 100, hhmm // 100, hhmm % 100))
+                header = (
+                    _get(h, "number", int),
+                    time,
+                    eccodes.codes_get(h, "endStep", int) * step_units / 3600.0,
+                    eccodes.codes_get(h, "level", float),
+                )
+                key = (
+                    _get(h, "typeOfLevel"),
+                    eccodes.codes_get(h, "paramId"),
+                    _get(h, "stepType"),
+                    _get(h, "dataType"),
+                    eccodes.codes_get(h, "md5GridSection"),
+                    header[0] is None,
+                )
+                if key not in variables:
+                    attrs, global_attrs = _read_attrs(h)
+                    grid = (
+                        (eccodes.codes_get(h, "Ny"), eccodes.codes_get(h, "Nx")),
+                        np.asarray(eccodes.codes_get_array(h, "distinctLatitudes")),
+                        np.asarray(eccodes.codes_get_array(h, "distinctLongitudes")),
+                    )
+                    variables[key] = _Variable(_variable_name(attrs), attrs, global_attrs, grid)
+                variables[key].messages.append((eccodes.codes_get(h, "offset", int), header))
+            finally:
+                eccodes.codes_release(h)
+    if not variables:
+        return None
+    # Même ordre que cfgrib : par type de niveau, puis par paramètre
+    return [variables[key] for key in sorted(variables, key=lambda k: (str(k[0]), k[1]))]
+
+
+def _coord(name: str, dims: tuple, values) -> xr.Variable:
+    """Coordinate variable with the attributes and encoding cfgrib gives it."""
+    attrs = {"long_name": f"original GRIB coordinate for key: level({name})", "units": "1"}
+    attrs.update(COORD_ATTRS.get(name, {}))
+    encoding = {}
+    if name in ("time", "step", "valid_time"):
+        encoding = {k: attrs.pop(k) for k in TIME_ENCODING_KEYS if k in attrs}
+        encoding.pop("dtype", None)
+    if name == "latitude" and values[0] > values[-1]:
+        attrs["stored_direction"] = "decreasing"
+    return xr.Variable(dims, values, attrs, encoding)
+
+
+def _build(f, variable: _Variable) -> xr.Dataset:
+    """Second pass: decode the messages of *variable* into a preallocated array."""
+    level = _level_name(variable.attrs.get("GRIB_typeOfLevel"))
+    decreasing = COORD_ATTRS.get(level, {}).get("stored_direction") == "decreasing"
+    header_names = ("number", "time", "step", level)
+    values = [variable.coordinate_values(i, decreasing and i == 3) for i in range(4)]
+    header = [(i, name) for i, name in enumerate(header_names) if not (i == 0 and values[0] == [None])]
+    index = [{v: j for j, v in enumerate(values[i])} for i in range(4)]
+    geo_shape, latitudes, longitudes = variable.grid
+
+    data = np.full(tuple(len(values[i]) for i, _ in header) + geo_shape, np.nan, dtype=np.float32)
+    filled = set()
+    for offset, message in variable.messages:
+        slot = tuple(index[i][message[i]] for i, _ in header)
+        if slot in filled:  # comme cfgrib, seul le premier message d'un doublon est lu
+            continue
+        filled.add(slot)
+        f.seek(offset)
+        h = eccodes.codes_grib_new_from_file(f)
+        try:
+            eccodes.codes_set(h, "missingValue", MISSING_VALUE.item())
+            data[slot] = eccodes.codes_get_float_array(h, "values").reshape(geo_shape)
+        finally:
+            eccodes.codes_release(h)
+    data[data == MISSING_VALUE] = np.nan
+
+    coords = {}
+    for i, name in header:
+        if name == "time":
+            coord = np.array(values[i], dtype="datetime64[ns]")
+        elif name == "step":
+            coord = (np.array(values[i]) * 3600e9).astype("timedelta64[ns]")
+        else:
+            coord = np.array(values[i], dtype=float if i == 3 else None)
+        coords[name] = _coord(name, (name,), coord)
+    coords["latitude"] = _coord("latitude", ("latitude",), latitudes)
+    coords["longitude"] = _coord("longitude", ("longitude",), longitudes)
+    valid_time = coords["time"].values[:, None] + coords["step"].values[None, :]
+    coords["valid_time"] = _coord("valid_time", ("time", "step"), valid_time)
+
+    dims = tuple(name for _, name in header) + ("latitude", "longitude")
+    da = xr.DataArray(data, dims=dims, coords=coords, attrs=variable.attrs)
+    return da.to_dataset(name=variable.name).assign_attrs(variable.global_attrs)
+
+
+def _mergeable(a: xr.Dataset, b: xr.Dataset) -> bool:
+    """Whether *b* can be merged into *a*, as ``xr.merge(join="exact")`` in cfgrib."""
+    if a.attrs != b.attrs or set(b.data_vars) & set(a.data_vars):
+        return False
+    shared = set(a.coords) & set(b.coords)
+    return all(a[name].dims == b[name].dims and np.array_equal(a[name].values, b[name].values) for name in shared)
+
+
+def open_datasets(path) -> Optional[List[xr.Dataset]]:
+    """Decode *path* with eccodes, into the datasets ``cfgrib.open_datasets`` would return.
+
+    Returns ``None``, without decoding any value, if a message of the file is not ``supported``.
+    """
+    variables = _read_headers(path)
+    if variables is None:
+        return None
+    merged: Dict[str, List[xr.Dataset]] = {}
+    with open(path, "rb") as f:
+        for variable in variables:
+            ds = _build(f, variable)
+            datasets = merged.setdefault(str(variable.attrs.get("GRIB_typeOfLevel", "undef")), [])
+            for i, other in enumerate(datasets):
+                if _mergeable(other, ds):
+                    datasets[i] = other.merge(ds, join="exact", compat="override", combine_attrs="override")
+                    break
+            else:
+                datasets.append(ds)
+    return [ds.squeeze() for type_of_level in sorted(merged) for ds in merged[type_of_level]]
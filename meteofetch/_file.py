@@ -0,0 +1,107 @@
+"""
+``file://`` URLs, so that models can read a local mirror (see ``set_base_url``) as they read a server.
+
+``FileAdapter`` is mounted on the shared ``requests.Session``: HEAD requests, GET requests and
+``Range`` requests (with ``If-Range``) on a local file get the same statuses and headers (``Content-Length``,
+``Content-Range``, ``Last-Modified``) as from an HTTP server, so that availability checks,
+resumable downloads and byte-range downloads work unchanged.
+"""
+
+import io
+import re
+from email.utils import formatdate
+from pathlib import Path
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+def url_to_path(url: str) -> Path:
+    """Local path of a ``file://`` URL."""
+    return Path(url2pathname(urlsplit(url).path))
+
+
+class _FileSlice(io.RawIOBase):
+    """The *length* bytes of the open file *f* from its current position."""
+
+    def __init__(self, f, length: int):
+        self.f = f
+        self.remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def readinto(self, b) -> int:
+        data = self.read(len(b))
+        b[: len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        self.f.close()
+        super().close()
+
+
+class FileAdapter(BaseAdapter):
+    """Transport adapter answering GET and HEAD requests on ``file://`` URLs."""
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict()
+        response.raw = io.BytesIO(b"")
+        path = url_to_path(request.url)
+        if request.method not in ("GET", "HEAD"):
+            response.status_code, response.reason = 405, "Method Not Allowed"
+            return response
+        if not path.is_file():
+            response.status_code, response.reason = 404, "Not Found"
+            return response
+
+        stat = path.stat()
+        size = stat.st_size
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        response.headers.update(
+            {
+                "Accept-Ranges": "bytes",
+                "Content-Type": "application/octet-stream",
+                "Last-Modified": last_modified,
+            }
+        )
+        start, end = 0, size - 1
+        response.status_code, response.reason = 200, "OK"
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", request.headers.get("Range", "").strip())
+        # If-Range : le fichier entier est renvoyé s'il a changé
+        current = request.headers.get("If-Range", last_modified) == last_modified
+        if match and (match[1] or match[2]) and current:
+            if match[1]:
+                start = int(match[1])
+                end = min(int(match[2]), size - 1) if match[2] else size - 1
+            else:
+                # Suffixe : les N derniers octets
+                start = max(size - int(match[2]), 0)
+            if start >= size or start > end:
+                response.status_code, response.reason = 416, "Range Not Satisfiable"
+                response.headers["Content-Range"] = f"bytes */{size}"
+                return response
+            response.status_code, response.reason = 206, "Partial Content"
+            response.headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response.headers["Content-Length"] = str(end - start + 1)
+        if request.method == "GET":
+            f = open(path, "rb")
+            f.seek(start)
+            response.raw = _FileSlice(f, end - start + 1)
+        return response
+
+    def close(self):
+        pass
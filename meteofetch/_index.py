@@ -0,0 +1,150 @@
+"""
+Message-level indexes of remote GRIB2 files, used to download only the messages
+of the requested fields with HTTP Range requests.
+
+ECMWF publishes a ``.index`` sidecar (one JSON object per message) next to each
+GRIB2 file. Météo-France does not, so the ordered list of fields of each file is
+learned from a previous full download and stored locally; message boundaries are
+then found by reading the 16-byte section 0 of each message.
+"""
+
+import json
+import logging
+import os
+import re
+import struct
+from os.path import basename
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import eccodes
+import requests
+
+from ._misc import get_session
+
+logger = logging.getLogger(__name__)
+
+# Noms courts ECMWF dont le nom de variable cfgrib (cfVarName) ne suit pas la règle générale.
+ECMWF_CF_NAMES = {"2t": "t2m", "2d": "d2m"}
+
+
+def get_cache_dir() -> Path:
+    """Return the root directory of meteofetch's local files (``METEOFETCH_CACHE_DIR``)."""
+    default = Path.home() / ".cache" / "meteofetch"
+    return Path(os.environ.get("METEOFETCH_CACHE_DIR", default))
+
+
+def param_to_varname(param: str) -> str:
+    """Translate an ECMWF short name (e.g. ``"10u"``) into its cfgrib variable name (``"u10"``)."""
+    if param in ECMWF_CF_NAMES:
+        return ECMWF_CF_NAMES[param]
+    match = re.fullmatch(r"(\d+)(\D\w*)", param)
+    if match:
+        return match.group(2) + match.group(1)
+    return param
+
+
+def merge_ranges(ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge contiguous or overlapping inclusive byte ranges, to issue as few requests as possible."""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def read_ecmwf_index(url: str, timeout: float) -> Optional[List[Dict]]:
+    """Download and parse the ``.index`` sidecar of an ECMWF GRIB2 file.
+
+    Returns:
+        One dict per message (with ``param``, ``_offset`` and ``_length`` keys),
+        or ``None`` if the index is not available.
+    """
+    index_url = url.rsplit(".", 1)[0] + ".index"
+    try:
+        r = get_session().get(index_url, timeout=timeout)
+        r.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logger.warning("Index not available for %s: %s", url, e)
+        return None
+    return [json.loads(line) for line in r.text.splitlines() if line.strip()]
+
+
+def scan_grib_offsets(url: str, timeout: float) -> List[Tuple[int, int]]:
+    """Locate the GRIB2 messages of a remote file without downloading their content.
+
+    Reads the 16-byte section 0 of each message (which holds the total message
+    length) with one Range request per message.
+
+    Returns:
+        List of ``(offset, length)`` tuples, one per message.
+
+    Raises:
+        ValueError: If the server does not support Range requests, or the messages found do not
+            cover exactly the size of the file announced by the server.
+    """
+    offsets: List[Tuple[int, int]] = []
+    offset, total = 0, None
+    session = get_session()
+    while total is None or offset < total:
+        r = session.get(url, headers={"Range": f"bytes={offset}-{offset + 15}"}, timeout=timeout)
+        r.raise_for_status()
+        if r.status_code != 206:
+            raise ValueError(f"Range requests are not supported for {url}")
+        if total is None:
+            total = int(r.headers["Content-Range"].rsplit("/", 1)[1])
+        head = r.content
+        if head[:4] != b"GRIB" or head[7] != 2:
+            raise ValueError(f"Unexpected GRIB header at offset {offset} of {url}")
+        length = struct.unpack(">Q", head[8:16])[0]
+        offsets.append((offset, length))
+        offset += length
+    if offset != total:
+        raise ValueError(f"GRIB messages of {url} end at byte {offset}, the file has {total} bytes")
+    return offsets
+
+
+def grib_layout(path: Path) -> List[List[str]]:
+    """Return, for each message of a local GRIB file, the names it can be selected by.
+
+    Both the eccodes ``shortName`` and the cfgrib variable name (``cfVarName``) are kept.
+    """
+    layout = []
+    with open(path, "rb") as f:
+        while True:
+            h = eccodes.codes_grib_new_from_file(f)
+            if h is None:
+                break
+            try:
+                names = {eccodes.codes_get(h, "shortName"), eccodes.codes_get(h, "cfVarName")}
+            finally:
+                eccodes.codes_release(h)
+            layout.append(sorted(name for name in names if name != "unknown"))
+    return layout
+
+
+def layout_key(model: str, url: str) -> str:
+    """Key of the stored layout of *url*: the file name stripped of its run date."""
+    name = re.sub(r"__\d{4}-\d{2}-\d{2}T\d{2}[:-]\d{2}[:-]\d{2}Z", "", basename(url))
+    return f"{model}/{name}"
+
+
+def load_layout(key: str) -> Optional[List[List[str]]]:
+    """Load a layout previously saved with ``save_layout``, or ``None`` if unknown."""
+    path = get_cache_dir() / "layouts" / f"{key}.json"
+    if not path.is_file():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_layout(key: str, layout: List[List[str]]) -> None:
+    """Persist the layout of a GRIB file (atomic write)."""
+    path = get_cache_dir() / "layouts" / f"{key}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(layout, f)
+    os.replace(tmp, path)
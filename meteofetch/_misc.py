@@ -4,17 +4,34 @@ The Well Known Text of WGS 84 is hardcoded in the code to avoid having to import
 
 import logging
 import os
+import threading
+import time
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Literal, Union
+from typing import Dict, Iterable, List, Literal, Optional, Tuple, Union
 
 import eccodes
+import numpy as np
 import requests
 import xarray as xr
+from requests.adapters import HTTPAdapter
+
+from ._file import FileAdapter
 
 logger = logging.getLogger(__name__)
 
+_session = None
+_session_lock = threading.Lock()
+
+# Nombre de connexions maintenues par la session partagée, et de requêtes HEAD simultanées.
+PROBE_WORKERS = 32
+
+_rate_limiter = None
+
+
+Packing = Literal["int16", "int8"]
+
 
 class ForecastNotAvailableError(RuntimeError):
     """Raised when no valid forecast run is found among the recent past runs."""
@@ -60,7 +77,52 @@ CRS_WKT = """
           """
 
 
-def geo_encode_cf(da: xr.DataArray) -> xr.DataArray:
+PACKING_KEYS = ("dtype", "scale_factor", "add_offset", "_FillValue")
+
+
+def pack_encoding(da: xr.DataArray, packing: Packing, valid_range: Optional[Tuple[float, float]] = None) -> dict:
+    """
+    Encodage CF qui stocke *da* sous forme d'entiers *packing* (``scale_factor``/``add_offset``).
+
+    L'échelle est calculée à partir du minimum et du maximum de la DataArray, ou de *valid_range* ;
+    la plus petite valeur entière est réservée aux valeurs manquantes (``_FillValue``).
+
+    Args:
+        da (xr.DataArray): La DataArray à compacter.
+        packing (str): Type entier de stockage, ``"int16"`` ou ``"int8"``.
+        valid_range (tuple, optional): ``(min, max)`` des valeurs à représenter, pour garder
+            la même échelle d'un appel à l'autre (voir ``pack_bounds``).
+
+    Returns:
+        dict: L'encodage à ajouter à ``da.encoding`` (vide si la DataArray ne contient que des NaN).
+    """
+    if packing not in ("int16", "int8"):
+        raise ValueError(f"packing must be 'int16' or 'int8', got {packing!r}")
+    if valid_range is not None:
+        vmin, vmax = map(float, valid_range)
+    else:
+        vmin, vmax = float(da.min(skipna=True)), float(da.max(skipna=True))
+    if np.isnan(vmin):
+        return {}
+    info = np.iinfo(packing)
+    scale_factor = (vmax - vmin) / (info.max - info.min - 1) if vmax > vmin else 1.0
+    add_offset = vmin - (info.min + 1) * scale_factor
+    return {"dtype": packing, "scale_factor": scale_factor, "add_offset": add_offset, "_FillValue": info.min}
+
+
+def pack_bounds(encoding: dict) -> Tuple[float, float]:
+    """
+    Plus petite et plus grande valeurs représentables avec l'encodage *encoding* de ``pack_encoding``.
+
+    Les valeurs hors de ces bornes doivent être écrêtées avant l'écriture : converties telles
+    quelles en entiers, elles déborderaient.
+    """
+    info = np.iinfo(encoding["dtype"])
+    scale_factor, add_offset = encoding["scale_factor"], encoding["add_offset"]
+    return add_offset + (info.min + 1) * scale_factor, add_offset + info.max * scale_factor
+
+
+def geo_encode_cf(da: xr.DataArray, packing: Optional[Packing] = None) -> xr.DataArray:
     """
     Rend une DataArray conforme aux conventions CF (Climate and Forecast).
 
@@ -70,10 +132,14 @@ def geo_encode_cf(da: xr.DataArray) -> xr.DataArray:
 
     Args:
         da (xr.DataArray): La DataArray à modifier pour la rendre conforme aux conventions CF.
+        packing (str, optional): Si donné (``"int16"`` ou ``"int8"``), la DataArray est compactée
+            en entiers à l'écriture (voir ``pack_encoding``). Par défaut, le type demandé à la
+            lecture (``da.encoding["packing"]``, voir ``get_forecast``).
 
     Returns:
         xr.DataArray: La DataArray modifiée avec les attributs et encodages CF ajoutés.
     """
+    packing = packing or da.encoding.pop("packing", None)
     da.encoding.update(
         {
             "zlib": True,
@@ -82,11 +148,13 @@ def geo_encode_cf(da: xr.DataArray) -> xr.DataArray:
             "coordinates": "latitude longitude",
         }
     )
+    if packing is not None:
+        da.encoding.update(pack_encoding(da, packing))
     da.coords["spatial_ref"] = xr.Variable((), 0)
     da["spatial_ref"].attrs["crs_wkt"] = CRS_WKT
     da["spatial_ref"].attrs["spatial_ref"] = CRS_WKT
     da["spatial_ref"].attrs["grid_mapping_name"] = "latitude_longitude"
-    if "time" in da:
+    if "time" in da.coords:
         da["time"].encoding = {"units": "hours since 1970-01-01 00:00:00"}
     return da
 
@@ -130,6 +198,130 @@ def set_test_mode() -> None:
     print("Test mode enabled. DataArray values are replaced with isnull() booleans.")
 
 
+def is_test_mode() -> bool:
+    """Whether the test mode of ``set_test_mode`` is enabled."""
+    return os.environ.get("METEOFETCH_TEST_MODE") == "1"
+
+
+def set_grib_engine(engine: Literal["cfgrib", "eccodes"]) -> None:
+    """Select the library used to decode the GRIB files.
+
+    Args:
+        engine: "cfgrib" (default) to open files with ``cfgrib.open_datasets``, or "eccodes"
+                to decode messages directly with eccodes into preallocated arrays, which is
+                much faster for files made of many small messages. The "eccodes" engine
+                returns the same fields, and falls back to cfgrib for grids without
+                latitude/longitude dimensions and for ``lazy=True``.
+    """
+    if engine not in ("cfgrib", "eccodes"):
+        raise ValueError("engine must be 'cfgrib' or 'eccodes'")
+    os.environ["METEOFETCH_GRIB_ENGINE"] = engine
+
+
+def get_grib_engine() -> str:
+    """Return the GRIB decoding engine selected with ``set_grib_engine``."""
+    return os.environ.get("METEOFETCH_GRIB_ENGINE", "cfgrib")
+
+
+def set_base_url(url: Optional[str], model: Optional[Union[str, type]] = None) -> None:
+    """Download the files of *model* (of every model if ``None``) from *url* instead of ``base_url_``.
+
+    *url* replaces the root of the upstream URLs, so it must point to a tree laid out like the
+    upstream one, such as a mirror made with ``meteofetch mirror`` (see ``sync_run``), served
+    over HTTP or read directly with a ``file://`` URL.
+
+    Sets the ``METEOFETCH_BASE_URL_<MODEL>`` environment variable (``METEOFETCH_BASE_URL`` for
+    every model), which may also be set before starting Python. The override of a model takes
+    precedence over the one of every model.
+
+    Args:
+        url: Root URL, or ``None`` to remove the override.
+        model: Model class or name (e.g. ``"Ifs"``).
+    """
+    name = "METEOFETCH_BASE_URL"
+    if model is not None:
+        name += "_" + (model if isinstance(model, str) else model.__name__).upper()
+    if url is None:
+        os.environ.pop(name, None)
+    else:
+        os.environ[name] = url.rstrip("/")
+
+
+def get_base_url(model: str, default: str) -> str:
+    """Root URL of the files of the model named *model*, *default* unless overridden with ``set_base_url``."""
+    return os.environ.get(f"METEOFETCH_BASE_URL_{model.upper()}") or os.environ.get("METEOFETCH_BASE_URL") or default
+
+
+def get_session() -> requests.Session:
+    """Return the ``requests.Session`` shared by all downloads and availability checks.
+
+    Reusing a single session keeps connections alive between requests to the same host,
+    which saves a TCP and TLS handshake per file.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=PROBE_WORKERS)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session.mount("file://", FileAdapter())
+        return _session
+
+
+class RateLimiter:
+    """Cap on the total download bandwidth, shared by all download threads and coroutines.
+
+    Each downloaded chunk is given a time slot after the previous ones; the caller waits
+    for the delay returned by ``reserve`` before reading the next chunk.
+
+    Args:
+        max_bandwidth: Maximum bandwidth, in bytes per second.
+    """
+
+    def __init__(self, max_bandwidth: float):
+        if max_bandwidth <= 0:
+            raise ValueError(f"max_bandwidth must be positive, got {max_bandwidth!r}")
+        self.max_bandwidth = max_bandwidth
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"RateLimiter({self.max_bandwidth / 1e6:g} MB/s)"
+
+    def reserve(self, nbytes: int) -> float:
+        """Account for *nbytes* just downloaded, and return how long to wait (in seconds)."""
+        with self._lock:
+            now = time.monotonic()
+            self._next = max(self._next, now) + nbytes / self.max_bandwidth
+            return self._next - now
+
+
+def set_bandwidth_limit(max_bandwidth: Optional[float]) -> Optional[RateLimiter]:
+    """Cap the total bandwidth used by downloads, across all models and threads.
+
+    Args:
+        max_bandwidth: Maximum bandwidth in MB/s (10**6 bytes per second), or ``None``
+            to remove the limit.
+
+    Returns:
+        The previous limiter (``None`` if there was none), e.g. to restore it later.
+    """
+    return set_rate_limiter(None if max_bandwidth is None else RateLimiter(max_bandwidth * 1e6))
+
+
+def set_rate_limiter(limiter: Optional[RateLimiter]) -> Optional[RateLimiter]:
+    """Install *limiter* for all downloads (see ``set_bandwidth_limit``) and return the previous one."""
+    global _rate_limiter
+    previous, _rate_limiter = _rate_limiter, limiter
+    return previous
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Return the limiter set by ``set_bandwidth_limit``, or ``None``."""
+    return _rate_limiter
+
+
 def is_downloadable(url: str, return_date: bool = False) -> Union[bool, datetime]:
     """Check whether a URL points to a downloadable (non-HTML) resource.
 
@@ -146,7 +338,7 @@ def is_downloadable(url: str, return_date: bool = False) -> Union[bool, datetime
     """
     logger.debug("Checking availability of %s", url)
     try:
-        h = requests.head(url, allow_redirects=True, timeout=10)
+        h = get_session().head(url, allow_redirects=True, timeout=10)
         if h.status_code != 200:
             return False
         if "text/html" in h.headers.get("Content-Type", "").lower():
@@ -162,28 +354,29 @@ def is_downloadable(url: str, return_date: bool = False) -> Union[bool, datetime
         return False
 
 
-def are_downloadable(urls: List[str], return_date: bool = False) -> Union[bool, datetime]:
-    """Check whether *all* URLs in a list point to downloadable resources.
-
-    Runs ``is_downloadable`` in parallel via a thread pool.
+def probe_urls(urls: Iterable[str], return_date: bool = False) -> Dict[str, Union[bool, datetime]]:
+    """Run ``is_downloadable`` on many URLs at once, through a single bounded thread pool.
 
-    Args:
-        urls: List of URLs to probe.
-        return_date: If True, return the maximum ``Last-Modified`` date across
-            all URLs when every URL is available, or ``False`` otherwise.
+    The pool has as many workers as the shared session keeps connections, so all the
+    requests reuse kept-alive connections. Duplicate URLs are only probed once.
 
     Returns:
-        ``True`` / ``datetime`` if all URLs are downloadable, ``False`` otherwise.
+        Dict mapping each URL to the result of ``is_downloadable``.
     """
-    with ThreadPoolExecutor() as executor:
-        # Utiliser executor.map pour appliquer la fonction is_downloadable à chaque URL
-        results = list(executor.map(lambda url: is_downloadable(url, return_date), urls))
+    unique = list(dict.fromkeys(urls))
+    if not unique:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(PROBE_WORKERS, len(unique))) as executor:
+        return dict(zip(unique, executor.map(lambda url: is_downloadable(url, return_date), unique)))
+
 
+def combine_availability(results: List[Union[bool, datetime]], return_date: bool = False) -> Union[bool, datetime]:
+    """Combine the ``is_downloadable`` results of the files of a run (see ``are_downloadable``)."""
     if return_date:
         # Filtrer les résultats pour obtenir uniquement les dates valides
         valid_dates = [result for result in results if isinstance(result, datetime)]
         # Vérifier si toutes les URLs sont téléchargeables et si des dates valides sont présentes
-        if len(valid_dates) == len(urls):
+        if len(valid_dates) == len(results):
             # Renvoie la date maximale
             return max(valid_dates)
         else:
@@ -191,3 +384,20 @@ def are_downloadable(urls: List[str], return_date: bool = False) -> Union[bool,
     else:
         # Renvoie True si toutes les URLs sont téléchargeables, False sinon
         return all(results)
+
+
+def are_downloadable(urls: List[str], return_date: bool = False) -> Union[bool, datetime]:
+    """Check whether *all* URLs in a list point to downloadable resources.
+
+    Runs ``is_downloadable`` in parallel via ``probe_urls``.
+
+    Args:
+        urls: List of URLs to probe.
+        return_date: If True, return the maximum ``Last-Modified`` date across
+            all URLs when every URL is available, or ``False`` otherwise.
+
+    Returns:
+        ``True`` / ``datetime`` if all URLs are downloadable, ``False`` otherwise.
+    """
+    results = probe_urls(urls, return_date)
+    return combine_availability([results[url] for url in urls], return_date)
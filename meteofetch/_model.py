@@ -1,24 +1,149 @@
+import asyncio
+import atexit
 import logging
 import os
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from glob import glob
-from multiprocessing import Pool
+from itertools import islice, takewhile
+from multiprocessing.pool import Pool
 from os.path import basename, getsize
 from pathlib import Path
 from platform import system
-from shutil import copyfileobj
+from shutil import copyfileobj, rmtree
 from subprocess import CalledProcessError, run
-from typing import Dict, List, Union
+from tempfile import TemporaryDirectory, mkdtemp
+from time import sleep, time
+from typing import Callable, Deque, Dict, Iterator, List, Literal, Optional, Tuple, Union
 
 import cfgrib
+import numpy as np
 import pandas as pd
 import requests
+import urllib3
 import xarray as xr
 
-from ._misc import geo_encode_cf
+from ._aio import adownload_urls
+from ._buffer import FieldBuffer
+from ._cache import get_cache
+from ._eccodes import open_datasets
+from ._index import get_cache_dir
+from ._misc import (
+    PACKING_KEYS,
+    ForecastNotAvailableError,
+    Packing,
+    RateLimiter,
+    are_downloadable,
+    geo_encode_cf,
+    get_base_url,
+    get_grib_engine,
+    get_rate_limiter,
+    get_session,
+    is_downloadable,
+    is_test_mode,
+    probe_urls,
+)
+from ._pool import decode_pool, use_grib_defs
+from ._resume import finalize, part_path, resume_headers, resume_offset, resume_plan
+from ._retry import CircuitOpenError, get_retry_policy
+from ._spatial import BBox, Points, crop
+from ._store import Compressor, Format, write_store
+from ._sync import SyncResult, is_current, load_manifest, remote_validators, save_manifest
+from ._transfer import receive_fields, release_fields, release_pending, share_fields
 
 logger = logging.getLogger(__name__)
 
+Backend = Literal["threads", "async"]
+
+CHUNK_SIZE = 1024 * 1024 * 64
+
+# Derniers runs trouvés par get_latest_forecast_time : clé -> (run, instant de la recherche)
+_latest_runs: Dict[tuple, Tuple[pd.Timestamp, float]] = {}
+
+# Dossiers des appels lazy=True de ce processus, supprimés à sa sortie
+_lazy_dirs: List[Path] = []
+
+
+@atexit.register
+def _remove_lazy_dirs() -> None:
+    for path in _lazy_dirs:
+        rmtree(path, ignore_errors=True)
+
+
+def _copy_response(r: requests.Response, f, limiter: Optional[RateLimiter] = None) -> None:
+    """Write the body of a streamed response to *f*, within the bandwidth limit of *limiter*.
+
+    *limiter* defaults to the one of ``set_bandwidth_limit``, if any.
+    """
+    limiter = limiter or get_rate_limiter()
+    if limiter is None:
+        copyfileobj(r.raw, f, length=CHUNK_SIZE)
+        return
+    # Blocs plus petits pour lisser le débit
+    for chunk in iter(lambda: r.raw.read(1024 * 1024), b""):
+        f.write(chunk)
+        sleep(limiter.reserve(len(chunk)))
+
+
+def _download_ranges(
+    url: str, ranges: List[Tuple[int, int]], part: Path, timeout, limiter: Optional[RateLimiter] = None
+) -> bool:
+    """Write the byte *ranges* of *url* one after the other to *part* (see ``_copy_response`` for *limiter*).
+
+    Returns:
+        ``False`` if the server ignored the ``Range`` header (the whole file must be downloaded).
+    """
+    with open(part, "wb") as f:
+        for start, end in ranges:
+            headers = {"Range": f"bytes={start}-{end}"}
+            with get_session().get(url, headers=headers, stream=True, timeout=timeout) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    return False
+                _copy_response(r, f, limiter)
+    return True
+
+
+def lead_range(steps: Optional[slice] = None, max_lead: Optional[int] = None) -> Optional[slice]:
+    """Lead hours requested with the ``steps`` or ``max_lead`` argument of ``get_forecast``.
+
+    Args:
+        steps: ``slice(first, last[, step])`` of lead hours; *last* is included, as in ``.sel``.
+        max_lead: Last lead hour, equivalent to ``steps=slice(None, max_lead)``.
+
+    Returns:
+        The slice of lead hours, or ``None`` to keep every lead time.
+
+    Raises:
+        ValueError: If both arguments are given, or *steps* is not a slice of hours.
+    """
+    if max_lead is not None:
+        if steps is not None:
+            raise ValueError("Pass either steps or max_lead, not both")
+        steps = slice(None, max_lead)
+    if steps is None:
+        return None
+    if not isinstance(steps, slice) or (steps.step is not None and steps.step <= 0):
+        raise ValueError(f"steps must be a slice of lead hours with a positive step, got {steps!r}")
+    return steps
+
+
+def _holds_leads(steps: slice, first: float, last: float) -> bool:
+    """Whether one of the lead hours selected by *steps* lies between *first* and *last*."""
+    start = steps.start or 0
+    stop = np.inf if steps.stop is None else steps.stop
+    step = steps.step or 1
+    lead = start + max(0, np.ceil((first - start) / step)) * step
+    return lead <= min(last, stop)
+
+
+def _lead_hours(date: pd.Timestamp, times: np.ndarray) -> np.ndarray:
+    """Lead hours of the valid *times* of the run *date*."""
+    date = pd.Timestamp(date)
+    run = np.datetime64(date.tz_convert(None) if date.tzinfo else date)
+    return (np.asarray(times) - run) / np.timedelta64(1, "h")
+
 
 class Model:
     TIMEOUT = 10
@@ -30,6 +155,11 @@ class Model:
     def __repr__(self):
         return f"{self.__class__.__name__}()"
 
+    @classmethod
+    def _base_url(cls) -> str:
+        """Root of the URLs of the model: ``base_url_``, unless overridden with ``set_base_url``."""
+        return get_base_url(cls.__name__, cls.base_url_)
+
     @classmethod
     def _iter_run_dates(cls) -> List[pd.Timestamp]:
         """Return candidate run timestamps in reverse-chronological order (UTC).
@@ -42,58 +172,733 @@ class Model:
         latest = pd.Timestamp.utcnow().floor(f"{freq}h")
         return [latest - pd.Timedelta(hours=freq * k) for k in range(cls.past_runs_)]
 
+    @classmethod
+    def _find_latest_run(
+        cls,
+        get_urls: Callable[[pd.Timestamp], List[str]],
+        key: tuple,
+        verify: bool = False,
+        before: Optional[pd.Timestamp] = None,
+    ) -> Optional[pd.Timestamp]:
+        """Return the most recent run whose files are published, with as few requests as possible.
+
+        Only the last file of each candidate run (the last one to be published) is probed.
+        With *verify*, all the files of the run found this way are then checked, and older
+        runs are tried if some are missing.
+
+        The result is cached for ``freq_update`` hours: in the meantime, only the runs more
+        recent than the cached one are probed.
+
+        Args:
+            get_urls: Returns the URLs of the files of a run, in publication order.
+            key: Cache key, identifying the model and the set of files.
+            verify: Check every file of the run before returning it.
+            before: Only consider the runs older than this one (the cache is then neither used nor updated).
+        """
+        dates = cls._iter_run_dates()
+        key = (cls.__name__, cls._base_url(), verify, *key)
+        cached = _latest_runs.get(key)
+        if before is not None:
+            dates, cached = [date for date in dates if date < before], None
+        elif cached is not None and time() - cached[1] < cls.freq_update * 3600 and cached[0] in dates:
+            dates = [date for date in dates if date > cached[0]]
+        else:
+            cached = None
+        for date in dates:
+            urls = get_urls(date)
+            if not is_downloadable(urls[-1]):
+                continue
+            if verify and not are_downloadable(urls):
+                logger.warning("%s run %s is only partially published", cls.__name__, date)
+                continue
+            if before is None:
+                _latest_runs[key] = (date, time())
+            return date
+        return cached[0] if cached is not None else None
+
     @staticmethod
     def _process_ds(ds):
         raise NotImplementedError
 
     @classmethod
-    def _url_to_file(cls, url: str, tempdir: str, num_retries: int = 1) -> Union[Path, bool]:
+    def _get_ranges(cls, url: str, variables: list) -> Optional[List[Tuple[int, int]]]:
+        """Return the inclusive byte ranges of the messages of *variables* in the remote file.
+
+        ``None`` means the layout of the file is unknown and it must be downloaded entirely.
+        Overridden by subclasses that know how to index their files.
+        """
+        return None
+
+    @classmethod
+    def _record_layout(cls, url: str, path: Path) -> None:
+        """Hook called after a full download made while byte ranges were requested."""
+
+    @classmethod
+    def _url_to_file(
+        cls,
+        url: str,
+        tempdir: str,
+        num_retries: int = 1,
+        variables: Optional[list] = None,
+        limiter: Optional[RateLimiter] = None,
+    ) -> Union[Path, bool]:
         """Télécharge un fichier depuis une URL et le sauvegarde dans un répertoire temporaire.
         En cas d'échec, la tentative est répétée jusqu'à num_retries fois supplémentaires.
         Utilise une taille de tampon de 64 Mo pour le téléchargement.
+
+        Le fichier est écrit dans ``<nom>.part``, puis renommé une fois sa taille et sa fin de
+        message GRIB vérifiées (voir ``_resume``) : une tentative interrompue reprend là où
+        la précédente s'est arrêtée, via une requête HTTP Range (avec If-Range, pour repartir
+        de zéro si le fichier distant a changé entre-temps).
+
+        Le délai entre deux tentatives, les délais d'attente et la suspension des requêtes
+        vers un serveur défaillant sont réglés par la politique de ``set_retry_policy``.
+
+        Si *variables* est renseigné et que l'index du fichier est connu (voir ``_get_ranges``),
+        seuls les messages GRIB de ces variables sont téléchargés, via des requêtes HTTP Range.
+        Si le serveur ignore ces requêtes, le fichier est téléchargé en entier.
+
+        Le débit est limité par *limiter*, ou à défaut par celui de ``set_bandwidth_limit``.
         """
+        temp_path = Path(tempdir) / os.path.basename(url).replace(":", "-")
+        part = part_path(temp_path)
+        ranges_part = part_path(temp_path, ranges=True)
+        policy = get_retry_policy()
+        timeout = policy.timeout(cls.TIMEOUT)
         for attempt in range(num_retries + 1):
             try:
-                temp_path = Path(tempdir) / os.path.basename(url).replace(":", "-")
-                with requests.get(url, stream=True, timeout=cls.TIMEOUT) as r:
-                    r.raise_for_status()
-                    with open(temp_path, "wb") as f:
-                        copyfileobj(r.raw, f, length=1024 * 1024 * 64)
+                sleep(policy.wait_time(url))
+                ranges = cls._get_ranges(url, variables) if variables else None
+                # Fichier partiel distinct : son contenu n'est pas un début du fichier distant
+                if ranges is not None and not _download_ranges(url, ranges, ranges_part, timeout, limiter):
+                    logger.warning("Range requests ignored by the server for %s, downloading the whole file", url)
+                    ranges_part.unlink()
+                    ranges = None
+                if ranges is None:
+                    offset = resume_offset(part)
+                    headers = resume_headers(part, offset)
+                    with get_session().get(url, headers=headers, stream=True, timeout=timeout) as r:
+                        start, size = resume_plan(part, offset, r.status_code, r.headers)
+                        r.raise_for_status()
+                        if start:
+                            logger.debug("Resuming %s at byte %d", url, start)
+                        with open(part, "ab" if start else "wb") as f:
+                            _copy_response(r, f, limiter)
+                    finalize(part, temp_path, size)
+                    if variables:
+                        cls._record_layout(url, temp_path)
+                else:
+                    finalize(ranges_part, temp_path, sum(end - start + 1 for start, end in ranges))
+                    logger.debug("Downloaded %d message range(s) of %s", len(ranges), url)
+                policy.record_success(url)
                 logger.debug("Downloaded %s", url)
                 return temp_path
-            except (requests.exceptions.RequestException, OSError) as e:
+            except CircuitOpenError as e:
+                logger.error("Download of %s skipped: %s", url, e)
+                return False
+            except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+                if not policy.record_failure(url, e):
+                    logger.error("Download of %s failed: %s", url, e)
+                    return False
                 if attempt < num_retries:
-                    logger.warning("Download attempt %d/%d failed for %s: %s — retrying", attempt + 1, num_retries + 1, url, e)
+                    delay = policy.delay(attempt)
+                    logger.warning(
+                        "Download attempt %d/%d failed for %s: %s — retrying in %.1f s",
+                        attempt + 1,
+                        num_retries + 1,
+                        url,
+                        e,
+                        delay,
+                    )
+                    sleep(delay)
                 else:
                     logger.error("All %d download attempt(s) failed for %s: %s", num_retries + 1, url, e)
         return False
 
     @classmethod
-    def _download_urls(cls, urls: List[str], path: str, num_workers: int, num_retries: int = 1) -> List[Union[Path, bool]]:
+    def _fetch_url(
+        cls,
+        url: str,
+        path: str,
+        num_retries: int = 1,
+        variables: Optional[list] = None,
+        limiter: Optional[RateLimiter] = None,
+    ) -> Union[Path, bool]:
+        """Return the local copy of *url* in *path*, from the persistent cache if enabled (see ``set_cache``)."""
+        cache = get_cache()
+        if cache is None:
+            return cls._url_to_file(url, path, num_retries, variables, limiter)
+        key = cache.key(cls.__name__, url, variables)
+        with cache.lock(key):
+            target = Path(path) / os.path.basename(url).replace(":", "-")
+            if cache.get(key, target):
+                return target
+            local_path = cls._url_to_file(url, path, num_retries, variables, limiter)
+            if local_path:
+                cache.put(key, local_path)
+            return local_path
+
+    @classmethod
+    def _download_urls(
+        cls, urls: List[str], path: str, num_workers: int, num_retries: int = 1, variables: Optional[list] = None
+    ) -> List[Union[Path, bool]]:
         """Download a list of URLs in parallel and return their local paths.
 
+        Files already present in the persistent cache (see ``set_cache``) are not downloaded again.
+
         Args:
             urls: Remote URLs to download.
             path: Directory where files are saved.
             num_workers: Number of parallel download threads.
             num_retries: Number of additional attempts per file on failure.
+            variables: If given, only the GRIB messages of these fields are downloaded
+                when the file can be indexed (byte-range mode).
 
         Returns:
             List of ``Path`` objects for successful downloads, ``False`` for failures.
         """
         with ThreadPoolExecutor(max_workers=num_workers) as executor:
-            paths = executor.map(lambda url: cls._url_to_file(url, path, num_retries), urls)
+            paths = executor.map(lambda url: cls._fetch_url(url, path, num_retries, variables), urls)
         return list(paths)
 
     @classmethod
-    def _read_grib(cls, path) -> List[xr.Dataset]:
+    def _check_downloads(cls, paths: List[Union[Path, bool]]) -> List[Path]:
+        """Return the downloaded paths, or an empty list if any file failed to download."""
+        if not all(paths):
+            logger.error("Some files could not be downloaded for %s", cls.__name__)
+            return []
+        return [p for p in paths if isinstance(p, Path)]
+
+    @classmethod
+    def _download_files(
+        cls,
+        urls: List[str],
+        path: str,
+        num_workers: int,
+        num_retries: int = 1,
+        variables: Optional[list] = None,
+        backend: Backend = "threads",
+    ) -> List[Path]:
+        """Download all *urls* into *path* with the chosen backend.
+
+        Returns an empty list if any file fails to download.
+        """
+        if backend == "threads":
+            paths = cls._download_urls(urls, path, num_workers, num_retries, variables)
+        elif backend == "async":
+            paths = asyncio.run(adownload_urls(cls, urls, path, num_workers, num_retries, variables))
+        else:
+            raise ValueError(f"backend must be 'threads' or 'async', got {backend!r}")
+        return cls._check_downloads(paths)
+
+    @classmethod
+    def _fetch(
+        cls,
+        urls: List[str],
+        variables: Optional[list],
+        path: Optional[str],
+        return_data: bool,
+        num_workers: int,
+        num_retries: int,
+        byte_range: bool = False,
+        backend: Backend = "threads",
+        pipeline: bool = False,
+        lazy: bool = False,
+        **read_options,
+    ) -> Union[Dict[str, xr.DataArray], List[Path]]:
+        """Download *urls* and read them, for the ``get_forecast`` methods of all models.
+
+        The options below are shared by ``get_forecast``, ``get_latest_forecast``,
+        ``iter_forecast``, ``watch_run`` and their coroutine versions, whose docstrings only
+        summarize them.
+
+        Args:
+            urls: URLs of the GRIB files to fetch.
+            variables: Field names to keep. If ``None``, all fields are returned.
+            path: Directory for GRIB files. Uses a temporary directory if ``None``.
+            return_data: If ``True``, load data into memory and return a dict of
+                DataArrays. If ``False``, save files to *path* and return their paths.
+            num_workers: Parallel download/read workers.
+            num_retries: Extra download attempts per file on failure.
+            byte_range: If ``True`` and *variables* is given, only the GRIB messages of
+                these fields are downloaded, using HTTP Range requests.
+            backend: Download engine: ``"threads"`` (default) or ``"async"`` (requires ``httpx``).
+            pipeline: If ``True``, each file is decoded as soon as it is downloaded, so that
+                downloads and decoding overlap. Files of the temporary directory are deleted
+                as soon as they are read. Ignored when ``return_data=False``.
+            lazy: If ``True``, return dask-backed DataArrays (requires ``dask``): files are
+                kept on disk (in *path*, or in the ``lazy/`` folder of the meteofetch cache
+                directory) and values are only decoded when computed.
+            **read_options: Forwarded to ``_read_fields``:
+
+                - ``bbox``: ``(lon_min, lat_min, lon_max, lat_max)``: fields are cropped to this
+                  box right after decoding, which saves memory and processing time.
+                - ``points``: ``[(lon, lat), ...]``: only the grid points nearest to these
+                  locations are kept, along a new ``point`` dimension.
+                - ``dtype``: e.g. ``"float16"``: fields are cast to this dtype as soon as they
+                  are decoded, which reduces the memory used by the run.
+                - ``packing``: ``"int16"`` or ``"int8"``: fields are CF-packed when written to
+                  NetCDF/Zarr, with a ``scale_factor`` and ``add_offset`` computed from the range
+                  of each field (see ``geo_encode_cf``).
+
+        The ``steps`` and ``max_lead`` arguments of the public methods are described in ``lead_range``.
+
+        Raises:
+            ValueError: If *path* is ``None`` and ``return_data`` is ``False``.
+        """
+        if (path is None) and (not return_data):
+            raise ValueError("Le chemin doit être spécifié si return_data est False.")
+
+        if lazy and return_data:
+            # Les fichiers doivent survivre à l'appel : ils sont conservés dans le dossier géré par meteofetch
+            if path is None:
+                path = str(cls._lazy_dir())
+            paths = cls._download_files(
+                urls, path, num_workers, num_retries, variables=variables if byte_range else None, backend=backend
+            )
+            return cls._read_lazy(paths, variables, **read_options)
+
+        with TemporaryDirectory(prefix="meteofetch_") as tempdir:
+            in_tempdir = path is None
+            path = tempdir if path is None else path
+            if pipeline and return_data:
+                datasets = cls._download_and_read(
+                    urls,
+                    path,
+                    variables,
+                    num_workers,
+                    num_retries,
+                    byte_range=byte_range,
+                    delete=in_tempdir,
+                    **read_options,
+                )
+            else:
+                paths = cls._download_files(
+                    urls, path, num_workers, num_retries, variables=variables if byte_range else None, backend=backend
+                )
+                if not return_data:
+                    return paths
+                datasets = cls._read_multiple_gribs(
+                    paths=paths, variables=variables, num_workers=num_workers, **read_options
+                )
+            if in_tempdir:
+                for da in datasets.values():
+                    da.load()
+            return datasets
+
+    @classmethod
+    def _fetch_groups(
+        cls,
+        groups: Dict[str, List[str]],
+        variables: Optional[list],
+        path: Optional[str],
+        return_data: bool,
+        num_workers: int,
+        num_retries: int,
+        byte_range: bool = False,
+        backend: Backend = "threads",
+        lazy: bool = False,
+        **read_options,
+    ) -> Union[Dict[str, Dict[str, xr.DataArray]], List[Path]]:
+        """Download and read several groups of files (e.g. paquets of a run) in a single call.
+
+        Unlike one ``_fetch`` call per group, all the files share one temporary directory,
+        one download pool and one decoding pool: each file is decoded as soon as it is
+        downloaded, whatever its group. The fields of each group are merged separately.
+
+        Args:
+            groups: URLs of each group, keyed by group name.
+
+        The other arguments are those of ``_fetch``.
+
+        Returns:
+            Dict mapping each group name to its fields, or the list of all downloaded paths
+            when ``return_data=False``. Empty if any file fails to download.
+        """
+        if (path is None) and (not return_data):
+            raise ValueError("Le chemin doit être spécifié si return_data est False.")
+
+        urls = [url for group in groups.values() for url in group]
+        if lazy and return_data:
+            fetch = partial(
+                cls._fetch,
+                variables=variables,
+                path=path,
+                return_data=True,
+                num_workers=num_workers,
+                num_retries=num_retries,
+                byte_range=byte_range,
+                backend=backend,
+                lazy=True,
+                **read_options,
+            )
+            ret = {name: fetch(urls=group) for name, group in groups.items()}
+            return ret if all(ret.values()) else {}
+
+        download_variables = variables if byte_range else None
+        with TemporaryDirectory(prefix="meteofetch_") as tempdir:
+            in_tempdir = path is None
+            path = tempdir if path is None else path
+            if not return_data or backend != "threads":
+                paths = cls._download_files(urls, path, num_workers, num_retries, download_variables, backend)
+                if not return_data:
+                    return paths
+                if not paths:
+                    return {}
+                ret, start = {}, 0
+                for name, group in groups.items():
+                    ret[name] = cls._read_multiple_gribs(
+                        paths[start : start + len(group)], variables, num_workers, **read_options
+                    )
+                    start += len(group)
+            else:
+                with decode_pool(num_workers) as pool, ThreadPoolExecutor(max_workers=num_workers) as executor:
+                    decoding = {
+                        name: cls._submit_download_and_read(
+                            group, path, variables, executor, pool, num_retries, byte_range, **read_options
+                        )
+                        for name, group in groups.items()
+                    }
+                    ret = {
+                        name: cls._collect_fields(futures, delete=in_tempdir, leads=cls._count_leads(groups[name]))
+                        for name, futures in decoding.items()
+                    }
+                if not all(ret.values()):
+                    return {}
+            if in_tempdir:
+                for fields in ret.values():
+                    for da in fields.values():
+                        da.load()
+            return ret
+
+    @classmethod
+    async def _afetch(
+        cls,
+        urls: List[str],
+        variables: Optional[list],
+        path: Optional[str],
+        return_data: bool,
+        num_workers: int,
+        num_retries: int,
+        byte_range: bool = False,
+        client=None,
+        **read_options,
+    ) -> Union[Dict[str, xr.DataArray], List[Path]]:
+        """Coroutine counterpart of ``_fetch``: downloads on the running event loop, reads in a thread."""
+        if (path is None) and (not return_data):
+            raise ValueError("Le chemin doit être spécifié si return_data est False.")
+
+        loop = asyncio.get_running_loop()
+        with TemporaryDirectory(prefix="meteofetch_") as tempdir:
+            in_tempdir = path is None
+            path = tempdir if path is None else path
+            paths = await adownload_urls(
+                cls, urls, path, num_workers, num_retries, variables if byte_range else None, client=client
+            )
+            paths = cls._check_downloads(paths)
+            if not return_data:
+                return paths
+            read = partial(
+                cls._read_multiple_gribs, paths=paths, variables=variables, num_workers=num_workers, **read_options
+            )
+            datasets = await loop.run_in_executor(None, read)
+            if in_tempdir:
+                for da in datasets.values():
+                    da.load()
+            return datasets
+
+    @classmethod
+    def _iter_fetch(
+        cls,
+        urls: List[str],
+        variables: Optional[list],
+        path: Optional[str],
+        num_workers: int,
+        num_retries: int,
+        byte_range: bool = False,
+        date: Optional[pd.Timestamp] = None,
+        steps: Optional[slice] = None,
+        packed: Optional[Dict[str, dict]] = None,
+        **read_options,
+    ) -> Iterator[Tuple[pd.Timestamp, Dict[str, xr.DataArray]]]:
+        """Download and read *urls* one file at a time, yielding the fields of each valid time.
+
+        At most *num_workers* files are downloaded ahead of the one being read, and files
+        of the temporary directory are deleted once read, so memory and disk usage do not
+        depend on the number of groups. With *steps*, only the lead hours it selects from
+        the run *date* are yielded (see ``lead_range``).
+
+        With ``packing``, the scale of each field is computed from the first file read, and
+        kept for the whole run so that every valid time is encoded the same way (*packed*
+        holds these encodings, to share them between calls). Values of later valid times
+        outside of that range are clipped by ``to_store`` (see its ``packing_range`` argument).
+
+        Raises:
+            ForecastNotAvailableError: If a file cannot be downloaded.
+        """
+        download_variables = variables if byte_range else None
+        packed = {} if packed is None else packed
+        with TemporaryDirectory(prefix="meteofetch_") as tempdir:
+            in_tempdir = path is None
+            path = tempdir if path is None else path
+            with ThreadPoolExecutor(max_workers=num_workers) as executor:
+                pending: Deque[Tuple[str, Future]] = deque()
+                remaining = iter(urls)
+                for url in remaining:
+                    pending.append((url, executor.submit(cls._fetch_url, url, path, num_retries, download_variables)))
+                    if len(pending) >= num_workers:
+                        break
+                while pending:
+                    url, download = pending.popleft()
+                    local_path = download.result()
+                    for next_url in islice(remaining, 1):
+                        future = executor.submit(cls._fetch_url, next_url, path, num_retries, download_variables)
+                        pending.append((next_url, future))
+                    if not local_path:
+                        raise ForecastNotAvailableError(f"{url} could not be downloaded.")
+
+                    ret = cls._read_fields(local_path, variables, **read_options)
+                    fields = {field: da.load() for field, da in cls._concat_fields(ret).items()}
+                    for field, da in fields.items():
+                        # Échelle de compactage du premier fichier, gardée pour tout le run
+                        if field not in packed:
+                            packed[field] = {k: da.encoding[k] for k in PACKING_KEYS if "scale_factor" in da.encoding}
+                        da.encoding.update(packed[field])
+                    if in_tempdir:
+                        Path(local_path).unlink(missing_ok=True)
+
+                    times = sorted({t for da in fields.values() for t in da["time"].values})
+                    if steps is not None:
+                        leads = _lead_hours(date, times)
+                        times = [t for t, lead in zip(times, leads) if _holds_leads(steps, lead, lead)]
+                    for t in times:
+                        yield (
+                            pd.Timestamp(t),
+                            {
+                                field: geo_encode_cf(da.sel(time=[t]))
+                                for field, da in fields.items()
+                                if t in da["time"].values
+                            },
+                        )
+
+    @classmethod
+    def _sync(
+        cls, urls: List[str], path: Union[str, Path], num_workers: int, num_retries: int, mirror: bool = False
+    ) -> SyncResult:
+        """Download into *path* the files of *urls* that are missing or changed since the last sync.
+
+        The remote ``ETag``, ``Last-Modified`` and ``Content-Length`` headers of every file are
+        probed at once, and compared with those recorded in the manifest of *path* (see ``_sync``
+        module). The manifest is updated for the files downloaded successfully. Files are always
+        downloaded from the server: the persistent cache (see ``set_cache``) would return the
+        previous version of a changed file.
+
+        With *mirror*, each file is saved under its upstream path relative to the root URL of
+        the model, so that *path* can replace it (see ``set_base_url``). Otherwise, all the
+        files are saved directly in *path*.
+
+        Raises:
+            ForecastNotAvailableError: If a file cannot be downloaded.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        manifest = load_manifest(path)
+        if mirror:
+            root = cls._base_url()
+            names = [url[len(root) + 1 :] for url in urls]
+        else:
+            names = [os.path.basename(url).replace(":", "-") for url in urls]
+
+        def fetch(url: str, name: str) -> Union[Path, bool]:
+            target = path / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            local_path = cls._url_to_file(url, str(target.parent), num_retries)
+            if local_path and local_path != target:
+                # Le miroir garde les noms amont (avec « : »)
+                os.replace(local_path, target)
+                local_path = target
+            return local_path
+
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            remote = list(executor.map(lambda url: remote_validators(url, cls.TIMEOUT), urls))
+            todo = [
+                (url, name, validators)
+                for url, name, validators in zip(urls, names, remote)
+                if not is_current(manifest.get(name), validators, path / name)
+            ]
+            logger.info("%s: %d of %d file(s) to update in %s", cls.__name__, len(todo), len(urls), path)
+            downloads = list(executor.map(lambda item: fetch(item[0], item[1]), todo))
+
+        updated, failed = [], []
+        for (url, name, validators), local_path in zip(todo, downloads):
+            if not local_path:
+                failed.append(url)
+                continue
+            manifest[name] = {"url": url, **(validators or {})}
+            updated.append(local_path)
+        save_manifest(path, manifest)
+        if failed:
+            raise ForecastNotAvailableError(f"{len(failed)} file(s) could not be downloaded, e.g. {failed[0]}")
+        return SyncResult([path / name for name in names], updated)
+
+    @classmethod
+    def _watch_fetch(
+        cls,
+        urls: List[str],
+        variables: Optional[list],
+        path: Optional[str],
+        num_workers: int,
+        num_retries: int,
+        byte_range: bool = False,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+        **options,
+    ) -> Iterator[Tuple[pd.Timestamp, Dict[str, xr.DataArray]]]:
+        """Download and read *urls* as they are published, yielding the fields of each valid time.
+
+        Files are published in the order of *urls*: only the next *num_workers* files still
+        missing are probed (HEAD requests), every *poll_interval* seconds, and those already
+        published are read with ``_iter_fetch``.
+
+        Raises:
+            ForecastNotAvailableError: If a file cannot be downloaded, or the run is not complete
+                after *timeout* seconds without any new file.
+        """
+        pending = list(urls)
+        packed: Dict[str, dict] = {}
+        deadline = None if timeout is None else time() + timeout
+        while pending:
+            window = pending[: max(num_workers, 1)]
+            published = probe_urls(window)
+            ready = list(takewhile(lambda url: published[url], window))
+            if ready:
+                logger.info("%d new file(s) published for %s", len(ready), cls.__name__)
+                yield from cls._iter_fetch(
+                    ready, variables, path, num_workers, num_retries, byte_range, packed=packed, **options
+                )
+                pending = pending[len(ready) :]
+                deadline = None if timeout is None else time() + timeout
+                continue
+            if deadline is not None and time() >= deadline:
+                raise ForecastNotAvailableError(
+                    f"{len(pending)} file(s) of the {cls.__name__} run not published after {timeout} s, "
+                    f"starting with {pending[0]}"
+                )
+            logger.debug("Waiting %.0f s for %s", poll_interval, pending[0])
+            sleep(poll_interval)
+
+    @classmethod
+    def to_store(
+        cls,
+        store: Union[str, Path],
+        format: Format = "zarr",
+        chunks: Optional[Dict[str, int]] = None,
+        compressor: Compressor = "zlib",
+        complevel: Optional[int] = None,
+        mode: Literal["w", "a"] = "w",
+        packing_range: Optional[Dict[str, Tuple[float, float]]] = None,
+        **kwargs,
+    ) -> Path:
+        """Archive a forecast run to a Zarr store or to NetCDF files, one valid time at a time.
+
+        Fields are appended along ``time`` as soon as they are decoded (see ``iter_forecast``),
+        so the run is never held in memory. Requires ``zarr`` or ``netCDF4``.
+
+        Args:
+            store: Zarr store path (one group per field), or directory of NetCDF files (``{field}.nc``).
+            format: ``"zarr"`` or ``"netcdf"``.
+            chunks: Chunk size per dimension (e.g. ``{"latitude": 256, "longitude": 256}``).
+                By default, each chunk holds one valid time of a whole field.
+            compressor: ``"zlib"``, ``"zstd"`` or ``"blosc"``.
+            complevel: Compression level. Defaults to 6 for zlib, 3 for zstd and 5 for blosc.
+            mode: ``"w"`` to overwrite fields already in the store, ``"a"`` to append to them.
+            packing_range: With ``packing``, ``(min, max)`` of the values to represent, per field
+                (e.g. ``{"t2m": (200, 340)}``), so that the scale fits every valid time and every
+                run appended to the store. Without it, the scale is computed from the first file
+                of the run, and later values outside of it are clipped.
+            **kwargs: Arguments of ``iter_forecast`` (``date``, ``paquet``, ``variables``, ``bbox``...).
+
+        Returns:
+            Path of the store.
+
+        Raises:
+            ForecastNotAvailableError: If a file cannot be downloaded.
+        """
+        logger.info("Writing %s forecast to %s (%s)", cls.__name__, store, format)
+        return write_store(
+            cls.iter_forecast(**kwargs),
+            store,
+            format=format,
+            chunks=chunks,
+            compressor=compressor,
+            complevel=complevel,
+            mode=mode,
+            packing=kwargs.get("packing"),
+            packing_range=packing_range,
+        )
+
+    @classmethod
+    def _group_leads(cls, group) -> Tuple[int, int]:
+        """First and last lead hours held by the files of *group* (an element of ``groups_``)."""
+        raise NotImplementedError
+
+    @classmethod
+    def _select_groups(cls, groups: tuple, steps: Optional[slice]) -> tuple:
+        """The groups of *groups* holding at least one of the lead hours of *steps* (see ``lead_range``).
+
+        Raises:
+            ValueError: If no group holds these lead hours.
+        """
+        if steps is None:
+            return groups
+        selected = tuple(group for group in groups if _holds_leads(steps, *cls._group_leads(group)))
+        if not selected:
+            raise ValueError(f"No {cls.__name__} file holds the lead hours {steps}")
+        return selected
+
+    @staticmethod
+    def _select_leads(fields: Dict[str, xr.DataArray], date: pd.Timestamp, steps: Optional[slice]):
+        """Keep the lead hours of *steps* in *fields* (files holding several lead times may hold others too)."""
+        if steps is None:
+            return fields
+        ret = {}
+        for name, da in fields.items():
+            if "time" in da.dims:
+                leads = _lead_hours(date, da["time"].values)
+                da = da.isel(time=[i for i, lead in enumerate(leads) if _holds_leads(steps, lead, lead)])
+            ret[name] = da
+        return ret
+
+    @classmethod
+    def _file_leads(cls, name: str) -> int:
+        """Number of lead times in the file *name* (URL or local path); one by default."""
+        return 1
+
+    @classmethod
+    def _count_leads(cls, names: List[Union[str, Path]]) -> int:
+        """Number of lead times expected in the files *names*, used to size the output arrays."""
+        return sum(cls._file_leads(basename(str(name))) for name in names)
+
+    @classmethod
+    def _read_grib(cls, path, lazy: bool = False, engine: Optional[str] = None) -> List[xr.Dataset]:
         """Open a GRIB2 file and return a list of datasets (one per variable group).
 
         On Windows, cfgrib cannot handle files larger than 2 GB. In that case the
         file is first split into per-variable files using ``grib_copy``, then each
         split file is opened individually.
+
+        With *lazy*, datasets are backed by dask arrays (one chunk per field and file):
+        only the message index is built, values are decoded on access.
+
+        With ``engine="eccodes"`` (see ``set_grib_engine``), messages are decoded directly
+        with eccodes (see ``_eccodes``), unless the file needs cfgrib.
         """
+        if getsize(path) == 0:
+            # Téléchargement partiel sans aucun message des variables demandées
+            return []
         kw = dict(backend_kwargs={"decode_timedelta": True, "indexpath": ""}, cache=False)
+        if lazy:
+            kw["chunks"] = {}
         if system() == "Windows" and getsize(path) >= 2**31:
             file_name = basename(path).split(".")[0]
             path_split = Path(path).parent / f"split_{file_name}_[shortName].grib2"
@@ -108,18 +913,66 @@ class Model:
                 return datasets
             except CalledProcessError:
                 raise
-        else:
-            # Cas le plus courant
-            return cfgrib.open_datasets(path=path, **kw)
+        if (engine or get_grib_engine()) == "eccodes" and not lazy:
+            datasets = open_datasets(path)
+            if datasets is not None:
+                return datasets
+            logger.debug("Decoding %s with cfgrib: grid not supported by the eccodes engine", path)
+        # Cas le plus courant
+        return cfgrib.open_datasets(path=path, **kw)
 
     @classmethod
-    def _read_multiple_gribs(cls, paths, variables, num_workers) -> Dict[str, xr.DataArray]:
+    def _lazy_dir(cls) -> Path:
+        """Create the directory of the files of a ``lazy=True`` call, in ``lazy/<model>`` of ``get_cache_dir()``.
+
+        Each call gets its own directory, removed at the exit of the process, so that the files
+        behind the returned arrays are never overwritten nor deleted while in use. Directories
+        left by other processes are removed once older than the oldest run still published.
+        """
+        root = get_cache_dir() / "lazy" / cls.__name__
+        root.mkdir(parents=True, exist_ok=True)
+        max_age = cls.past_runs_ * (cls.freq_update or 0) * 3600
+        for entry in root.iterdir():
+            if entry in _lazy_dirs:
+                continue
+            try:
+                if time() - entry.stat().st_mtime > max_age:
+                    if entry.is_dir():
+                        rmtree(entry)
+                    else:
+                        entry.unlink()
+            except OSError:
+                continue
+        path = Path(mkdtemp(dir=root))
+        _lazy_dirs.append(path)
+        return path
+
+    @classmethod
+    def _read_lazy(cls, paths: List[Path], variables: Optional[list], **read_options) -> Dict[str, xr.DataArray]:
+        """Open GRIB files as dask-backed DataArrays, without decoding any value.
+
+        Only the index of each file is built here; values are decoded when the
+        returned arrays (or slices of them) are computed.
+        """
+        try:
+            import dask  # noqa: F401
+        except ImportError as e:
+            raise ImportError("lazy=True requires dask: pip install dask") from e
+        ret: Dict[str, list] = {}
+        for path in paths:
+            cls._merge_fields(ret, cls._read_fields(path, variables, lazy=True, **read_options))
+        return cls._concat_fields(ret)
+
+    @classmethod
+    def _read_multiple_gribs(cls, paths, variables, num_workers, **read_options) -> Dict[str, xr.DataArray]:
         """Read GRIB files in parallel and merge results by field name.
 
         Args:
             paths: Local GRIB file paths to read.
             variables: If non-empty, only these field names are kept.
-            num_workers: Number of worker processes for parallel reading.
+            num_workers: Number of worker processes for parallel reading (ignored if a
+                persistent pool is active, see ``DecodePool``).
+            **read_options: Forwarded to ``_read_fields`` (e.g. ``bbox``, ``points``).
 
         Returns:
             Dict mapping field name → concatenated ``xr.DataArray`` (CF-encoded).
@@ -128,24 +981,242 @@ class Model:
             When test mode is active (see ``set_test_mode()``), field values are
             replaced with their ``isnull()`` boolean mask to avoid loading real data.
         """
-        ret: Dict[str, list] = {}
+        ret: Dict[str, FieldBuffer] = {}
+        leads = cls._count_leads(paths)
+
+        with decode_pool(num_workers) as pool:
+            read = cls._decoder(variables, **read_options)
+            results = pool.imap(read, paths)
+            try:
+                for fields in results:
+                    cls._write_fields(ret, receive_fields(fields), leads)
+            finally:
+                # Après une erreur, les fichiers restants sont supprimés pour libérer la mémoire partagée
+                release_pending(results)
 
-        with Pool(processes=num_workers) as pool:
-            for datasets in pool.imap(cls._read_grib, paths):
-                for ds in datasets:
-                    for _field in ds.data_vars:
-                        field = str(_field)
-                        if variables and field not in variables:
-                            continue
-                        if field not in ret:
-                            ret[field] = []
-                        if os.environ.get("METEOFETCH_TEST_MODE") == "1":  # set via set_test_mode()
-                            ds[field] = ds[field].isnull(keep_attrs=True)
-                        ret[field].append(cls._process_ds(ds[field]))
+        return cls._concat_fields(ret)
 
+    @classmethod
+    def _read_fields(
+        cls,
+        path,
+        variables: Optional[list] = None,
+        lazy: bool = False,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        engine: Optional[str] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+        test_mode: Optional[bool] = None,
+    ) -> Dict[str, List[xr.DataArray]]:
+        """Read one GRIB file and return its processed fields, keyed by field name.
+
+        Runs in the worker processes: fields are filtered, cropped to *bbox* / *points*
+        (see ``crop``) and processed (``_process_ds``) before being sent back, so that
+        only the data actually requested crosses the process boundary. *engine* and *test_mode*
+        default to those selected with ``set_grib_engine`` and ``set_test_mode``.
+
+        Fields are cast to *dtype* before being processed. *packing* is recorded in the
+        encoding of each field, and applied by ``geo_encode_cf`` once the field is assembled,
+        so that the scale is the same for all lead times.
+
+        Note:
+            When test mode is active (see ``set_test_mode()``), field values are
+            replaced with their ``isnull()`` boolean mask to avoid loading real data.
+        """
+        if test_mode is None:
+            test_mode = is_test_mode()
+        ret: Dict[str, List[xr.DataArray]] = {}
+        for ds in cls._read_grib(path, lazy=lazy, engine=engine):
+            ds = crop(ds, bbox=bbox, points=points)
+            for _field in ds.data_vars:
+                field = str(_field)
+                if variables and field not in variables:
+                    continue
+                if field not in ret:
+                    ret[field] = []
+                if test_mode:
+                    ds[field] = ds[field].isnull(keep_attrs=True)
+                elif dtype is not None:
+                    ds[field] = ds[field].astype(dtype)
+                da = cls._process_ds(ds[field])
+                if packing is not None:
+                    da.encoding["packing"] = packing
+                ret[field].append(da if lazy else da.load())
+        return ret
+
+    @classmethod
+    def _decoder(cls, variables: Optional[list], **read_options) -> Callable[[Path], Dict[str, list]]:
+        """``_decode_fields`` of *variables*, with the settings of the current process.
+
+        The decoding engine, the test mode and the GRIB definitions are passed explicitly: the
+        processes of a ``DecodePool`` may have been started before they were selected.
+        """
+        return partial(
+            cls._decode_fields,
+            definition_path=os.environ.get("ECCODES_DEFINITION_PATH"),
+            variables=variables,
+            engine=get_grib_engine(),
+            test_mode=is_test_mode(),
+            **read_options,
+        )
+
+    @classmethod
+    def _decode_fields(cls, path, definition_path: Optional[str], **read_options) -> Dict[str, list]:
+        """``_read_fields`` run in a decoding process: large fields are returned through shared memory.
+
+        Only the metadata of these fields is pickled back to the parent, which rebuilds
+        them without copying their values with ``receive_fields`` (see ``_transfer``).
+        The GRIB definitions of *definition_path* (see ``set_grib_defs``) are used.
+        """
+        use_grib_defs(definition_path)
+        return share_fields(cls._read_fields(path, **read_options))
+
+    @staticmethod
+    def _merge_fields(ret: Dict[str, list], fields: Dict[str, List[xr.DataArray]]) -> None:
+        """Append the fields read from one file (see ``_read_fields``) to *ret*."""
+        for field, pieces in fields.items():
+            ret.setdefault(field, []).extend(pieces)
+
+    @staticmethod
+    def _write_fields(ret: Dict[str, FieldBuffer], fields: Dict[str, List[xr.DataArray]], leads: int) -> None:
+        """Copy the fields read from one file into their buffers, allocated for *leads* lead times."""
+        for field, pieces in fields.items():
+            if field not in ret:
+                ret[field] = FieldBuffer(leads)
+            for da in pieces:
+                ret[field].append(da)
+
+    @staticmethod
+    def _concat_fields(ret: Dict[str, Union[list, FieldBuffer]]) -> Dict[str, xr.DataArray]:
+        """Assemble along ``time`` the pieces collected by ``_merge_fields`` or ``_write_fields``."""
         result: Dict[str, xr.DataArray] = {}
-        for field in ret:
-            result[field] = xr.concat(ret[field], dim="time", coords="minimal", compat="override")
+        for field, pieces in ret.items():
+            if isinstance(pieces, FieldBuffer):
+                result[field] = pieces.result()
+            else:
+                result[field] = xr.concat(pieces, dim="time", coords="minimal", compat="override")
             result[field] = geo_encode_cf(result[field])
 
         return result
+
+    @classmethod
+    def _download_and_read(
+        cls,
+        urls: List[str],
+        path: str,
+        variables: Optional[list],
+        num_workers: int,
+        num_retries: int = 1,
+        byte_range: bool = False,
+        delete: bool = False,
+        **read_options,
+    ) -> Dict[str, xr.DataArray]:
+        """Download and read *urls* as a pipeline: each file is decoded as soon as it lands.
+
+        Downloads run in a thread pool; each completed download is immediately handed to
+        the decoding process pool, so that network and CPU work overlap. Results are
+        merged in the order of *urls*.
+
+        Args:
+            urls: Remote URLs to download.
+            path: Directory where files are saved.
+            variables: If non-empty, only these field names are kept.
+            num_workers: Number of download threads, and of decoding processes (unless a
+                persistent pool is active, see ``DecodePool``).
+            num_retries: Number of additional download attempts per file on failure.
+            byte_range: Download only the messages of *variables* (see ``_url_to_file``).
+            delete: Delete each GRIB file once decoded, to bound disk usage.
+            **read_options: Forwarded to ``_read_fields`` (e.g. ``bbox``, ``points``).
+
+        Returns:
+            Same as ``_read_multiple_gribs``; empty if any file fails to download.
+        """
+        with decode_pool(num_workers) as pool, ThreadPoolExecutor(max_workers=num_workers) as executor:
+            decoding = cls._submit_download_and_read(
+                urls, path, variables, executor, pool, num_retries, byte_range, **read_options
+            )
+            return cls._collect_fields(decoding, delete, leads=cls._count_leads(urls))
+
+    @classmethod
+    def _submit_download_and_read(
+        cls,
+        urls: List[str],
+        path: str,
+        variables: Optional[list],
+        executor: ThreadPoolExecutor,
+        pool: Pool,
+        num_retries: int = 1,
+        byte_range: bool = False,
+        limiter: Optional[RateLimiter] = None,
+        **read_options,
+    ) -> List[Future]:
+        """Queue the downloads of *urls* on *executor*, each followed by its decoding on *pool*.
+
+        The bandwidth of the downloads is capped by *limiter* (see ``_url_to_file``).
+
+        Returns:
+            One future per URL, resolving to ``(local_path, fields)`` (``fields`` is ``None``
+            if the download failed), or to the exception raised by its download or decoding.
+        """
+        download_variables = variables if byte_range else None
+        decoding: List[Future] = [Future() for _ in urls]
+        read = cls._decoder(variables, **read_options)
+
+        def decode(i: int, download: Future) -> None:
+            # Les exceptions d'un done-callback sont ignorées : elles doivent résoudre decoding[i]
+            try:
+                local_path = download.result()
+                if not local_path:
+                    decoding[i].set_result((local_path, None))
+                    return
+                pool.apply_async(
+                    read,
+                    (local_path,),
+                    callback=lambda fields: decoding[i].set_result((local_path, fields)),
+                    error_callback=decoding[i].set_exception,
+                )
+            except BaseException as e:
+                decoding[i].set_exception(e)
+
+        for i, url in enumerate(urls):
+            download = executor.submit(cls._fetch_url, url, path, num_retries, download_variables, limiter)
+            download.add_done_callback(partial(decode, i))
+        return decoding
+
+    @classmethod
+    def _collect_fields(
+        cls, decoding: List[Future], delete: bool = False, leads: Optional[int] = None
+    ) -> Dict[str, xr.DataArray]:
+        """Merge, in order, the results of ``_submit_download_and_read``; empty if a download failed.
+
+        Each field is written, as soon as it is decoded, into a buffer allocated for *leads*
+        lead times (defaults to one per file, see ``_count_leads``).
+        """
+        ret: Dict[str, FieldBuffer] = {}
+        leads = leads or len(decoding)
+        failed = False
+        pending = iter(decoding)
+        try:
+            for future in pending:
+                local_path, fields = future.result()
+                if not local_path:
+                    failed = True
+                    continue
+                # Les champs sont repris même après un échec, pour libérer la mémoire partagée
+                fields = receive_fields(fields)
+                if not failed:
+                    cls._write_fields(ret, fields, leads)
+                if delete:
+                    Path(local_path).unlink(missing_ok=True)
+        finally:
+            # Après une erreur, on attend les décodages restants pour supprimer leurs fichiers
+            for future in pending:
+                try:
+                    release_fields(future.result()[1])
+                except Exception as e:
+                    logger.debug("Ignoring the result of a remaining decoding: %s", e)
+        if failed:
+            logger.error("Some files could not be downloaded for %s", cls.__name__)
+            return {}
+        return cls._concat_fields(ret)
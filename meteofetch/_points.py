@@ -0,0 +1,193 @@
+"""
+Vectorized extraction of time series at many sites (nearest grid point or bilinear interpolation).
+
+Grid indices and interpolation weights only depend on the grid definition and on the sites:
+they are computed once, cached, and then applied to every field and time step with a single
+NumPy fancy-indexing operation.
+"""
+
+from functools import lru_cache
+from typing import Dict, Literal, NamedTuple, Optional, Sequence, Tuple, TypeVar, Union
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+Method = Literal["nearest", "bilinear"]
+Sites = Sequence[Tuple[float, float]]
+
+T = TypeVar("T", xr.DataArray, Dict[str, xr.DataArray])
+
+
+class AxisWeights(NamedTuple):
+    """Linear interpolation along one axis: ``value = (1 - weight) * v[lower] + weight * v[upper]``."""
+
+    lower: np.ndarray
+    upper: np.ndarray
+    weight: np.ndarray
+    outside: np.ndarray
+
+
+def axis_weights(coord: np.ndarray, x: np.ndarray, periodic: bool = False) -> AxisWeights:
+    """Locate *x* on the 1D coordinate *coord* (in any order).
+
+    Args:
+        coord: Grid coordinate values, regularly spaced.
+        x: Positions to locate.
+        periodic: If ``True``, *coord* is a longitude axis: positions are wrapped, and
+            if the grid covers the whole globe, positions between the last and first
+            longitudes are interpolated across the antimeridian.
+    """
+    coord = np.asarray(coord, dtype=float)
+    x = np.asarray(x, dtype=float)
+    order = np.argsort(coord)
+    c = coord[order]
+    n = c.size
+    if n == 1:
+        zeros = np.zeros(x.shape, dtype=int)
+        return AxisWeights(order[zeros], order[zeros], np.zeros(x.shape), x != c[0])
+    step = (c[-1] - c[0]) / (n - 1)
+    is_global = periodic and abs(c[-1] - c[0] + step - 360.0) < step / 2
+    if is_global:
+        x = c[0] + (x - c[0]) % 360.0
+        j = np.clip(np.searchsorted(c, x, side="right") - 1, 0, n - 1)
+        j1 = np.where(j == n - 1, 0, j + 1)
+        c1 = np.where(j == n - 1, c[0] + 360.0, c[j1])
+        outside = np.zeros(x.shape, dtype=bool)
+    else:
+        if periodic:
+            # Longitudes exprimées dans l'intervalle de 360° centré sur le domaine.
+            center = (c[0] + c[-1]) / 2
+            x = center - 180.0 + (x - center + 180.0) % 360.0
+        j = np.clip(np.searchsorted(c, x, side="right") - 1, 0, n - 2)
+        j1 = j + 1
+        c1 = c[j1]
+        tolerance = 1e-6 * step
+        outside = (x < c[0] - tolerance) | (x > c[-1] + tolerance)
+    weight = (x - c[j]) / (c1 - c[j])
+    return AxisWeights(order[j], order[j1], weight, outside)
+
+
+@lru_cache(maxsize=32)
+def _grid_weights(grid: Tuple, sites: Tuple[Tuple[float, float], ...], method: Method):
+    """Cached flat indices and weights for a grid definition (see ``PointExtractor``)."""
+    lon = np.linspace(grid[0], grid[1], grid[2])
+    lat = np.linspace(grid[3], grid[4], grid[5])
+    sites_lon, sites_lat = np.asarray(sites, dtype=float).reshape(-1, 2).T
+    wx = axis_weights(lon, sites_lon, periodic=True)
+    wy = axis_weights(lat, sites_lat)
+    outside = wx.outside | wy.outside
+    nlon = lon.size
+    if method == "nearest":
+        ix = np.where(wx.weight <= 0.5, wx.lower, wx.upper)
+        iy = np.where(wy.weight <= 0.5, wy.lower, wy.upper)
+        indices = (iy * nlon + ix)[None, :]
+        weights = np.ones_like(indices, dtype=float)
+    elif method == "bilinear":
+        indices = np.stack(
+            [
+                wy.lower * nlon + wx.lower,
+                wy.lower * nlon + wx.upper,
+                wy.upper * nlon + wx.lower,
+                wy.upper * nlon + wx.upper,
+            ]
+        )
+        weights = np.stack(
+            [
+                (1 - wy.weight) * (1 - wx.weight),
+                (1 - wy.weight) * wx.weight,
+                wy.weight * (1 - wx.weight),
+                wy.weight * wx.weight,
+            ]
+        )
+    else:
+        raise ValueError(f"method must be 'nearest' or 'bilinear', got {method!r}")
+    weights[:, outside] = np.nan
+    return indices, weights
+
+
+def grid_definition(da: xr.DataArray) -> Tuple:
+    """Hashable definition of the regular grid of *da*: first/last value and size of each axis."""
+    lon, lat = da["longitude"].values, da["latitude"].values
+    return (float(lon[0]), float(lon[-1]), lon.size, float(lat[0]), float(lat[-1]), lat.size)
+
+
+class PointExtractor:
+    """Extract values at a fixed set of sites from fields defined on regular lat/lon grids.
+
+    Indices and weights are computed once per grid definition (and cached across instances),
+    so extracting thousands of sites from every field and time step of a run only costs one
+    fancy-indexing operation per field.
+
+    Args:
+        sites: ``[(lon, lat), ...]`` coordinates of the sites, in degrees.
+        method: ``"nearest"`` (value of the nearest grid point) or ``"bilinear"``.
+        names: Optional site identifiers, used as the ``site`` coordinate.
+
+    Sites outside the grid get ``NaN``. Values keep the dtype of the field if it is a float
+    dtype; other dtypes are promoted to the smallest float dtype holding them.
+    """
+
+    def __init__(self, sites: Sites, method: Method = "nearest", names: Optional[Sequence] = None):
+        self.sites = tuple((float(lon), float(lat)) for lon, lat in sites)
+        if method not in ("nearest", "bilinear"):
+            raise ValueError(f"method must be 'nearest' or 'bilinear', got {method!r}")
+        self.method = method
+        self.names = list(range(len(self.sites))) if names is None else list(names)
+        if len(self.names) != len(self.sites):
+            raise ValueError("names must have the same length as sites")
+
+    def __repr__(self):
+        return f"PointExtractor({len(self.sites)} sites, method={self.method!r})"
+
+    def __call__(self, da: xr.DataArray) -> xr.DataArray:
+        """Return *da* at the sites, with the ``latitude`` and ``longitude`` dimensions replaced by ``site``."""
+        indices, weights = _grid_weights(grid_definition(da), self.sites, self.method)
+        da = da.transpose(..., "latitude", "longitude")
+        values = da.values.reshape(*da.shape[:-2], -1)
+        dtype = np.promote_types(values.dtype, np.float16)
+        if self.method == "nearest":
+            extracted = values[..., indices[0]]
+            outside = np.isnan(weights[0])
+            if outside.any():
+                extracted = extracted.astype(dtype)
+                extracted[..., outside] = np.nan
+        else:
+            extracted = (values[..., indices] * weights.astype(dtype)).sum(axis=-2)
+        sites_lon, sites_lat = np.asarray(self.sites).reshape(-1, 2).T
+        coords = {name: coord for name, coord in da.coords.items() if not {"latitude", "longitude"} & set(coord.dims)}
+        coords.pop("latitude", None)
+        coords.pop("longitude", None)
+        coords.update(site=self.names, longitude=("site", sites_lon), latitude=("site", sites_lat))
+        return xr.DataArray(extracted, dims=(*da.dims[:-2], "site"), coords=coords, attrs=da.attrs, name=da.name)
+
+
+def extract_points(
+    data: T,
+    sites: Sites,
+    method: Method = "nearest",
+    names: Optional[Sequence] = None,
+    as_dataframe: bool = False,
+) -> Union[T, pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """Extract time series at *sites* from a field or a dict of fields (as returned by ``get_forecast``).
+
+    Args:
+        data: ``xr.DataArray`` or dict of ``xr.DataArray`` on regular lat/lon grids.
+        sites: ``[(lon, lat), ...]`` coordinates of the sites, in degrees.
+        method: ``"nearest"`` or ``"bilinear"``.
+        names: Optional site identifiers, used as the ``site`` coordinate / DataFrame columns.
+        as_dataframe: If ``True``, return ``(time, site)`` DataFrames instead of DataArrays
+            (only for fields whose only other dimension is ``time``).
+
+    Returns:
+        Same structure as *data*, with the spatial dimensions replaced by ``site``.
+    """
+    extractor = PointExtractor(sites, method=method, names=names)
+
+    def extract(da: xr.DataArray):
+        ret = extractor(da)
+        return ret.to_pandas() if as_dataframe else ret
+
+    if isinstance(data, dict):
+        return {field: extract(da) for field, da in data.items()}
+    return extract(data)
@@ -0,0 +1,156 @@
+"""
+Long-lived pool of GRIB decoding processes, reused across calls and models.
+
+By default, each call creates its own ``multiprocessing.Pool`` and pays, every time, the
+start-up of the processes, the import of eccodes/cfgrib and the loading of the GRIB
+definitions. A ``DecodePool`` keeps its processes alive and pre-warmed between calls.
+"""
+
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from multiprocessing import Pool
+from multiprocessing.pool import Pool as PoolType
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+_decode_pool = None
+
+
+def _init_worker(definition_path: Optional[str]) -> None:
+    """Initialise a decoding process: GRIB definitions of the parent, eccodes and cfgrib loaded.
+
+    The definition path is set before eccodes is first used in the process (with the
+    ``spawn`` start method); forked processes inherit the context of the parent.
+    """
+    if definition_path is None:
+        os.environ.pop("ECCODES_DEFINITION_PATH", None)
+    else:
+        os.environ["ECCODES_DEFINITION_PATH"] = definition_path
+    import cfgrib  # noqa: F401
+    import eccodes
+
+    # Charge les définitions GRIB dès le démarrage du processus
+    try:
+        h = eccodes.codes_grib_new_from_samples("regular_ll_sfc_grib2")
+        eccodes.codes_get(h, "cfVarName")
+        eccodes.codes_release(h)
+    except Exception as e:
+        logger.warning("Could not pre-load the GRIB definitions: %s", e)
+
+
+def use_grib_defs(definition_path: Optional[str]) -> None:
+    """Select the GRIB definitions of *definition_path* (those of eccodes if ``None``) in this process."""
+    if os.environ.get("ECCODES_DEFINITION_PATH") == definition_path:
+        return
+    if definition_path is None:
+        os.environ.pop("ECCODES_DEFINITION_PATH", None)
+    else:
+        os.environ["ECCODES_DEFINITION_PATH"] = definition_path
+    import eccodes
+
+    eccodes.codes_context_delete()
+
+
+class DecodePool:
+    """Persistent pool of decoding processes, shared by all the calls made while it is active.
+
+    It can be used as a context manager, or installed for the whole session with
+    ``set_decode_pool``::
+
+        with DecodePool(processes=8):
+            a = Arome0025.get_forecast(...)
+            b = Ifs.get_forecast(...)
+
+    Processes are started with the GRIB definitions selected by ``set_grib_defs``, and are
+    restarted if another source is selected afterwards. The pool can be shared by several
+    threads.
+
+    Args:
+        processes: Number of processes. Defaults to the number of CPUs.
+    """
+
+    def __init__(self, processes: Optional[int] = None):
+        self.processes = processes or os.cpu_count()
+        self._pool: Optional[PoolType] = None
+        self._definition_path: Optional[str] = None
+        self._previous = None
+        self._lock = threading.RLock()
+
+    def __repr__(self):
+        return f"DecodePool(processes={self.processes})"
+
+    def ensure_started(self) -> PoolType:
+        """Return the underlying ``multiprocessing.Pool``, (re)started if needed."""
+        definition_path = os.environ.get("ECCODES_DEFINITION_PATH")
+        with self._lock:
+            if self._pool is not None and definition_path != self._definition_path:
+                logger.info("GRIB definitions changed, restarting the decoding processes")
+                self._shutdown()
+            if self._pool is None:
+                self._definition_path = definition_path
+                self._pool = Pool(processes=self.processes, initializer=_init_worker, initargs=(definition_path,))
+            return self._pool
+
+    def _shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool.join()
+                self._pool = None
+
+    def close(self) -> None:
+        """Stop the processes, and deactivate the pool if it is the active one."""
+        global _decode_pool
+        if _decode_pool is self:
+            _decode_pool = None
+        self._shutdown()
+
+    def __enter__(self) -> "DecodePool":
+        global _decode_pool
+        self._previous, _decode_pool = _decode_pool, self
+        self.ensure_started()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        global _decode_pool
+        self._shutdown()
+        _decode_pool = self._previous
+
+
+def set_decode_pool(processes: Optional[int] = None) -> DecodePool:
+    """Start a persistent decoding pool, used by all subsequent calls (see ``DecodePool``).
+
+    Any previously installed pool is stopped.
+
+    Args:
+        processes: Number of processes. Defaults to the number of CPUs.
+    """
+    global _decode_pool
+    disable_decode_pool()
+    _decode_pool = DecodePool(processes)
+    _decode_pool.ensure_started()
+    return _decode_pool
+
+
+def disable_decode_pool() -> None:
+    """Stop the pool installed by ``set_decode_pool``: each call starts its own processes again."""
+    if _decode_pool is not None:
+        _decode_pool.close()
+
+
+def get_decode_pool() -> Optional[DecodePool]:
+    """Return the active persistent decoding pool, or ``None``."""
+    return _decode_pool
+
+
+@contextmanager
+def decode_pool(processes: int) -> Iterator[PoolType]:
+    """Yield the active persistent pool if any, otherwise a pool of *processes* closed on exit."""
+    if _decode_pool is not None:
+        yield _decode_pool.ensure_started()
+        return
+    with Pool(processes=processes) as pool:
+        yield pool
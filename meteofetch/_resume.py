@@ -0,0 +1,160 @@
+"""
+Resumable downloads: files are written to ``<name>.part`` and renamed once complete.
+
+A download interrupted by a network error resumes from the end of its ``.part`` file with
+an HTTP ``Range`` request on the next attempt (or on the next call, when the files are kept
+in a user directory), instead of starting over. The ``ETag`` (or ``Last-Modified``) of the
+remote file is kept next to the ``.part`` file (``<name>.part.validator``) and sent as
+``If-Range``: if the remote file changed in between, the server sends it whole and the
+download starts over. Before the rename, the size of the file is
+checked against the size announced by the server (``Content-Length`` / ``Content-Range``),
+and GRIB files must end with the ``7777`` end section: a file found under its final name
+is always complete.
+
+Downloads of selected GRIB messages (byte ranges) are written to ``<name>.ranges.part``:
+their content is not a prefix of the remote file, so a full download must never resume
+from it.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Mapping, Optional, Tuple
+
+PART_SUFFIX = ".part"
+
+RANGES_PART_SUFFIX = ".ranges.part"
+
+VALIDATOR_SUFFIX = ".validator"
+
+GRIB_END = b"7777"
+
+GRIB_SUFFIXES = (".grib", ".grib2", ".grb", ".grb2")
+
+
+class IncompleteDownloadError(OSError):
+    """The downloaded file is not the one announced by the server (truncated, or not a complete GRIB file)."""
+
+
+def part_path(path: Path, ranges: bool = False) -> Path:
+    """Path of the ``.part`` file in which *path* is downloaded (by byte ranges if *ranges*)."""
+    return path.with_name(path.name + (RANGES_PART_SUFFIX if ranges else PART_SUFFIX))
+
+
+def resume_offset(part: Path) -> int:
+    """Number of bytes already downloaded in *part* (0 if there is none)."""
+    try:
+        return part.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def validator_path(part: Path) -> Path:
+    """Path of the file keeping the validator of the remote file downloaded in *part*."""
+    return part.with_name(part.name + VALIDATOR_SUFFIX)
+
+
+def save_validator(part: Path, headers: Mapping[str, str]) -> None:
+    """Keep the strong ``ETag`` (or else the ``Last-Modified``) of *headers* next to *part*."""
+    etag = headers.get("ETag")
+    validator = etag if etag and not etag.startswith("W/") else headers.get("Last-Modified")
+    if validator:
+        validator_path(part).write_text(validator)
+    else:
+        validator_path(part).unlink(missing_ok=True)
+
+
+def discard(part: Path) -> None:
+    """Delete *part* and its validator, so that the download starts over."""
+    part.unlink(missing_ok=True)
+    validator_path(part).unlink(missing_ok=True)
+
+
+def resume_headers(part: Path, offset: int) -> dict:
+    """Headers of a request resuming the download of *part* at byte *offset*.
+
+    The validator kept with *part* is sent as ``If-Range``, so that the server sends the whole
+    file instead of the requested range if the remote file changed.
+    """
+    if not offset:
+        return {}
+    headers = {"Range": f"bytes={offset}-"}
+    try:
+        headers["If-Range"] = validator_path(part).read_text()
+    except FileNotFoundError:
+        pass
+    return headers
+
+
+def resume_plan(part: Path, offset: int, status: int, headers: Mapping[str, str]) -> Tuple[int, Optional[int]]:
+    """Interpret the response to a request sent with ``resume_headers(part, offset)``.
+
+    Args:
+        part: The ``.part`` file being downloaded.
+        offset: Size of *part* when the request was sent.
+        status: HTTP status of the response.
+        headers: Headers of the response.
+
+    Returns:
+        ``(start, size)``: the body is to be written from byte *start* of *part* (*offset* if the
+        server honoured the range, 0 if it sent the whole file), and *size* is the total size
+        of the file, or ``None`` if the server did not announce it. When the whole file is sent,
+        its validator is kept next to *part* (see ``resume_headers``).
+
+    Raises:
+        IncompleteDownloadError: If the server cannot resume the download at *offset*. *part*
+            is deleted so that the next attempt starts over.
+    """
+    if status == 416:
+        # Le fichier partiel ne correspond plus au fichier distant
+        discard(part)
+        raise IncompleteDownloadError(f"Cannot resume {part.name} at byte {offset}")
+    if status == 206:
+        content_range = headers.get("Content-Range", "")
+        match = re.fullmatch(r"bytes (\d+)-\d+/(\d+|\*)", content_range)
+        if match is None or int(match[1]) != offset:
+            discard(part)
+            raise IncompleteDownloadError(f"Unexpected Content-Range {content_range!r} for {part.name}")
+        return offset, None if match[2] == "*" else int(match[2])
+    if status == 200:
+        save_validator(part, headers)
+    length = headers.get("Content-Length")
+    if length is None or headers.get("Content-Encoding", "identity") != "identity":
+        return 0, None
+    return 0, int(length)
+
+
+def has_grib_end(path: Path) -> bool:
+    """Whether *path* ends with the ``7777`` end section of a GRIB message."""
+    with open(path, "rb") as f:
+        if f.seek(0, os.SEEK_END) < len(GRIB_END):
+            return False
+        f.seek(-len(GRIB_END), os.SEEK_END)
+        return f.read() == GRIB_END
+
+
+def finalize(part: Path, path: Path, size: Optional[int]) -> Path:
+    """Check the downloaded *part* file, then rename it atomically to *path*.
+
+    Args:
+        part: The ``.part`` file.
+        path: Final path of the file.
+        size: Expected size of the file, if known.
+
+    Raises:
+        IncompleteDownloadError: If *part* is shorter than *size* (it is kept, to resume the
+            download), longer than *size*, or is not a complete GRIB file.
+    """
+    actual = part.stat().st_size
+    if size is not None and actual != size:
+        if actual > size:
+            discard(part)
+        raise IncompleteDownloadError(f"{path.name}: {actual} bytes received, {size} expected")
+    if path.suffix in GRIB_SUFFIXES and not has_grib_end(part):
+        if size is not None:
+            # Taille attendue mais message tronqué : le fichier distant lui-même est incomplet
+            discard(part)
+        raise IncompleteDownloadError(f"{path.name} is not a complete GRIB file (no 7777 end section)")
+    os.replace(part, path)
+    validator_path(part).unlink(missing_ok=True)
+    return path
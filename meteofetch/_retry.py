@@ -0,0 +1,212 @@
+"""
+Retry policy of downloads: exponential backoff with jitter, ``Retry-After`` and per-host circuit breaker.
+
+By default, a failed download is retried immediately, so that when a server throttles
+requests (HTTP 429 or 503), every download thread sends its request again at once. A
+``RetryPolicy`` with a *backoff* spaces the attempts of each file (exponential backoff with
+full jitter). ``Retry-After`` always pauses all requests to a host for the duration given.
+With a *failure_threshold*, requests to a host stop after repeated failures (circuit breaker):
+downloads to that host then fail immediately until a cooldown has elapsed, after which a
+single request probes the host.
+
+Only transient errors are retried: network errors, timeouts, truncated files, and HTTP
+statuses 408, 425, 429 and 5xx. Other HTTP errors (e.g. 404) fail at the first attempt.
+"""
+
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = (408, 425, 429)
+
+
+class CircuitOpenError(ConnectionError):
+    """Requests to a host are suspended after repeated failures."""
+
+
+class _HostState:
+    def __init__(self):
+        self.failures = 0
+        self.paused_until = 0.0
+        self.open_until = 0.0
+        self.probing = False
+
+
+def _status(error: BaseException) -> Optional[int]:
+    """HTTP status of the response carried by *error* (requests or httpx), if any."""
+    response = getattr(error, "response", None)
+    return None if response is None else response.status_code
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Delay in seconds given by the ``Retry-After`` header of the response carried by *error*, if any."""
+    response = getattr(error, "response", None)
+    value = None if response is None else response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether the download that raised *error* may succeed if attempted again."""
+    status = _status(error)
+    return status is None or status in RETRYABLE_STATUSES or status >= 500
+
+
+class RetryPolicy:
+    """Delays between download attempts and per-host circuit breaker, shared by all downloads.
+
+    The number of attempts of each file is still set by the ``num_retries`` argument of the
+    download methods; the policy decides how long to wait between them.
+
+    Args:
+        backoff: Base delay in seconds. Attempt *n* waits a random time between 0 and
+            ``backoff * 2**n`` (full jitter), capped at *max_delay*. ``0`` (the default)
+            retries immediately.
+        max_delay: Maximum delay between two attempts, and maximum pause set by ``Retry-After``.
+        connect_timeout: Timeout for establishing a connection, in seconds. Defaults to the
+            ``TIMEOUT`` of the model.
+        read_timeout: Timeout between two packets received, in seconds. Defaults to the
+            ``TIMEOUT`` of the model.
+        failure_threshold: Number of consecutive transient failures after which requests to
+            a host are suspended. ``None`` (the default) disables the circuit breaker.
+        cooldown: Duration of the suspension, in seconds. Afterwards, a single request is let
+            through while the others still fail: it closes the circuit if it succeeds, or
+            reopens it if it fails.
+    """
+
+    def __init__(
+        self,
+        backoff: float = 0.0,
+        max_delay: float = 60.0,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+        cooldown: float = 60.0,
+    ):
+        if backoff < 0 or max_delay < 0:
+            raise ValueError("backoff and max_delay must be non-negative")
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._hosts: Dict[str, _HostState] = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"RetryPolicy(backoff={self.backoff}, max_delay={self.max_delay})"
+
+    def _host(self, url: str) -> _HostState:
+        return self._hosts.setdefault(urlsplit(url).netloc, _HostState())
+
+    def timeout(self, default: float) -> Tuple[float, float]:
+        """``(connect, read)`` timeouts of a request, *default* being the ``TIMEOUT`` of the model."""
+        return (
+            default if self.connect_timeout is None else self.connect_timeout,
+            default if self.read_timeout is None else self.read_timeout,
+        )
+
+    def wait_time(self, url: str) -> float:
+        """How long to wait before sending a request to *url* (pause set by ``Retry-After``).
+
+        Raises:
+            CircuitOpenError: If requests to the host of *url* are suspended.
+        """
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            if state.open_until > now:
+                raise CircuitOpenError(
+                    f"Requests to {urlsplit(url).netloc} suspended for {state.open_until - now:.0f} s "
+                    f"after {state.failures} consecutive failures"
+                )
+            if state.open_until:
+                # Demi-ouvert : cette requête sonde le serveur, les autres restent bloquées jusqu'à son
+                # issue (ou jusqu'à la fin d'une nouvelle pause si elle n'en rend jamais compte)
+                logger.info("Probing %s after %d consecutive failures", urlsplit(url).netloc, state.failures)
+                state.open_until = now + self.cooldown
+                state.probing = True
+            return max(state.paused_until - now, 0.0)
+
+    def delay(self, attempt: int) -> float:
+        """Delay before attempt ``attempt + 1`` of a file (``attempt`` starting at 0)."""
+        return random.uniform(0, min(self.max_delay, self.backoff * 2**attempt))
+
+    def record_success(self, url: str) -> None:
+        """Account for a successful request to *url*: the circuit of its host is closed."""
+        with self._lock:
+            state = self._host(url)
+            state.failures = 0
+            state.open_until = 0.0
+            state.probing = False
+
+    def record_failure(self, url: str, error: BaseException) -> bool:
+        """Account for a request to *url* that failed with *error*, and return whether to retry it."""
+        if not is_retryable(error):
+            with self._lock:
+                state = self._host(url)
+                if state.probing:
+                    # Le serveur a répondu : le circuit se referme
+                    state.open_until = 0.0
+                    state.probing = False
+            return False
+        pause = retry_after(error)
+        with self._lock:
+            state = self._host(url)
+            now = time.monotonic()
+            if pause is not None:
+                state.paused_until = max(state.paused_until, now + min(pause, self.max_delay))
+            state.failures += 1
+            if self.failure_threshold is not None and state.failures >= self.failure_threshold:
+                if state.open_until <= now or state.probing:
+                    logger.warning(
+                        "%d consecutive failures for %s, suspending requests for %.0f s",
+                        state.failures,
+                        urlsplit(url).netloc,
+                        self.cooldown,
+                    )
+                state.open_until = now + self.cooldown
+            state.probing = False
+        return True
+
+
+_retry_policy = RetryPolicy()
+
+
+def set_retry_policy(policy: Optional[RetryPolicy] = None, **kwargs) -> RetryPolicy:
+    """Install the retry policy used by all downloads, and return the previous one.
+
+    Args:
+        policy: The policy to install. If ``None``, a ``RetryPolicy`` is created from *kwargs*
+            (``set_retry_policy()`` restores the default policy).
+        **kwargs: Arguments of ``RetryPolicy``.
+    """
+    global _retry_policy
+    if policy is not None and kwargs:
+        raise ValueError("Pass either a RetryPolicy or its arguments, not both")
+    previous, _retry_policy = _retry_policy, policy or RetryPolicy(**kwargs)
+    return previous
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Return the retry policy installed with ``set_retry_policy``."""
+    return _retry_policy
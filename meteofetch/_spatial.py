@@ -0,0 +1,77 @@
+"""
+Spatial subsetting of decoded fields, applied right after decoding so that only the
+area of interest is carried through processing and concatenation.
+
+All models use regular latitude/longitude grids; longitudes may be expressed in
+[0, 360) (global grids) or [-180, 180), and both are handled.
+"""
+
+from typing import Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+import xarray as xr
+
+from ._points import axis_weights
+
+BBox = Tuple[float, float, float, float]
+Points = Sequence[Tuple[float, float]]
+
+T = TypeVar("T", xr.Dataset, xr.DataArray)
+
+
+def wrap_longitude(lon: np.ndarray) -> np.ndarray:
+    """Express longitudes in [-180, 180)."""
+    return (np.asarray(lon) + 180.0) % 360.0 - 180.0
+
+
+def bbox_indices(lon: np.ndarray, lat: np.ndarray, bbox: BBox) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the indices of the longitudes and latitudes that fall within *bbox*.
+
+    Args:
+        lon: 1D longitudes of the grid.
+        lat: 1D latitudes of the grid.
+        bbox: ``(lon_min, lat_min, lon_max, lat_max)``, in degrees. A box crossing the
+            antimeridian can be given with ``lon_min > lon_max``.
+    """
+    lon_min, lat_min, lon_max, lat_max = bbox
+    lon = wrap_longitude(lon)
+    lon_min, lon_max = wrap_longitude(lon_min), wrap_longitude(lon_max)
+    if lon_min <= lon_max:
+        in_lon = (lon >= lon_min) & (lon <= lon_max)
+    else:
+        in_lon = (lon >= lon_min) | (lon <= lon_max)
+    in_lat = (np.asarray(lat) >= lat_min) & (np.asarray(lat) <= lat_max)
+    return np.flatnonzero(in_lon), np.flatnonzero(in_lat)
+
+
+def nearest_indices(lon: np.ndarray, lat: np.ndarray, points: Points) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return, for each ``(lon, lat)`` point, the indices of the nearest grid longitude and latitude.
+
+    The third array tells which points are outside the grid (their indices are those of the nearest edge).
+    """
+    points_lon, points_lat = np.asarray(points, dtype=float).reshape(-1, 2).T
+    wx = axis_weights(lon, points_lon, periodic=True)
+    wy = axis_weights(lat, points_lat)
+    ilon = np.where(wx.weight <= 0.5, wx.lower, wx.upper)
+    ilat = np.where(wy.weight <= 0.5, wy.lower, wy.upper)
+    return ilon, ilat, wx.outside | wy.outside
+
+
+def crop(ds: T, bbox: Optional[BBox] = None, points: Optional[Points] = None) -> T:
+    """Restrict *ds* to a bounding box and/or to the grid points nearest to *points*.
+
+    With *points*, the ``latitude`` and ``longitude`` dimensions are replaced by a
+    ``point`` dimension (in the order of *points*), holding the nearest grid point of each.
+    Points outside the grid get ``NaN``, as with ``PointExtractor``.
+    """
+    if (bbox is None and points is None) or not {"latitude", "longitude"} <= set(ds.dims):
+        return ds
+    if bbox is not None:
+        ilon, ilat = bbox_indices(ds["longitude"].values, ds["latitude"].values, bbox)
+        ds = ds.isel(longitude=ilon, latitude=ilat)
+    if points is not None:
+        ilon, ilat, outside = nearest_indices(ds["longitude"].values, ds["latitude"].values, points)
+        ds = ds.isel(longitude=xr.DataArray(ilon, dims="point"), latitude=xr.DataArray(ilat, dims="point"))
+        if outside.any():
+            ds = ds.where(xr.DataArray(~outside, dims="point"))
+    return ds
@@ -0,0 +1,248 @@
+"""
+Incremental export of forecasts to Zarr or NetCDF stores.
+
+Fields are appended along ``time`` as soon as each valid time is decoded, so that archiving
+a full run never requires holding it in memory. Each field is written separately (one Zarr
+group, or one NetCDF file, per field), as fields of a run do not share the same vertical
+coordinates.
+
+Packed fields (see ``pack_encoding``) keep the scale of their first write for the whole
+store: later values outside of the range it covers are clipped to it. A ``packing_range``
+per field gives a scale that fits every run.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Literal, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from ._misc import PACKING_KEYS, Packing, pack_bounds, pack_encoding
+
+logger = logging.getLogger(__name__)
+
+Format = Literal["zarr", "netcdf"]
+Compressor = Literal["zlib", "zstd", "blosc"]
+
+DEFAULT_LEVELS = {"zlib": 6, "zstd": 3, "blosc": 5}
+
+
+def _import(module: str, extra: str):
+    """Import an optional dependency, with an explicit message if it is missing."""
+    try:
+        return __import__(module)
+    except ImportError as e:
+        raise ImportError(
+            f"This store format requires {module}: pip install {module} (or pip install meteofetch[{extra}])"
+        ) from e
+
+
+def _zarr_compression(compressor: Compressor, level: int) -> dict:
+    """Encoding of the compressor, for the installed major version of zarr."""
+    zarr = _import("zarr", "zarr")
+    if int(zarr.__version__.split(".")[0]) >= 3:
+        from zarr import codecs
+
+        codec = {
+            "zlib": lambda: codecs.GzipCodec(level=level),
+            "zstd": lambda: codecs.ZstdCodec(level=level),
+            "blosc": lambda: codecs.BloscCodec(cname="zstd", clevel=level, shuffle="bitshuffle"),
+        }[compressor]()
+        return {"compressors": (codec,)}
+    import numcodecs
+
+    codec = {
+        "zlib": lambda: numcodecs.Zlib(level=level),
+        "zstd": lambda: numcodecs.Zstd(level=level),
+        "blosc": lambda: numcodecs.Blosc(cname="zstd", clevel=level, shuffle=numcodecs.Blosc.BITSHUFFLE),
+    }[compressor]()
+    return {"compressor": codec}
+
+
+def _netcdf_compression(compressor: Compressor, level: int) -> dict:
+    """Encoding of the compressor for the netCDF4 backend (zstd and blosc need netCDF-C >= 4.9)."""
+    _import("netCDF4", "netcdf")
+    if compressor == "zlib":
+        return {"zlib": True, "complevel": level}
+    return {"compression": {"zstd": "zstd", "blosc": "blosc_zstd"}[compressor], "complevel": level}
+
+
+def _chunk_sizes(da: xr.DataArray, chunks: Optional[Dict[str, int]]) -> Tuple[int, ...]:
+    """Chunk shape of *da*: one valid time per chunk and whole fields, unless overridden by *chunks*."""
+    chunks = {"time": 1, **(chunks or {})}
+    return tuple(max(1, min(chunks.get(dim, size), size)) for dim, size in zip(da.dims, da.shape))
+
+
+def _prepare(field: str, da: xr.DataArray, packed: dict) -> xr.Dataset:
+    """Dataset written for *field*, without the per-step ``step`` coordinate.
+
+    The ``grid_mapping`` set by ``geo_encode_cf`` is moved to the attributes, where the
+    Zarr and NetCDF backends write it. *packed* is the packing encoding of the field (see
+    ``pack_encoding``, empty if it is not packed): values are clipped to the range it covers.
+    """
+    encoding = da.encoding
+    da = da.drop_vars("step", errors="ignore")
+    if packed:
+        da = da.clip(*pack_bounds(packed))
+    if "grid_mapping" in encoding:
+        da.attrs["grid_mapping"] = encoding["grid_mapping"]
+    da.encoding = {"coordinates": encoding["coordinates"]} if "coordinates" in encoding else {}
+    da.encoding.update(packed)
+    return da.to_dataset(name=field)
+
+
+class StoreWriter:
+    """Append successive ``(valid_time, fields)`` steps to a Zarr store or a directory of NetCDF files.
+
+    Args:
+        store: Zarr store path (one group per field), or directory of NetCDF files (``{field}.nc``).
+        format: ``"zarr"`` or ``"netcdf"``.
+        chunks: Chunk size per dimension (e.g. ``{"latitude": 256, "longitude": 256}``).
+            By default, each chunk holds one valid time of a whole field.
+        compressor: ``"zlib"``, ``"zstd"`` or ``"blosc"`` (blosc with zstd and bit shuffling).
+        complevel: Compression level. Defaults to 6 for zlib, 3 for zstd and 5 for blosc.
+        mode: ``"w"`` to overwrite fields already present in the store, ``"a"`` to append
+            to them along ``time`` (e.g. to archive successive runs in the same store).
+        packing: ``"int16"`` or ``"int8"`` to store the fields as scaled integers (see
+            ``pack_encoding``). Fields already packed (``packing`` argument of ``iter_forecast``)
+            keep their encoding.
+        packing_range: ``(min, max)`` of the values to represent, per field (e.g.
+            ``{"t2m": (200, 340)}``). Without it, the scale is computed from the first write of
+            each field.
+    """
+
+    def __init__(
+        self,
+        store: Union[str, Path],
+        format: Format = "zarr",
+        chunks: Optional[Dict[str, int]] = None,
+        compressor: Compressor = "zlib",
+        complevel: Optional[int] = None,
+        mode: Literal["w", "a"] = "w",
+        packing: Optional[Packing] = None,
+        packing_range: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        if format not in ("zarr", "netcdf"):
+            raise ValueError(f"format must be 'zarr' or 'netcdf', got {format!r}")
+        if compressor not in DEFAULT_LEVELS:
+            raise ValueError(f"compressor must be one of {sorted(DEFAULT_LEVELS)}, got {compressor!r}")
+        if mode not in ("w", "a"):
+            raise ValueError(f"mode must be 'w' or 'a', got {mode!r}")
+        level = DEFAULT_LEVELS[compressor] if complevel is None else complevel
+        self.store = Path(store)
+        self.format = format
+        self.chunks = chunks
+        self.mode = mode
+        self.packing = packing
+        self.packing_range = packing_range or {}
+        if format == "zarr":
+            self.compression = _zarr_compression(compressor, level)
+        else:
+            self.compression = _netcdf_compression(compressor, level)
+            self.store.mkdir(parents=True, exist_ok=True)
+        self._created = set()
+        self._packed: Dict[str, dict] = {}
+
+    def _exists(self, field: str) -> bool:
+        if field in self._created:
+            return True
+        if self.mode == "w":
+            return False
+        if self.format == "netcdf":
+            return (self.store / f"{field}.nc").is_file()
+        return (self.store / field).is_dir()
+
+    def write(self, fields: Dict[str, xr.DataArray]) -> None:
+        """Append the fields of one or more valid times."""
+        for field, da in fields.items():
+            ds = _prepare(field, da, self._packing(field, da))
+            if self._exists(field):
+                self._append(field, ds)
+            else:
+                self._create(field, ds)
+                self._created.add(field)
+
+    def _packing(self, field: str, da: xr.DataArray) -> dict:
+        """Packing encoding of *field*, set at its first write and kept for the following ones."""
+        if field in self._packed:
+            return self._packed[field]
+        if self._exists(field):
+            # Champ d'un appel précédent (mode "a") : on garde l'échelle du store
+            encoding = self._stored_encoding(field)
+        elif self.packing is not None and (field in self.packing_range or "scale_factor" not in da.encoding):
+            encoding = pack_encoding(da, self.packing, self.packing_range.get(field))
+        elif "scale_factor" in da.encoding and field in self.packing_range:
+            encoding = pack_encoding(da, str(np.dtype(da.encoding["dtype"])), self.packing_range[field])
+        else:
+            encoding = da.encoding
+        packed = "scale_factor" in encoding
+        self._packed[field] = {key: encoding[key] for key in PACKING_KEYS if key in encoding} if packed else {}
+        return self._packed[field]
+
+    def _stored_encoding(self, field: str) -> dict:
+        if self.format == "zarr":
+            with xr.open_zarr(self.store, group=field) as ds:
+                return dict(ds[field].encoding)
+        with xr.open_dataset(self.store / f"{field}.nc") as ds:
+            return dict(ds[field].encoding)
+
+    def _create(self, field: str, ds: xr.Dataset) -> None:
+        encoding = {field: {**self.compression, **self._packed[field]}}
+        sizes = _chunk_sizes(ds[field], self.chunks)
+        if self.format == "zarr":
+            encoding[field]["chunks"] = sizes
+            ds.to_zarr(self.store, group=field, mode="w", encoding=encoding)
+        else:
+            encoding[field]["chunksizes"] = sizes
+            path = self.store / f"{field}.nc"
+            ds.to_netcdf(path, mode="w", engine="netcdf4", encoding=encoding, unlimited_dims=["time"])
+        logger.debug("Created %s in %s", field, self.store)
+
+    def _append(self, field: str, ds: xr.Dataset) -> None:
+        if self.format == "zarr":
+            ds.to_zarr(self.store, group=field, append_dim="time")
+            return
+        netCDF4 = _import("netCDF4", "netcdf")
+        with netCDF4.Dataset(self.store / f"{field}.nc", "a") as nc:
+            time, var = nc.variables["time"], nc.variables[field]
+            n = len(time)
+            dates = [t.to_pydatetime() for t in pd.to_datetime(ds["time"].values)]
+            time[n : n + len(dates)] = netCDF4.date2num(dates, time.units, getattr(time, "calendar", "standard"))
+            # netCDF4 applique scale_factor/add_offset ; les NaN deviennent _FillValue
+            var[n : n + len(dates)] = np.ma.masked_invalid(ds[field].transpose(*var.dimensions).values)
+
+
+def write_store(
+    steps: Iterable[Tuple[pd.Timestamp, Dict[str, xr.DataArray]]],
+    store: Union[str, Path],
+    format: Format = "zarr",
+    chunks: Optional[Dict[str, int]] = None,
+    compressor: Compressor = "zlib",
+    complevel: Optional[int] = None,
+    mode: Literal["w", "a"] = "w",
+    packing: Optional[Packing] = None,
+    packing_range: Optional[Dict[str, Tuple[float, float]]] = None,
+) -> Path:
+    """Write the ``(valid_time, fields)`` steps yielded by ``iter_forecast`` to *store*.
+
+    See ``StoreWriter`` for the arguments.
+
+    Returns:
+        Path of the store.
+    """
+    writer = StoreWriter(
+        store,
+        format=format,
+        chunks=chunks,
+        compressor=compressor,
+        complevel=complevel,
+        mode=mode,
+        packing=packing,
+        packing_range=packing_range,
+    )
+    for valid_time, fields in steps:
+        writer.write(fields)
+        logger.debug("Stored %s", valid_time)
+    return writer.store
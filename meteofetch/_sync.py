@@ -0,0 +1,86 @@
+"""
+Incremental mirror of forecast runs: only the files that are new or changed are downloaded.
+
+A manifest (``.meteofetch-manifest.json``) in the destination directory records, for each
+file, the ``ETag``, ``Last-Modified`` and ``Content-Length`` headers of the version that was
+downloaded. On the next synchronisation, each file is probed with a HEAD request, and it is
+downloaded again only if these headers changed or the local copy is missing.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+import requests
+
+from ._misc import get_session
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = ".meteofetch-manifest.json"
+
+
+class SyncResult(NamedTuple):
+    """Result of a ``sync_run``.
+
+    Attributes:
+        paths: Local paths of all the files of the run.
+        updated: The files that were downloaded by this synchronisation (new or changed).
+    """
+
+    paths: List[Path]
+    updated: List[Path]
+
+
+def remote_validators(url: str, timeout: float) -> Optional[Dict[str, Optional[str]]]:
+    """``ETag``, ``Last-Modified`` and ``Content-Length`` of *url*, or ``None`` if it cannot be probed."""
+    try:
+        r = get_session().head(url, allow_redirects=True, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        logger.warning("Could not probe %s: %s", url, e)
+        return None
+    if r.status_code != 200:
+        return None
+    return {
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+        "content_length": r.headers.get("Content-Length"),
+    }
+
+
+def is_current(entry: Optional[dict], validators: Optional[dict], local: Path) -> bool:
+    """Whether the local copy *local*, recorded as *entry* in the manifest, matches the remote file.
+
+    If the remote file cannot be probed (e.g. an old run already removed from the server), an
+    existing local copy is kept.
+    """
+    if entry is None or not local.exists():
+        return False
+    if validators is None:
+        return True
+    if validators["content_length"] is not None and local.stat().st_size != int(validators["content_length"]):
+        return False
+    keys = [key for key in ("etag", "last_modified", "content_length") if validators[key] is not None]
+    return bool(keys) and all(entry.get(key) == validators[key] for key in keys)
+
+
+def load_manifest(directory: Path) -> Dict[str, dict]:
+    """Manifest of *directory* (empty if there is none, or if it cannot be read)."""
+    try:
+        with open(directory / MANIFEST) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable manifest in %s: %s", directory, e)
+        return {}
+
+
+def save_manifest(directory: Path, manifest: Dict[str, dict]) -> None:
+    """Write the manifest of *directory* atomically."""
+    tmp = directory / f"{MANIFEST}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, directory / MANIFEST)
@@ -0,0 +1,122 @@
+"""
+Transfer of decoded fields from the decoding processes to the parent without pickling their values.
+
+In the worker, the values of each large field are written to a ``.npy`` file in shared
+memory (``/dev/shm``); only the metadata (dimensions, coordinates, attributes) goes through
+the pool's pipe. The parent memory-maps the file and deletes it right away: the mapping
+stays valid until the array is released, and the values are never copied before the
+final concatenation. Results that will not be received (after an error) must be passed to
+``release_fields``, so that their files do not keep using memory. When a file cannot be
+written (e.g. ``/dev/shm`` full), the field is pickled instead.
+
+Memory-mapped files cannot be deleted while open on Windows, where fields are pickled.
+"""
+
+import logging
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+import xarray as xr
+
+logger = logging.getLogger(__name__)
+
+# Taille minimale des champs transmis par mémoire partagée (les petits champs sont sérialisés).
+MIN_SHARED_BYTES = 1024 * 1024
+
+SHARED = os.name == "posix"
+
+
+class SharedField(NamedTuple):
+    """Metadata of a field whose values are in the ``.npy`` file *path*."""
+
+    path: str
+    dims: tuple
+    coords: xr.Dataset
+    name: str
+    attrs: dict
+    encoding: dict
+
+
+def shared_dir() -> Path:
+    """Directory of the transferred files: ``/dev/shm`` if available (RAM), otherwise the temporary directory."""
+    return Path("/dev/shm") if os.path.isdir("/dev/shm") else Path(tempfile.gettempdir())
+
+
+def share(da: xr.DataArray) -> Union[xr.DataArray, SharedField]:
+    """In a worker: write the values of *da* to shared memory, and return its metadata.
+
+    *da* itself is returned (to be pickled) if it is small, or if its values cannot be written.
+    """
+    if not SHARED or da.nbytes < MIN_SHARED_BYTES:
+        return da
+    path = shared_dir() / f"meteofetch_{uuid.uuid4().hex}.npy"
+    try:
+        np.save(path, da.values)
+    except OSError as e:
+        logger.debug("Could not write %s to shared memory, pickling it instead: %s", da.name, e)
+        path.unlink(missing_ok=True)
+        return da
+    return SharedField(str(path), da.dims, da.coords.to_dataset(), da.name, da.attrs, da.encoding)
+
+
+def receive(field: Union[xr.DataArray, SharedField]) -> xr.DataArray:
+    """In the parent: rebuild the DataArray of a field returned by ``share`` (without copying its values)."""
+    if isinstance(field, xr.DataArray):
+        return field
+    try:
+        values = np.load(field.path, mmap_mode="c")
+    finally:
+        os.unlink(field.path)
+    da = xr.DataArray(values, dims=field.dims, coords=field.coords.coords, name=field.name, attrs=field.attrs)
+    da.encoding = field.encoding
+    return da
+
+
+def share_fields(fields: Dict[str, List[xr.DataArray]]) -> Dict[str, List[Union[xr.DataArray, SharedField]]]:
+    """Apply ``share`` to each field of a ``Model._read_fields`` result."""
+    shared: Dict[str, List[Union[xr.DataArray, SharedField]]] = {}
+    try:
+        for name, das in fields.items():
+            shared[name] = []
+            for da in das:
+                shared[name].append(share(da))
+    except BaseException:
+        release_fields(shared)
+        raise
+    return shared
+
+
+def receive_fields(fields: Dict[str, List[Union[xr.DataArray, SharedField]]]) -> Dict[str, List[xr.DataArray]]:
+    """Apply ``receive`` to each field of a ``share_fields`` result."""
+    try:
+        return {name: [receive(da) for da in das] for name, das in fields.items()}
+    except BaseException:
+        release_fields(fields)
+        raise
+
+
+def release_fields(fields: Optional[Dict[str, List[Union[xr.DataArray, SharedField]]]]) -> None:
+    """Delete the files of a ``share_fields`` result that will not be received (files already received are skipped)."""
+    for das in (fields or {}).values():
+        for da in das:
+            if isinstance(da, SharedField):
+                Path(da.path).unlink(missing_ok=True)
+
+
+def release_pending(results: Iterator[Dict[str, list]]) -> None:
+    """Release (see ``release_fields``) the ``share_fields`` results still to come from *results*.
+
+    Errors are ignored: *results* must keep yielding after one, as the iterator of ``Pool.imap``.
+    """
+    while True:
+        try:
+            fields = next(results)
+        except StopIteration:
+            return
+        except Exception:
+            continue
+        release_fields(fields)
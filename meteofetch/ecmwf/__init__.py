@@ -1,13 +1,17 @@
+import asyncio
 import logging
+from functools import partial
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import Dict, List, Literal, Optional, Union, overload
+from typing import Dict, Iterator, List, Literal, Optional, Tuple, Union, overload
 
 import pandas as pd
 import xarray as xr
 
-from .._misc import ForecastNotAvailableError, are_downloadable
-from .._model import Model
+from .._index import merge_ranges, param_to_varname, read_ecmwf_index
+from .._misc import ForecastNotAvailableError, Packing, combine_availability, probe_urls
+from .._model import Backend, Model, lead_range
+from .._spatial import BBox, Points
+from .._sync import SyncResult
 
 logger = logging.getLogger(__name__)
 
@@ -24,28 +28,58 @@ class ECMWF(Model):
     @staticmethod
     def _process_ds(ds: xr.Dataset) -> xr.Dataset:
         ds = ds.expand_dims("valid_time").drop_vars("time").rename(valid_time="time")
-        ds = ds.sortby("latitude")
+        if "latitude" in ds.dims:
+            ds = ds.sortby("latitude")
         return ds
 
     @classmethod
-    def _get_urls(cls, date: Union[str, pd.Timestamp]) -> List[str]:
-        """Build the list of GRIB2 download URLs for a given run date."""
+    def _group_leads(cls, group: int) -> Tuple[int, int]:
+        """Lead hours of a group: each file holds a single step."""
+        return group, group
+
+    @classmethod
+    def _get_urls(cls, date: Union[str, pd.Timestamp], steps: Optional[slice] = None) -> List[str]:
+        """Build the list of GRIB2 download URLs for a given run date.
+
+        Only the steps holding the lead hours of *steps* are kept (see ``lead_range``).
+        """
         date_dt = pd.to_datetime(date)
         ymd, hour = f"{date_dt:%Y%m%d}", f"{date_dt:%H}"
-        return [cls.base_url_ + "/" + cls.url_.format(ymd=ymd, hour=hour, group=group) for group in cls.groups_]
+        return [
+            cls._base_url() + "/" + cls.url_.format(ymd=ymd, hour=hour, group=group)
+            for group in cls._select_groups(cls.groups_, steps)
+        ]
 
     @classmethod
-    def _download_paquet(cls, date: str, path: str, num_workers: int, num_retries: int = 1) -> List[Path]:
-        """Download all GRIB files for a run date into *path*.
+    def _resolve_run(
+        cls, date: Optional[Union[str, pd.Timestamp]], paquet: None = None
+    ) -> Tuple[pd.Timestamp, List[str]]:
+        """Return the run date and the URLs of a batch request (see ``fetch_many``).
 
-        Returns an empty list if any file fails to download.
+        Raises:
+            ValueError: If a *paquet* is given (ECMWF models have none).
+            ForecastNotAvailableError: If *date* is ``None`` and no run is available.
         """
-        urls = cls._get_urls(date=date)
-        paths = cls._download_urls(urls, path, num_workers, num_retries)
-        if not all(paths):
-            logger.error("Some files could not be downloaded for %s run %s", cls.__name__, date)
-            return []
-        return [p for p in paths if isinstance(p, Path)]
+        if paquet is not None:
+            raise ValueError(f"{cls.__name__} has no paquets, got {paquet!r}")
+        if date is None:
+            date = cls.get_latest_forecast_time()
+            if date is None:
+                raise ForecastNotAvailableError(f"No valid {cls.__name__} run found.")
+        date_dt = pd.to_datetime(str(date)).floor(f"{cls.freq_update}h")
+        return date_dt, cls._get_urls(date=f"{date_dt:%Y-%m-%dT%H}")
+
+    @classmethod
+    def _get_ranges(cls, url: str, variables: list) -> Optional[List[Tuple[int, int]]]:
+        """Locate the messages of *variables* using the ``.index`` file published next to *url*."""
+        index = read_ecmwf_index(url, timeout=cls.TIMEOUT)
+        if index is None:
+            return None
+        return merge_ranges(
+            (message["_offset"], message["_offset"] + message["_length"] - 1)
+            for message in index
+            if message["param"] in variables or param_to_varname(message["param"]) in variables
+        )
 
     @classmethod
     @overload
@@ -57,6 +91,16 @@ class ECMWF(Model):
         return_data: Literal[True] = ...,
         num_workers: int = ...,
         num_retries: int = ...,
+        byte_range: bool = ...,
+        backend: Backend = ...,
+        pipeline: bool = ...,
+        lazy: bool = ...,
+        bbox: Optional[BBox] = ...,
+        points: Optional[Points] = ...,
+        dtype: Optional[str] = ...,
+        packing: Optional[Packing] = ...,
+        steps: Optional[slice] = ...,
+        max_lead: Optional[int] = ...,
     ) -> Dict[str, xr.DataArray]: ...
 
     @classmethod
@@ -69,6 +113,16 @@ class ECMWF(Model):
         return_data: Literal[False] = ...,
         num_workers: int = ...,
         num_retries: int = ...,
+        byte_range: bool = ...,
+        backend: Backend = ...,
+        pipeline: bool = ...,
+        lazy: bool = ...,
+        bbox: Optional[BBox] = ...,
+        points: Optional[Points] = ...,
+        dtype: Optional[str] = ...,
+        packing: Optional[Packing] = ...,
+        steps: Optional[slice] = ...,
+        max_lead: Optional[int] = ...,
     ) -> List[Path]: ...
 
     @classmethod
@@ -80,6 +134,16 @@ class ECMWF(Model):
         return_data: bool = True,
         num_workers: int = 4,
         num_retries: int = 1,
+        byte_range: bool = False,
+        backend: Backend = "threads",
+        pipeline: bool = False,
+        lazy: bool = False,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+        steps: Optional[slice] = None,
+        max_lead: Optional[int] = None,
     ) -> Union[Dict[str, xr.DataArray], List[Path]]:
         """Fetch the forecast for a given run date.
 
@@ -87,10 +151,21 @@ class ECMWF(Model):
             date: Run date/time. Floored to the nearest ``freq_update`` hour boundary.
             variables: Field names to keep. If ``None``, all fields are returned.
             path: Directory for GRIB files. Uses a temporary directory if ``None``.
-            return_data: If ``True``, load data into memory and return a dict of
-                DataArrays. If ``False``, save files to *path* and return their paths.
+            return_data: If ``False``, save files to *path* and return their paths.
             num_workers: Parallel download/read workers.
             num_retries: Extra download attempts per file on failure.
+            byte_range: Download only the GRIB messages of *variables*, with HTTP Range requests.
+            backend: ``"threads"`` (default) or ``"async"`` (requires ``httpx``).
+            pipeline: Decode each file as soon as it is downloaded.
+            lazy: Return dask-backed DataArrays, decoded when computed (requires ``dask``).
+            bbox: ``(lon_min, lat_min, lon_max, lat_max)`` box the fields are cropped to.
+            points: ``[(lon, lat), ...]`` locations whose nearest grid points are kept.
+            dtype: Dtype the fields are cast to as soon as they are decoded (e.g. ``"float16"``).
+            packing: ``"int16"`` or ``"int8"``: CF packing of the fields written to NetCDF/Zarr.
+            steps: ``slice(first, last[, step])`` of lead hours to download (*last* included).
+            max_lead: Last lead hour, same as ``steps=slice(None, max_lead)``.
+
+        These options are detailed in ``Model._fetch`` and in the usage guide.
 
         Returns:
             Dict of ``xr.DataArray`` (CF-encoded) when ``return_data=True``,
@@ -99,47 +174,221 @@ class ECMWF(Model):
         Raises:
             ValueError: If ``path`` is ``None`` and ``return_data`` is ``False``.
         """
+        steps = lead_range(steps, max_lead)
         date_dt = pd.to_datetime(str(date)).floor(f"{cls.freq_update}h")
         date_str = f"{date_dt:%Y-%m-%dT%H}"
 
-        if (path is None) and (not return_data):
-            raise ValueError("Le chemin doit être spécifié si return_data est False.")
-
         logger.info("Fetching %s forecast for run %s", cls.__name__, date_str)
-        with TemporaryDirectory(prefix="meteofetch_") as tempdir:
-            if path is None:
-                path = tempdir
-
-            paths = cls._download_paquet(
-                date=date_str,
-                path=path,
-                num_workers=num_workers,
-                num_retries=num_retries,
-            )
-            if return_data:
-                datasets = cls._read_multiple_gribs(paths=paths, variables=variables, num_workers=num_workers)
-                if path is None:
-                    for da in datasets.values():
-                        da.load()
-                return datasets
-            else:
-                return paths
+        ret = cls._fetch(
+            urls=cls._get_urls(date=date_str, steps=steps),
+            variables=variables,
+            path=path,
+            return_data=return_data,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            backend=backend,
+            pipeline=pipeline,
+            lazy=lazy,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+        )
+        return cls._select_leads(ret, date_dt, steps) if return_data else ret
+
+    @classmethod
+    def iter_forecast(
+        cls,
+        date: Union[str, pd.Timestamp],
+        variables: Optional[list] = None,
+        path: Optional[str] = None,
+        num_workers: int = 4,
+        num_retries: int = 1,
+        byte_range: bool = False,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+        steps: Optional[slice] = None,
+        max_lead: Optional[int] = None,
+    ) -> Iterator[Tuple[pd.Timestamp, Dict[str, xr.DataArray]]]:
+        """Iterate over the forecast of a given run date, one valid time at a time.
+
+        Unlike ``get_forecast``, the whole run is never held in memory: files are downloaded
+        a few at a time, read, and deleted (unless *path* is given) once their fields are yielded.
+
+        Args:
+            date: Run date/time. Floored to the nearest ``freq_update`` hour boundary.
+            path: Directory where GRIB files are kept. Uses a temporary directory if ``None``.
+            num_workers: Number of files downloaded ahead of the one being read.
+
+        The other arguments are those of ``get_forecast``.
+
+        Yields:
+            ``(valid_time, fields)`` tuples, where *fields* maps field names to CF-encoded
+            ``xr.DataArray`` with a ``time`` dimension of length 1.
+
+        Raises:
+            ForecastNotAvailableError: If a file cannot be downloaded.
+        """
+        steps = lead_range(steps, max_lead)
+        date_dt = pd.to_datetime(str(date)).floor(f"{cls.freq_update}h")
+        date_str = f"{date_dt:%Y-%m-%dT%H}"
+
+        logger.info("Iterating over %s forecast for run %s", cls.__name__, date_str)
+        yield from cls._iter_fetch(
+            urls=cls._get_urls(date=date_str, steps=steps),
+            variables=variables,
+            path=path,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+            date=date_dt,
+            steps=steps,
+        )
 
     @classmethod
-    def get_latest_forecast_time(cls) -> Optional[pd.Timestamp]:
-        """Return the most recent run timestamp for which all files are available.
+    def watch_run(
+        cls,
+        date: Union[str, pd.Timestamp],
+        variables: Optional[list] = None,
+        path: Optional[str] = None,
+        num_workers: int = 4,
+        num_retries: int = 1,
+        byte_range: bool = False,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+        steps: Optional[slice] = None,
+        max_lead: Optional[int] = None,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = 3 * 3600.0,
+    ) -> Iterator[Tuple[pd.Timestamp, Dict[str, xr.DataArray]]]:
+        """Follow a run being published: yield the fields of each step as soon as its file appears.
+
+        The next missing files are probed every *poll_interval* seconds, and each file is
+        downloaded and decoded as soon as it is published. The iteration ends once every
+        step is read.
+
+        Args:
+            poll_interval: Delay between two probes of the next missing files, in seconds.
+            timeout: Maximum time to wait for a new file, in seconds (``None`` to wait forever).
+
+        The other arguments are those of ``iter_forecast``.
 
-        Iterates over the last ``past_runs_`` run times in reverse-chronological
-        order (UTC) and returns the first one whose URLs are all reachable.
+        Yields:
+            ``(valid_time, fields)`` tuples, as ``iter_forecast``.
+
+        Raises:
+            ForecastNotAvailableError: If a file cannot be downloaded, or no new file is
+                published within *timeout* seconds.
+        """
+        steps = lead_range(steps, max_lead)
+        date_dt = pd.to_datetime(str(date)).floor(f"{cls.freq_update}h")
+        date_str = f"{date_dt:%Y-%m-%dT%H}"
+
+        logger.info("Watching %s run %s", cls.__name__, date_str)
+        yield from cls._watch_fetch(
+            urls=cls._get_urls(date=date_str, steps=steps),
+            variables=variables,
+            path=path,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            poll_interval=poll_interval,
+            timeout=timeout,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+            date=date_dt,
+            steps=steps,
+        )
+
+    @classmethod
+    def follow_latest(cls, **kwargs) -> Iterator[Tuple[pd.Timestamp, Dict[str, xr.DataArray]]]:
+        """Follow the most recent run whose publication has started (see ``watch_run``).
+
+        Args:
+            **kwargs: Arguments of ``watch_run`` (``variables``, ``poll_interval``...).
+
+        Raises:
+            ForecastNotAvailableError: If no run has started among the last ``past_runs_`` runs.
+        """
+        date = cls._find_latest_run(lambda date: cls._get_urls(date=date)[:1], key=("started",))
+        if date is None:
+            raise ForecastNotAvailableError(f"No {cls.__name__} run started among the last {cls.past_runs_} runs.")
+        yield from cls.watch_run(date=date, **kwargs)
+
+    @classmethod
+    def sync_run(
+        cls,
+        path: Union[str, Path],
+        date: Optional[Union[str, pd.Timestamp]] = None,
+        num_workers: int = 4,
+        num_retries: int = 1,
+        steps: Optional[slice] = None,
+        max_lead: Optional[int] = None,
+        mirror: bool = False,
+    ) -> SyncResult:
+        """Mirror the files of a run in *path*, downloading only those that are new or changed.
+
+        Each file is probed with a HEAD request, and its ``ETag``, ``Last-Modified`` and
+        ``Content-Length`` headers are compared with those recorded in a manifest
+        (``.meteofetch-manifest.json``) at the previous synchronisation of *path*. When
+        nothing changed, a synchronisation only sends HEAD requests.
+
+        Args:
+            path: Directory of the mirror. Created if needed.
+            date: Run timestamp. Defaults to the latest available run.
+            num_workers: Number of parallel requests.
+            num_retries: Number of additional attempts per file on failure.
+            steps: Lead hours to mirror, as ``slice(first, last)`` (see ``lead_range``).
+            max_lead: Last lead hour, same as ``steps=slice(None, max_lead)``.
+            mirror: If ``True``, the files are laid out in *path* as on the server (one
+                directory per run, with the upstream file names, and the ``.index`` files),
+                so that *path* can replace the server (see ``set_base_url``). Several models
+                and runs can share the same *path*.
+
+        Returns:
+            A ``SyncResult``: the local paths of all the files of the run, and those downloaded
+            by this synchronisation.
+
+        Raises:
+            ForecastNotAvailableError: If *date* is ``None`` and no run is available, or if a
+                file cannot be downloaded.
+        """
+        date_dt, _ = cls._resolve_run(date)
+        urls = cls._get_urls(date=f"{date_dt:%Y-%m-%dT%H}", steps=lead_range(steps, max_lead))
+        logger.info("Syncing %s run %s to %s", cls.__name__, date_dt, path)
+        if mirror:
+            urls += [url.rsplit(".", 1)[0] + ".index" for url in urls]
+        return cls._sync(urls, path, num_workers=num_workers, num_retries=num_retries, mirror=mirror)
+
+    @classmethod
+    def get_latest_forecast_time(cls, verify: bool = False) -> Optional[pd.Timestamp]:
+        """Return the most recent run timestamp for which the files are available.
+
+        Only the last file of each run (the last one to be published) is checked, and the
+        result is cached for ``freq_update`` hours, during which only newer runs are probed.
+
+        Args:
+            verify: If ``True``, also check that every file of the run is available, and
+                fall back to older runs otherwise.
 
         Returns:
             The latest available run ``pd.Timestamp``, or ``None`` if none found.
         """
-        for date in cls._iter_run_dates():
-            if are_downloadable(cls._get_urls(date=date)):
-                logger.info("Latest available %s run: %s", cls.__name__, date)
-                return date
-        return None
+        date = cls._find_latest_run(lambda date: cls._get_urls(date=date), key=(), verify=verify)
+        if date is not None:
+            logger.info("Latest available %s run: %s", cls.__name__, date)
+        return date
 
     @classmethod
     @overload
@@ -150,6 +399,16 @@ class ECMWF(Model):
         return_data: Literal[True] = ...,
         num_workers: int = ...,
         num_retries: int = ...,
+        byte_range: bool = ...,
+        backend: Backend = ...,
+        pipeline: bool = ...,
+        lazy: bool = ...,
+        bbox: Optional[BBox] = ...,
+        points: Optional[Points] = ...,
+        dtype: Optional[str] = ...,
+        packing: Optional[Packing] = ...,
+        steps: Optional[slice] = ...,
+        max_lead: Optional[int] = ...,
     ) -> Dict[str, xr.DataArray]: ...
 
     @classmethod
@@ -161,6 +420,16 @@ class ECMWF(Model):
         return_data: Literal[False] = ...,
         num_workers: int = ...,
         num_retries: int = ...,
+        byte_range: bool = ...,
+        backend: Backend = ...,
+        pipeline: bool = ...,
+        lazy: bool = ...,
+        bbox: Optional[BBox] = ...,
+        points: Optional[Points] = ...,
+        dtype: Optional[str] = ...,
+        packing: Optional[Packing] = ...,
+        steps: Optional[slice] = ...,
+        max_lead: Optional[int] = ...,
     ) -> List[Path]: ...
 
     @classmethod
@@ -171,48 +440,153 @@ class ECMWF(Model):
         return_data: bool = True,
         num_workers: int = 4,
         num_retries: int = 1,
+        byte_range: bool = False,
+        backend: Backend = "threads",
+        pipeline: bool = False,
+        lazy: bool = False,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+        steps: Optional[slice] = None,
+        max_lead: Optional[int] = None,
     ) -> Union[Dict[str, xr.DataArray], List[Path]]:
         """Fetch the most recent available forecast.
 
         Iterates over the last ``past_runs_`` run times (newest first) and
-        downloads the first run whose files are all reachable.
+        downloads the first run that is published (see ``get_latest_forecast_time``).
+        Only the last file of the run is probed: if a file of the run cannot be downloaded,
+        the previous published run is fetched instead.
 
-        Args:
-            variables: Field names to keep. If ``None``, all fields are returned.
-            path: Directory for GRIB files. Uses a temporary directory if ``None``.
-            return_data: If ``True``, return a dict of DataArrays. If ``False``,
-                save files to *path* and return their paths.
-            num_workers: Parallel download/read workers.
-            num_retries: Extra download attempts per file on failure.
-
-        Returns:
-            Dict of ``xr.DataArray`` (CF-encoded) when ``return_data=True``,
-            or list of ``Path`` objects when ``return_data=False``.
+        The arguments and the return value are those of ``get_forecast``, without *date*.
 
         Raises:
             ForecastNotAvailableError: If no valid run is found among the last
                 ``past_runs_`` runs.
         """
         date = cls.get_latest_forecast_time()
-        if date:
-            ret = cls.get_forecast(
-                date=date,
-                variables=variables,
-                path=path,
-                return_data=return_data,
-                num_workers=num_workers,
-                num_retries=num_retries,
-            )
-            if ret:
-                return ret
-        raise ForecastNotAvailableError(
-            f"No valid {cls.__name__} run found among the last {cls.past_runs_} runs."
+        fetch = partial(
+            cls.get_forecast,
+            variables=variables,
+            path=path,
+            return_data=return_data,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            backend=backend,
+            pipeline=pipeline,
+            lazy=lazy,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+            steps=steps,
+            max_lead=max_lead,
         )
+        ret = fetch(date=date) if date else None
+        if date and not ret:
+            logger.warning("%s run %s could not be fetched, falling back to the previous run", cls.__name__, date)
+            date = cls._find_latest_run(lambda date: cls._get_urls(date=date), key=(), before=date)
+            ret = fetch(date=date) if date else None
+        if ret:
+            return ret
+        raise ForecastNotAvailableError(f"No valid {cls.__name__} run found among the last {cls.past_runs_} runs.")
+
+    @classmethod
+    async def aget_forecast(
+        cls,
+        date: Union[str, pd.Timestamp],
+        variables: Optional[list] = None,
+        path: Optional[str] = None,
+        return_data: bool = True,
+        num_workers: int = 4,
+        num_retries: int = 1,
+        byte_range: bool = False,
+        client=None,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+    ) -> Union[Dict[str, xr.DataArray], List[Path]]:
+        """Coroutine version of ``get_forecast``, based on the async backend (requires ``httpx``).
+
+        Files are downloaded on the running event loop and decoded in a worker thread, so that
+        several models can be fetched concurrently with ``asyncio.gather``.
+
+        Args:
+            client: ``httpx.AsyncClient`` to use, e.g. to share one connection pool between
+                concurrent calls. A client is created for the call if ``None``.
+
+        The other arguments, the return value and the exceptions are those of ``get_forecast``.
+        """
+        date_dt = pd.to_datetime(str(date)).floor(f"{cls.freq_update}h")
+        date_str = f"{date_dt:%Y-%m-%dT%H}"
+
+        logger.info("Fetching %s forecast for run %s", cls.__name__, date_str)
+        return await cls._afetch(
+            urls=cls._get_urls(date=date_str),
+            variables=variables,
+            path=path,
+            return_data=return_data,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            client=client,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+        )
+
+    @classmethod
+    async def aget_latest_forecast(
+        cls,
+        variables: Optional[list] = None,
+        path: Optional[str] = None,
+        return_data: bool = True,
+        num_workers: int = 4,
+        num_retries: int = 1,
+        byte_range: bool = False,
+        client=None,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+    ) -> Union[Dict[str, xr.DataArray], List[Path]]:
+        """Coroutine version of ``get_latest_forecast`` (see ``aget_forecast``)."""
+        loop = asyncio.get_running_loop()
+        date = await loop.run_in_executor(None, cls.get_latest_forecast_time)
+        fetch = partial(
+            cls.aget_forecast,
+            variables=variables,
+            path=path,
+            return_data=return_data,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            client=client,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+        )
+        ret = await fetch(date=date) if date else None
+        if date and not ret:
+            logger.warning("%s run %s could not be fetched, falling back to the previous run", cls.__name__, date)
+            date = await loop.run_in_executor(
+                None, partial(cls._find_latest_run, lambda date: cls._get_urls(date=date), key=(), before=date)
+            )
+            ret = await fetch(date=date) if date else None
+        if ret:
+            return ret
+        raise ForecastNotAvailableError(f"No valid {cls.__name__} run found among the last {cls.past_runs_} runs.")
 
     @classmethod
     def availability(cls, return_date: bool = False) -> pd.Series:
         """Check download availability for the last ``past_runs_`` run times.
 
+        The files of every run are probed at once (see ``probe_urls``).
+
         Args:
             return_date: If ``True``, return the ``Last-Modified`` date for each
                 run instead of a boolean.
@@ -220,8 +594,8 @@ class ECMWF(Model):
         Returns:
             ``pd.Series`` indexed by run timestamp.
         """
-        index, ret = [], []
-        for date in cls._iter_run_dates():
-            index.append(date)
-            ret.append(are_downloadable(cls._get_urls(date=date), return_date=return_date))
-        return pd.Series(ret, index=index, name=f"{cls.__name__.lower()}")
+        dates = cls._iter_run_dates()
+        urls = {date: cls._get_urls(date=date) for date in dates}
+        results = probe_urls((url for group in urls.values() for url in group), return_date=return_date)
+        ret = [combine_availability([results[url] for url in urls[date]], return_date) for date in dates]
+        return pd.Series(ret, index=dates, name=f"{cls.__name__.lower()}")
@@ -1,14 +1,20 @@
+import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import re
+from collections import Counter
+from functools import lru_cache, partial
 from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import Dict, List, Literal, Optional, Union, overload
+from typing import Dict, Iterator, List, Literal, Optional, Sequence, Tuple, Union, overload
 
+import numpy as np
 import pandas as pd
 import xarray as xr
 
-from .._misc import ForecastNotAvailableError, are_downloadable
-from .._model import Model
+from .._index import grib_layout, layout_key, load_layout, merge_ranges, save_layout, scan_grib_offsets
+from .._misc import ForecastNotAvailableError, Packing, combine_availability, probe_urls
+from .._model import Backend, Model, lead_range
+from .._spatial import BBox, Points
+from .._sync import SyncResult
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +36,18 @@ class MeteoFrance(Model):
         """Return the group identifiers for *paquet* (overridden by OutreMer models)."""
         return cls.groups_
 
+    @classmethod
+    def _group_leads(cls, group: str) -> Tuple[int, int]:
+        """Lead hours of a group: ``"07H12H"`` holds the leads 7 to 12, ``"013H"`` the lead 13."""
+        hours = [int(hour) for hour in re.findall(r"(\d+)H", group)]
+        return hours[0], hours[-1]
+
+    @classmethod
+    def _file_leads(cls, name: str) -> int:
+        """Number of lead times in a file, from its group: ``"13H18H"`` holds the hourly leads 13 to 18."""
+        match = re.search(r"__(\d+)H(\d+)H__", name)
+        return int(match.group(2)) - int(match.group(1)) + 1 if match else 1
+
     @classmethod
     def check_paquet(cls, paquet: Paquet) -> None:
         """Raise ``ValueError`` if *paquet* is not valid for this model."""
@@ -37,28 +55,87 @@ class MeteoFrance(Model):
             raise ValueError(f"paquet must be one of {cls.paquets_}, got {paquet!r}")
 
     @classmethod
-    def _get_urls(cls, paquet: Paquet, date: str) -> List[str]:
-        """Build the list of GRIB2 download URLs for a given paquet and run date."""
+    def _check_paquets(cls, paquets: Sequence[Paquet]) -> Tuple[Paquet, ...]:
+        """Return *paquets* without duplicates; raise ``ValueError`` if it is empty or holds an invalid paquet."""
+        paquets = tuple(dict.fromkeys(paquets))
+        if not paquets:
+            raise ValueError("paquets must not be empty")
+        for paquet in paquets:
+            cls.check_paquet(paquet)
+        return paquets
+
+    @staticmethod
+    def _merge_paquets(fields: Dict[str, Dict[str, xr.DataArray]]) -> Dict[str, xr.DataArray]:
+        """Merge the fields of several paquets; a field found in several paquets is renamed ``{field}_{paquet}``."""
+        counts = Counter(name for paquet_fields in fields.values() for name in paquet_fields)
+        ret = {}
+        for paquet, paquet_fields in fields.items():
+            for name, da in paquet_fields.items():
+                if counts[name] > 1:
+                    name = f"{name}_{paquet}"
+                    da = da.rename(name)
+                ret[name] = da
+        return ret
+
+    @classmethod
+    def _get_urls(cls, paquet: Paquet, date: str, steps: Optional[slice] = None) -> List[str]:
+        """Build the list of GRIB2 download URLs for a given paquet and run date.
+
+        Only the groups holding the lead hours of *steps* are kept (see ``lead_range``).
+        """
         return [
-            cls.base_url_ + "/" + cls.url_.format(date=date, paquet=paquet, group=group)
-            for group in cls._get_groups(paquet=paquet)
+            cls._base_url() + "/" + cls.url_.format(date=date, paquet=paquet, group=group)
+            for group in cls._select_groups(cls._get_groups(paquet=paquet), steps)
         ]
 
     @classmethod
-    def _download_paquet(
-        cls, date: str, paquet: Paquet, path: str, num_workers: int, num_retries: int = 1
-    ) -> List[Path]:
-        """Download all GRIB files for a paquet/run-date into *path*.
+    def _resolve_run(
+        cls, date: Optional[Union[str, pd.Timestamp]], paquet: Optional[Paquet] = None
+    ) -> Tuple[pd.Timestamp, List[str]]:
+        """Return the run date and the URLs of a batch request (see ``fetch_many``).
 
-        Returns an empty list if any file fails to download.
+        Raises:
+            ValueError: If *paquet* is invalid.
+            ForecastNotAvailableError: If *date* is ``None`` and no run is available.
         """
+        paquet = "SP1" if paquet is None else paquet
         cls.check_paquet(paquet)
-        urls = cls._get_urls(paquet=paquet, date=date)
-        paths = cls._download_urls(urls, path, num_workers, num_retries)
-        if not all(paths):
-            logger.error("Some files could not be downloaded for %s paquet=%s run %s", cls.__name__, paquet, date)
-            return []
-        return [p for p in paths if isinstance(p, Path)]
+        if date is None:
+            date = cls.get_latest_forecast_time(paquet=paquet)
+            if date is None:
+                raise ForecastNotAvailableError(f"No valid {cls.__name__} run found (paquet={paquet}).")
+        date_dt = pd.to_datetime(str(date)).floor(f"{cls.freq_update}h")
+        return date_dt, cls._get_urls(paquet=paquet, date=f"{date_dt:%Y-%m-%dT%H}")
+
+    @classmethod
+    def _get_ranges(cls, url: str, variables: list) -> Optional[List[Tuple[int, int]]]:
+        """Locate the messages of *variables* from the layout learned on a previous run.
+
+        Météo-France does not publish index files: the ordered list of fields of each
+        file is recorded after a full download (see ``_record_layout``), and message
+        offsets are read from the remote file headers.
+        """
+        layout = load_layout(layout_key(cls.__name__, url))
+        if layout is None:
+            return None
+        try:
+            offsets = scan_grib_offsets(url, timeout=cls.TIMEOUT)
+        except ValueError as e:
+            logger.warning("Could not index %s: %s", url, e)
+            return None
+        if len(offsets) != len(layout):
+            logger.warning("Stored layout of %s is outdated, downloading the whole file", url)
+            return None
+        return merge_ranges(
+            (offset, offset + length - 1)
+            for (offset, length), names in zip(offsets, layout)
+            if any(name in variables for name in names)
+        )
+
+    @classmethod
+    def _record_layout(cls, url: str, path: Path) -> None:
+        """Store the ordered list of fields of a fully downloaded file, for later byte-range downloads."""
+        save_layout(layout_key(cls.__name__, url), grib_layout(path))
 
     @classmethod
     @overload
@@ -71,6 +148,17 @@ class MeteoFrance(Model):
         return_data: Literal[True] = ...,
         num_workers: int = ...,
         num_retries: int = ...,
+        byte_range: bool = ...,
+        backend: Backend = ...,
+        pipeline: bool = ...,
+        lazy: bool = ...,
+        bbox: Optional[BBox] = ...,
+        points: Optional[Points] = ...,
+        dtype: Optional[str] = ...,
+        packing: Optional[Packing] = ...,
+        paquets: Optional[Sequence[Paquet]] = ...,
+        steps: Optional[slice] = ...,
+        max_lead: Optional[int] = ...,
     ) -> Dict[str, xr.DataArray]: ...
 
     @classmethod
@@ -84,6 +172,17 @@ class MeteoFrance(Model):
         return_data: Literal[False] = ...,
         num_workers: int = ...,
         num_retries: int = ...,
+        byte_range: bool = ...,
+        backend: Backend = ...,
+        pipeline: bool = ...,
+        lazy: bool = ...,
+        bbox: Optional[BBox] = ...,
+        points: Optional[Points] = ...,
+        dtype: Optional[str] = ...,
+        packing: Optional[Packing] = ...,
+        paquets: Optional[Sequence[Paquet]] = ...,
+        steps: Optional[slice] = ...,
+        max_lead: Optional[int] = ...,
     ) -> List[Path]: ...
 
     @classmethod
@@ -96,6 +195,17 @@ class MeteoFrance(Model):
         return_data: bool = True,
         num_workers: int = 4,
         num_retries: int = 1,
+        byte_range: bool = False,
+        backend: Backend = "threads",
+        pipeline: bool = False,
+        lazy: bool = False,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+        paquets: Optional[Sequence[Paquet]] = None,
+        steps: Optional[slice] = None,
+        max_lead: Optional[int] = None,
     ) -> Union[Dict[str, xr.DataArray], List[Path]]:
         """Fetch the forecast for a given run date and paquet.
 
@@ -104,46 +214,290 @@ class MeteoFrance(Model):
             paquet: Data package identifier. Must be in ``cls.paquets_``. Defaults to ``"SP1"``.
             variables: Field names to keep. If ``None``, all fields are returned.
             path: Directory for GRIB files. Uses a temporary directory if ``None``.
-            return_data: If ``True``, load data into memory and return a dict of
-                DataArrays. If ``False``, save files to *path* and return their paths.
+            return_data: If ``False``, save files to *path* and return their paths.
             num_workers: Parallel download/read workers.
             num_retries: Extra download attempts per file on failure.
+            byte_range: Download only the GRIB messages of *variables*, with HTTP Range requests.
+            backend: ``"threads"`` (default) or ``"async"`` (requires ``httpx``).
+            pipeline: Decode each file as soon as it is downloaded.
+            lazy: Return dask-backed DataArrays, decoded when computed (requires ``dask``).
+            bbox: ``(lon_min, lat_min, lon_max, lat_max)`` box the fields are cropped to.
+            points: ``[(lon, lat), ...]`` locations whose nearest grid points are kept.
+            dtype: Dtype the fields are cast to as soon as they are decoded (e.g. ``"float16"``).
+            packing: ``"int16"`` or ``"int8"``: CF packing of the fields written to NetCDF/Zarr.
+            paquets: Paquets fetched in a single call instead of *paquet*, sharing one download pool
+                and one decoding pool (*pipeline* is implied). Fields are merged into one dict; a
+                field found in several paquets is renamed ``{field}_{paquet}``.
+            steps: ``slice(first, last[, step])`` of lead hours to download (*last* included).
+            max_lead: Last lead hour, same as ``steps=slice(None, max_lead)``.
+
+        These options are detailed in ``Model._fetch`` and in the usage guide.
 
         Returns:
             Dict of ``xr.DataArray`` (CF-encoded) when ``return_data=True``,
             or list of ``Path`` objects when ``return_data=False``.
 
         Raises:
-            ValueError: If *paquet* is invalid, or if *path* is ``None`` and
-                ``return_data`` is ``False``.
+            ValueError: If *paquet* (or one of *paquets*) is invalid, or if *path* is ``None``
+                and ``return_data`` is ``False``.
         """
-        cls.check_paquet(paquet)
+        if paquets is None:
+            cls.check_paquet(paquet)
+        else:
+            paquets = cls._check_paquets(paquets)
+        steps = lead_range(steps, max_lead)
         date_dt = pd.to_datetime(str(date)).floor(f"{cls.freq_update}h")
         date_str = f"{date_dt:%Y-%m-%dT%H}"
 
-        if (path is None) and (not return_data):
-            raise ValueError("Le chemin doit être spécifié si return_data est False.")
-
-        logger.info("Fetching %s forecast for run %s (paquet=%s)", cls.__name__, date_str, paquet)
-        with TemporaryDirectory(prefix="meteofetch_") as tempdir:
-            if path is None:
-                path = tempdir
-
-            paths = cls._download_paquet(
-                date=date_str,
-                paquet=paquet,
+        if paquets is not None:
+            logger.info("Fetching %s forecast for run %s (paquets=%s)", cls.__name__, date_str, ",".join(paquets))
+            ret = cls._fetch_groups(
+                groups={paquet: cls._get_urls(paquet=paquet, date=date_str, steps=steps) for paquet in paquets},
+                variables=variables,
                 path=path,
+                return_data=return_data,
                 num_workers=num_workers,
                 num_retries=num_retries,
+                byte_range=byte_range,
+                backend=backend,
+                lazy=lazy,
+                bbox=bbox,
+                points=points,
+                dtype=dtype,
+                packing=packing,
+            )
+            return cls._select_leads(cls._merge_paquets(ret), date_dt, steps) if return_data else ret
+
+        logger.info("Fetching %s forecast for run %s (paquet=%s)", cls.__name__, date_str, paquet)
+        ret = cls._fetch(
+            urls=cls._get_urls(paquet=paquet, date=date_str, steps=steps),
+            variables=variables,
+            path=path,
+            return_data=return_data,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            backend=backend,
+            pipeline=pipeline,
+            lazy=lazy,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+        )
+        return cls._select_leads(ret, date_dt, steps) if return_data else ret
+
+    @classmethod
+    def iter_forecast(
+        cls,
+        date: Union[str, pd.Timestamp],
+        paquet: Paquet = "SP1",
+        variables: Optional[list] = None,
+        path: Optional[str] = None,
+        num_workers: int = 4,
+        num_retries: int = 1,
+        byte_range: bool = False,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+        steps: Optional[slice] = None,
+        max_lead: Optional[int] = None,
+    ) -> Iterator[Tuple[pd.Timestamp, Dict[str, xr.DataArray]]]:
+        """Iterate over the forecast of a given run date and paquet, one valid time at a time.
+
+        Unlike ``get_forecast``, the whole run is never held in memory: files are downloaded
+        a few at a time, read, and deleted (unless *path* is given) once their fields are yielded.
+
+        Args:
+            date: Run date/time. Floored to the nearest ``freq_update`` hour boundary.
+            paquet: Data package identifier. Must be in ``cls.paquets_``. Defaults to ``"SP1"``.
+            path: Directory where GRIB files are kept. Uses a temporary directory if ``None``.
+            num_workers: Number of files downloaded ahead of the one being read.
+
+        The other arguments are those of ``get_forecast``.
+
+        Yields:
+            ``(valid_time, fields)`` tuples, where *fields* maps field names to CF-encoded
+            ``xr.DataArray`` with a ``time`` dimension of length 1.
+
+        Raises:
+            ValueError: If *paquet* is invalid.
+            ForecastNotAvailableError: If a file cannot be downloaded.
+        """
+        cls.check_paquet(paquet)
+        steps = lead_range(steps, max_lead)
+        date_dt = pd.to_datetime(str(date)).floor(f"{cls.freq_update}h")
+        date_str = f"{date_dt:%Y-%m-%dT%H}"
+
+        logger.info("Iterating over %s forecast for run %s (paquet=%s)", cls.__name__, date_str, paquet)
+        yield from cls._iter_fetch(
+            urls=cls._get_urls(paquet=paquet, date=date_str, steps=steps),
+            variables=variables,
+            path=path,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+            date=date_dt,
+            steps=steps,
+        )
+
+    @classmethod
+    def watch_run(
+        cls,
+        date: Union[str, pd.Timestamp],
+        paquet: Paquet = "SP1",
+        variables: Optional[list] = None,
+        path: Optional[str] = None,
+        num_workers: int = 4,
+        num_retries: int = 1,
+        byte_range: bool = False,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+        steps: Optional[slice] = None,
+        max_lead: Optional[int] = None,
+        poll_interval: float = 60.0,
+        timeout: Optional[float] = 3 * 3600.0,
+    ) -> Iterator[Tuple[pd.Timestamp, Dict[str, xr.DataArray]]]:
+        """Follow a run being published: yield the fields of each group as soon as its file appears.
+
+        Météo-France publishes the groups of a run one after the other, over an hour or more.
+        Instead of waiting for the whole run (see ``get_latest_forecast_time``), the next
+        missing files are probed every *poll_interval* seconds, and each file is downloaded
+        and decoded as soon as it is published. The iteration ends once every group is read.
+
+        Args:
+            poll_interval: Delay between two probes of the next missing files, in seconds.
+            timeout: Maximum time to wait for a new file, in seconds (``None`` to wait forever).
+
+        The other arguments are those of ``iter_forecast``.
+
+        Yields:
+            ``(valid_time, fields)`` tuples, as ``iter_forecast``.
+
+        Raises:
+            ValueError: If *paquet* is invalid.
+            ForecastNotAvailableError: If a file cannot be downloaded, or no new file is
+                published within *timeout* seconds.
+        """
+        cls.check_paquet(paquet)
+        steps = lead_range(steps, max_lead)
+        date_dt = pd.to_datetime(str(date)).floor(f"{cls.freq_update}h")
+        date_str = f"{date_dt:%Y-%m-%dT%H}"
+
+        logger.info("Watching %s run %s (paquet=%s)", cls.__name__, date_str, paquet)
+        yield from cls._watch_fetch(
+            urls=cls._get_urls(paquet=paquet, date=date_str, steps=steps),
+            variables=variables,
+            path=path,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            poll_interval=poll_interval,
+            timeout=timeout,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+            date=date_dt,
+            steps=steps,
+        )
+
+    @classmethod
+    def follow_latest(cls, paquet: Paquet = "SP1", **kwargs) -> Iterator[Tuple[pd.Timestamp, Dict[str, xr.DataArray]]]:
+        """Follow the most recent run whose publication has started (see ``watch_run``).
+
+        Only the first file of each candidate run is probed, so a run is followed as soon
+        as its first group is published.
+
+        Args:
+            paquet: Data package identifier. Must be in ``cls.paquets_``. Defaults to ``"SP1"``.
+            **kwargs: Arguments of ``watch_run`` (``variables``, ``poll_interval``...).
+
+        Raises:
+            ForecastNotAvailableError: If no run has started among the last ``past_runs_`` runs.
+        """
+        cls.check_paquet(paquet)
+        date = cls._find_latest_run(
+            lambda date: cls._get_urls(paquet=paquet, date=f"{date:%Y-%m-%dT%H}")[:1], key=("started", paquet)
+        )
+        if date is None:
+            raise ForecastNotAvailableError(
+                f"No {cls.__name__} run started for paquet={paquet!r} among the last {cls.past_runs_} runs."
             )
-            if return_data:
-                datasets = cls._read_multiple_gribs(paths=paths, variables=variables, num_workers=num_workers)
-                if path is None:
-                    for da in datasets:
-                        da.load()
-                return datasets
-            else:
-                return paths
+        yield from cls.watch_run(date=date, paquet=paquet, **kwargs)
+
+    @classmethod
+    def sync_run(
+        cls,
+        path: Union[str, Path],
+        date: Optional[Union[str, pd.Timestamp]] = None,
+        paquet: Paquet = "SP1",
+        num_workers: int = 4,
+        num_retries: int = 1,
+        steps: Optional[slice] = None,
+        max_lead: Optional[int] = None,
+        mirror: bool = False,
+    ) -> SyncResult:
+        """Mirror the files of a run in *path*, downloading only those that are new or changed.
+
+        Each file is probed with a HEAD request, and its ``ETag``, ``Last-Modified`` and
+        ``Content-Length`` headers are compared with those recorded in a manifest
+        (``.meteofetch-manifest.json``) at the previous synchronisation of *path*. When
+        nothing changed, a synchronisation only sends HEAD requests.
+
+        Args:
+            path: Directory of the mirror. Created if needed.
+            date: Run timestamp. Defaults to the latest available run.
+            paquet: Data package identifier. Must be in ``cls.paquets_``. Defaults to ``"SP1"``.
+            num_workers: Number of parallel requests.
+            num_retries: Number of additional attempts per file on failure.
+            steps: Lead hours to mirror, as ``slice(first, last)`` (see ``lead_range``).
+            max_lead: Last lead hour, same as ``steps=slice(None, max_lead)``.
+            mirror: If ``True``, the files are laid out in *path* as on the server (one
+                directory per run, with the upstream file names), so that *path* can replace
+                the server (see ``set_base_url``). Several models and runs can share the same
+                *path*.
+
+        Returns:
+            A ``SyncResult``: the local paths of all the files of the run, and those downloaded
+            by this synchronisation.
+
+        Raises:
+            ValueError: If *paquet* is invalid.
+            ForecastNotAvailableError: If *date* is ``None`` and no run is available, or if a
+                file cannot be downloaded.
+        """
+        date_dt, _ = cls._resolve_run(date, paquet)
+        urls = cls._get_urls(paquet=paquet, date=f"{date_dt:%Y-%m-%dT%H}", steps=lead_range(steps, max_lead))
+        logger.info("Syncing %s run %s (paquet=%s) to %s", cls.__name__, date_dt, paquet, path)
+        return cls._sync(urls, path, num_workers=num_workers, num_retries=num_retries, mirror=mirror)
+
+    @classmethod
+    def _availability(cls, paquets: Tuple[Paquet, ...], return_date: bool = False) -> pd.DataFrame:
+        """Probe all the files of *paquets* for the last ``past_runs_`` runs at once (see ``probe_urls``)."""
+        dates = cls._iter_run_dates()
+        urls = {
+            (paquet, date): cls._get_urls(paquet=paquet, date=f"{date:%Y-%m-%dT%H}")
+            for paquet in paquets
+            for date in dates
+        }
+        results = probe_urls((url for group in urls.values() for url in group), return_date=return_date)
+        return pd.DataFrame(
+            {
+                paquet: [
+                    combine_availability([results[url] for url in urls[paquet, date]], return_date) for date in dates
+                ]
+                for paquet in paquets
+            },
+            index=dates,
+        )
 
     @classmethod
     def availability_paquet(cls, paquet: Paquet, return_date: bool = False) -> pd.Series:
@@ -157,46 +511,62 @@ class MeteoFrance(Model):
         Returns:
             ``pd.Series`` indexed by run timestamp, named after *paquet*.
         """
-        index, ret = [], []
-        for date in cls._iter_run_dates():
-            index.append(date)
-            ret.append(are_downloadable(cls._get_urls(paquet=paquet, date=f"{date:%Y-%m-%dT%H}"), return_date=return_date))
-        return pd.Series(ret, index=index, name=paquet)
+        return cls._availability((paquet,), return_date=return_date)[paquet]
 
     @classmethod
     def availability(cls, return_date: bool = False) -> pd.DataFrame:
         """Check availability for all paquets across the last ``past_runs_`` runs.
 
+        The files of every paquet and run are probed at once, through a single bounded
+        pool of HEAD requests on kept-alive connections.
+
         Args:
             return_date: If ``True``, return ``Last-Modified`` dates instead of booleans.
 
         Returns:
             ``pd.DataFrame`` with paquets as columns and run timestamps as the index.
         """
-        with ThreadPoolExecutor() as executor:
-            ret = list(
-                executor.map(
-                    lambda paquet: cls.availability_paquet(paquet=paquet, return_date=return_date),
-                    cls.paquets_,
-                )
-            )
-        return pd.concat(ret, axis=1)
+        return cls._availability(tuple(cls.paquets_), return_date=return_date)
 
     @classmethod
-    def get_latest_forecast_time(cls, paquet: Paquet) -> Optional[pd.Timestamp]:
-        """Return the most recent run timestamp for which all paquet files are available.
+    def get_latest_forecast_time(cls, paquet: Paquet, verify: bool = False) -> Optional[pd.Timestamp]:
+        """Return the most recent run timestamp for which the paquet files are available.
+
+        Only the last file of each run (the last one to be published) is checked, and the
+        result is cached for ``freq_update`` hours, during which only newer runs are probed.
 
         Args:
             paquet: Package identifier to check.
+            verify: If ``True``, also check that every file of the run is available, and
+                fall back to older runs otherwise.
 
         Returns:
             The latest available run ``pd.Timestamp``, or ``None`` if none found.
         """
-        for date in cls._iter_run_dates():
-            if are_downloadable(cls._get_urls(paquet=paquet, date=f"{date:%Y-%m-%dT%H}")):
-                logger.info("Latest available %s run: %s (paquet=%s)", cls.__name__, date, paquet)
-                return date
-        return None
+        date = cls._find_latest_run(
+            lambda date: cls._get_urls(paquet=paquet, date=f"{date:%Y-%m-%dT%H}"), key=(paquet,), verify=verify
+        )
+        if date is not None:
+            logger.info("Latest available %s run: %s (paquet=%s)", cls.__name__, date, paquet)
+        return date
+
+    @classmethod
+    def _latest_common_run(
+        cls, paquets: Tuple[Paquet, ...], before: Optional[pd.Timestamp] = None
+    ) -> Optional[pd.Timestamp]:
+        """Most recent run (older than *before*, if given) for which every paquet of *paquets* is published.
+
+        The last file of each paquet is probed, all at once, for each candidate run.
+        """
+        date = cls._find_latest_run(
+            lambda date: [cls._get_urls(paquet=paquet, date=f"{date:%Y-%m-%dT%H}")[-1] for paquet in paquets],
+            key=("paquets", *paquets),
+            verify=True,
+            before=before,
+        )
+        if date is not None:
+            logger.info("Latest available %s run: %s (paquets=%s)", cls.__name__, date, ",".join(paquets))
+        return date
 
     @classmethod
     @overload
@@ -208,6 +578,17 @@ class MeteoFrance(Model):
         return_data: Literal[True] = ...,
         num_workers: int = ...,
         num_retries: int = ...,
+        byte_range: bool = ...,
+        backend: Backend = ...,
+        pipeline: bool = ...,
+        lazy: bool = ...,
+        bbox: Optional[BBox] = ...,
+        points: Optional[Points] = ...,
+        dtype: Optional[str] = ...,
+        packing: Optional[Packing] = ...,
+        paquets: Optional[Sequence[Paquet]] = ...,
+        steps: Optional[slice] = ...,
+        max_lead: Optional[int] = ...,
     ) -> Dict[str, xr.DataArray]: ...
 
     @classmethod
@@ -220,6 +601,17 @@ class MeteoFrance(Model):
         return_data: Literal[False] = ...,
         num_workers: int = ...,
         num_retries: int = ...,
+        byte_range: bool = ...,
+        backend: Backend = ...,
+        pipeline: bool = ...,
+        lazy: bool = ...,
+        bbox: Optional[BBox] = ...,
+        points: Optional[Points] = ...,
+        dtype: Optional[str] = ...,
+        packing: Optional[Packing] = ...,
+        paquets: Optional[Sequence[Paquet]] = ...,
+        steps: Optional[slice] = ...,
+        max_lead: Optional[int] = ...,
     ) -> List[Path]: ...
 
     @classmethod
@@ -231,57 +623,195 @@ class MeteoFrance(Model):
         return_data: bool = True,
         num_workers: int = 4,
         num_retries: int = 1,
+        byte_range: bool = False,
+        backend: Backend = "threads",
+        pipeline: bool = False,
+        lazy: bool = False,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+        paquets: Optional[Sequence[Paquet]] = None,
+        steps: Optional[slice] = None,
+        max_lead: Optional[int] = None,
     ) -> Union[Dict[str, xr.DataArray], List[Path]]:
         """Fetch the most recent available forecast for a given paquet.
 
         Iterates over the last ``past_runs_`` run times (newest first) and
-        downloads the first run whose files are all reachable.
+        downloads the first run that is published (see ``get_latest_forecast_time``).
+        Only the last file of the run is probed: if a file of the run cannot be downloaded,
+        the previous published run is fetched instead.
 
-        Args:
-            paquet: Data package identifier. Must be in ``cls.paquets_``. Defaults to ``"SP1"``.
-            variables: Field names to keep. If ``None``, all fields are returned.
-            path: Directory for GRIB files. Uses a temporary directory if ``None``.
-            return_data: If ``True``, return a dict of DataArrays. If ``False``,
-                save files to *path* and return their paths.
-            num_workers: Parallel download/read workers.
-            num_retries: Extra download attempts per file on failure.
-
-        Returns:
-            Dict of ``xr.DataArray`` (CF-encoded) when ``return_data=True``,
-            or list of ``Path`` objects when ``return_data=False``.
+        The arguments and the return value are those of ``get_forecast``, without *date*.
 
         Raises:
-            ValueError: If *paquet* is not valid for this model.
+            ValueError: If *paquet* (or one of *paquets*) is not valid for this model.
             ForecastNotAvailableError: If no valid run is found among the last
-                ``past_runs_`` runs.
+                ``past_runs_`` runs (published for all *paquets*).
+        """
+        if paquets is None:
+            cls.check_paquet(paquet)
+            date = cls.get_latest_forecast_time(paquet=paquet)
+        else:
+            paquets = cls._check_paquets(paquets)
+            date = cls._latest_common_run(paquets)
+        fetch = partial(
+            cls.get_forecast,
+            paquet=paquet,
+            variables=variables,
+            path=path,
+            return_data=return_data,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            backend=backend,
+            pipeline=pipeline,
+            lazy=lazy,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+            paquets=paquets,
+            steps=steps,
+            max_lead=max_lead,
+        )
+        ret = fetch(date=date) if date else None
+        if date and not ret:
+            logger.warning("%s run %s could not be fetched, falling back to the previous run", cls.__name__, date)
+            date = cls._latest_common_run(paquets or (paquet,), before=date)
+            ret = fetch(date=date) if date else None
+        if ret:
+            return ret
+        raise ForecastNotAvailableError(
+            f"No valid {cls.__name__} run found for paquet={paquets or paquet!r} among the last {cls.past_runs_} runs."
+        )
+
+    @classmethod
+    async def aget_forecast(
+        cls,
+        date: Union[str, pd.Timestamp],
+        paquet: Paquet = "SP1",
+        variables: Optional[list] = None,
+        path: Optional[str] = None,
+        return_data: bool = True,
+        num_workers: int = 4,
+        num_retries: int = 1,
+        byte_range: bool = False,
+        client=None,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+    ) -> Union[Dict[str, xr.DataArray], List[Path]]:
+        """Coroutine version of ``get_forecast``, based on the async backend (requires ``httpx``).
+
+        Files are downloaded on the running event loop and decoded in a worker thread, so that
+        several models can be fetched concurrently with ``asyncio.gather``.
+
+        Args:
+            client: ``httpx.AsyncClient`` to use, e.g. to share one connection pool between
+                concurrent calls. A client is created for the call if ``None``.
+
+        The other arguments, the return value and the exceptions are those of ``get_forecast``.
         """
         cls.check_paquet(paquet)
-        date = cls.get_latest_forecast_time(paquet=paquet)
-        if date:
-            ret = cls.get_forecast(
-                date=date,
-                paquet=paquet,
-                variables=variables,
-                path=path,
-                return_data=return_data,
-                num_workers=num_workers,
-                num_retries=num_retries,
-            )
-            if ret:
-                return ret
+        date_dt = pd.to_datetime(str(date)).floor(f"{cls.freq_update}h")
+        date_str = f"{date_dt:%Y-%m-%dT%H}"
+
+        logger.info("Fetching %s forecast for run %s (paquet=%s)", cls.__name__, date_str, paquet)
+        return await cls._afetch(
+            urls=cls._get_urls(paquet=paquet, date=date_str),
+            variables=variables,
+            path=path,
+            return_data=return_data,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            client=client,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+        )
+
+    @classmethod
+    async def aget_latest_forecast(
+        cls,
+        paquet: Paquet = "SP1",
+        variables: Optional[list] = None,
+        path: Optional[str] = None,
+        return_data: bool = True,
+        num_workers: int = 4,
+        num_retries: int = 1,
+        byte_range: bool = False,
+        client=None,
+        bbox: Optional[BBox] = None,
+        points: Optional[Points] = None,
+        dtype: Optional[str] = None,
+        packing: Optional[Packing] = None,
+    ) -> Union[Dict[str, xr.DataArray], List[Path]]:
+        """Coroutine version of ``get_latest_forecast`` (see ``aget_forecast``)."""
+        cls.check_paquet(paquet)
+        loop = asyncio.get_running_loop()
+        date = await loop.run_in_executor(None, cls.get_latest_forecast_time, paquet)
+        fetch = partial(
+            cls.aget_forecast,
+            paquet=paquet,
+            variables=variables,
+            path=path,
+            return_data=return_data,
+            num_workers=num_workers,
+            num_retries=num_retries,
+            byte_range=byte_range,
+            client=client,
+            bbox=bbox,
+            points=points,
+            dtype=dtype,
+            packing=packing,
+        )
+        ret = await fetch(date=date) if date else None
+        if date and not ret:
+            logger.warning("%s run %s could not be fetched, falling back to the previous run", cls.__name__, date)
+            date = await loop.run_in_executor(None, cls._latest_common_run, (paquet,), date)
+            ret = await fetch(date=date) if date else None
+        if ret:
+            return ret
         raise ForecastNotAvailableError(
             f"No valid {cls.__name__} run found for paquet={paquet!r} among the last {cls.past_runs_} runs."
         )
 
 
+@lru_cache(maxsize=32)
+def _grid_order(longitude: bytes, latitude: bytes, dtypes: tuple, shapes: tuple):
+    """Wrapped longitudes and sort permutations of a grid, computed once per grid definition.
+
+    Returns ``(longitude, longitude_order, latitude_order)``; an order is ``None`` if the
+    coordinate is already sorted.
+    """
+    lon = np.frombuffer(longitude, dtype=dtypes[0]).reshape(shapes[0])
+    lat = np.frombuffer(latitude, dtype=dtypes[1]).reshape(shapes[1])
+    lon = np.where(lon <= 180.0, lon, lon - 360.0)
+    orders = []
+    for values in (lon, lat):
+        # Tri stable, comme ``sortby``
+        order = np.argsort(values, kind="stable") if values.ndim == 1 else None
+        orders.append(None if order is None or (order == np.arange(order.size)).all() else order)
+    return lon, orders[0], orders[1]
+
+
 def common_process(ds: xr.DataArray) -> xr.DataArray:
-    ds["longitude"] = xr.where(
-        ds["longitude"] <= 180.0,
-        ds["longitude"],
-        ds["longitude"] - 360.0,
-        keep_attrs=True,
+    lon, lat = ds["longitude"].values, ds["latitude"].values
+    wrapped, lon_order, lat_order = _grid_order(
+        lon.tobytes(), lat.tobytes(), (lon.dtype.str, lat.dtype.str), (lon.shape, lat.shape)
     )
-    ds = ds.sortby("longitude").sortby("latitude")
+    ds["longitude"] = ds["longitude"].copy(data=wrapped.copy())
+    order = {}
+    for dim, dim_order in (("longitude", lon_order), ("latitude", lat_order)):
+        # Les champs extraits en des points (voir ``crop``) n'ont plus de dimensions latitude/longitude
+        if dim in ds.dims and dim_order is not None:
+            order[dim] = dim_order
+    if order:
+        ds = ds.isel(order)
     ds.attrs["Packaged by"] = "meteofetch"
     return ds
 
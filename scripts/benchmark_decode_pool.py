@@ -0,0 +1,62 @@
+"""
+Per-call overhead of GRIB decoding, with and without a persistent ``DecodePool``.
+
+Small GRIB files are written locally (no download), then decoded repeatedly with
+``Model._read_multiple_gribs``, as ``get_forecast`` does after downloading.
+
+    python scripts/benchmark_decode_pool.py --calls 10 --files 4 --workers 4
+"""
+
+import argparse
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import eccodes
+import numpy as np
+
+from meteofetch import DecodePool
+from meteofetch.meteofrance.arome import Arome0025
+
+
+def write_grib(path, step):
+    with open(path, "wb") as f:
+        for short_name in ("2t", "10u", "10v", "msl"):
+            h = eccodes.codes_grib_new_from_samples("regular_ll_sfc_grib2")
+            eccodes.codes_set(h, "shortName", short_name)
+            eccodes.codes_set(h, "step", step)
+            eccodes.codes_set_values(h, np.random.rand(16 * 31))
+            eccodes.codes_write(h, f)
+            eccodes.codes_release(h)
+
+
+def run(paths, calls, workers):
+    start = perf_counter()
+    for _ in range(calls):
+        Arome0025._read_multiple_gribs(paths, variables=None, num_workers=workers)
+    return (perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tempdir:
+        paths = [Path(tempdir) / f"{step}.grib2" for step in range(args.files)]
+        for step, path in enumerate(paths):
+            write_grib(path, step)
+
+        per_call = run(paths, args.calls, args.workers)
+        print(f"Pool per call     : {per_call * 1000:8.1f} ms/call")
+        with DecodePool(processes=args.workers):
+            run(paths, 1, args.workers)  # démarrage des processus
+            persistent = run(paths, args.calls, args.workers)
+        print(f"Persistent pool   : {persistent * 1000:8.1f} ms/call")
+        print(f"Overhead saved    : {(per_call - persistent) * 1000:8.1f} ms/call ({per_call / persistent:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Decoding time of a GRIB file made of many small messages, with the cfgrib and eccodes engines.
+
+A file shaped like the IP/HP paquets of AROME (several fields on many levels, small grid)
+is written locally, then decoded with ``Model._read_fields``, as each decoding process does.
+
+    python scripts/benchmark_grib_engine.py --fields 6 --levels 24 --steps 2 --size 120
+"""
+
+import argparse
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+
+import eccodes
+import numpy as np
+
+from meteofetch.meteofrance.arome import Arome0025
+
+FIELDS = ("t", "u", "v", "r", "z", "w")
+
+
+def write_grib(path, fields, levels, steps, size):
+    with open(path, "wb") as f:
+        for step in range(steps):
+            for short_name in FIELDS[:fields]:
+                for level in np.linspace(1000, 100, levels).astype(int):
+                    h = eccodes.codes_grib_new_from_samples("regular_ll_pl_grib2")
+                    eccodes.codes_set_key_vals(
+                        h, {"Ni": size, "Nj": size, "shortName": short_name, "level": int(level), "step": step}
+                    )
+                    eccodes.codes_set(h, "longitudeOfLastGridPointInDegrees", size - 1.0)
+                    eccodes.codes_set(h, "iDirectionIncrementInDegrees", 1.0)
+                    eccodes.codes_set(h, "latitudeOfLastGridPointInDegrees", 60.0 - (size - 1) * 0.5)
+                    eccodes.codes_set(h, "jDirectionIncrementInDegrees", 0.5)
+                    eccodes.codes_set_values(h, np.random.rand(size * size))
+                    eccodes.codes_write(h, f)
+                    eccodes.codes_release(h)
+
+
+def run(path, engine, calls):
+    start = perf_counter()
+    for _ in range(calls):
+        fields = Arome0025._read_fields(path, engine=engine)
+    return (perf_counter() - start) / calls, fields
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=6)
+    parser.add_argument("--levels", type=int, default=24)
+    parser.add_argument("--steps", type=int, default=2)
+    parser.add_argument("--size", type=int, default=120)
+    parser.add_argument("--calls", type=int, default=3)
+    args = parser.parse_args()
+
+    with TemporaryDirectory() as tempdir:
+        path = Path(tempdir) / "levels.grib2"
+        write_grib(path, args.fields, args.levels, args.steps, args.size)
+        print(f"{args.fields * args.levels * args.steps} messages, {path.stat().st_size / 1e6:.1f} MB")
+
+        cfgrib_time, expected = run(path, "cfgrib", args.calls)
+        eccodes_time, decoded = run(path, "eccodes", args.calls)
+        assert all(a.identical(b) for field in expected for a, b in zip(decoded[field], expected[field]))
+        print(f"cfgrib  : {cfgrib_time * 1000:8.1f} ms/file")
+        print(f"eccodes : {eccodes_time * 1000:8.1f} ms/file ({cfgrib_time / eccodes_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
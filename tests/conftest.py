@@ -0,0 +1,141 @@
+"""Local stand-in for the Météo-France and ECMWF open-data servers, used by the offline tests."""
+
+import json
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import eccodes
+import numpy as np
+import pandas as pd
+import pytest
+
+from meteofetch.ecmwf import ECMWF
+from meteofetch.meteofrance import HourlyProcess, MeteoFrance
+
+RUN = pd.Timestamp("2024-01-01T00:00")
+FIELDS = ("2t", "10u", "10v", "msl")
+
+
+class FakeArome(HourlyProcess, MeteoFrance):
+    groups_ = ("00H", "01H", "02H")
+    paquets_ = ("SP1",)
+    url_ = "{date}:00:00Z/arome/001/{paquet}/arome__001__{paquet}__{group}__{date}:00:00Z.grib2"
+    freq_update = 3
+
+
+class FakeIfs(ECMWF):
+    past_runs_ = 2
+    freq_update = 12
+    url_ = "{ymd}/{hour}z/ifs/0p25/oper/{ymd}{hour}0000-{group}h-oper-fc.grib2"
+    groups_ = (0, 3, 6)
+
+
+def write_grib(path, run, steps, fields=FIELDS):
+    """Write a small GRIB2 file (16x31 regular grid) with one message per field and step.
+
+    Returns the ECMWF-like index entries of the written messages.
+    """
+    index = []
+    with open(path, "wb") as f:
+        for step in steps:
+            for field in fields:
+                h = eccodes.codes_grib_new_from_samples("regular_ll_sfc_grib2")
+                eccodes.codes_set(h, "dataDate", int(f"{run:%Y%m%d}"))
+                eccodes.codes_set(h, "dataTime", int(f"{run:%H%M}"))
+                eccodes.codes_set(h, "shortName", field)
+                eccodes.codes_set(h, "step", step)
+                eccodes.codes_set_values(h, np.arange(16 * 31, dtype=float) + step)
+                offset = f.tell()
+                eccodes.codes_write(h, f)
+                eccodes.codes_release(h)
+                index.append({"param": field, "step": str(step), "_offset": offset, "_length": f.tell() - offset})
+    return index
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """``SimpleHTTPRequestHandler`` with support for single ``Range: bytes=a-b`` requests (and ``If-Range``)."""
+
+    def log_message(self, format, *args):
+        self.server.requests.append((self.command, self.path, self.headers.get("Range")))
+
+    def log_error(self, format, *args):
+        pass
+
+    def send_head(self):
+        header = self.headers.get("Range")
+        path = self.translate_path(self.path)
+        if header is None or not os.path.isfile(path):
+            return super().send_head()
+        last_modified = self.date_time_string(os.path.getmtime(path))
+        if self.headers.get("If-Range", last_modified) != last_modified:
+            return super().send_head()
+        size = os.path.getsize(path)
+        start, end = header.replace("bytes=", "").split("-")
+        start, end = int(start), min(int(end) if end else size - 1, size - 1)
+        f = open(path, "rb")
+        f.seek(start)
+        self.send_response(206)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        self.send_header("Last-Modified", last_modified)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.range_length = end - start + 1
+        return f
+
+    def copyfile(self, source, outputfile):
+        length = getattr(self, "range_length", None)
+        if length is None:
+            return super().copyfile(source, outputfile)
+        outputfile.write(source.read(length))
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serve *tmp_path* over HTTP; ``server.requests`` records every request received."""
+    root = tmp_path / "www"
+    root.mkdir()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(RangeRequestHandler, directory=str(root)))
+    httpd.requests = []
+    httpd.root = root
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fake_arome(server, monkeypatch):
+    """``FakeArome`` model backed by a local server hosting the run ``RUN``."""
+    date = f"{RUN:%Y-%m-%dT%H}"
+    for url, group in zip(FakeArome._get_urls(paquet="SP1", date=date), FakeArome.groups_):
+        path = server.root / url[len(FakeArome.base_url_) + 1 :]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_grib(path, RUN, steps=[int(group[:-1])])
+    monkeypatch.setattr(FakeArome, "base_url_", server.url)
+    return FakeArome
+
+
+@pytest.fixture
+def fake_ifs(server, monkeypatch):
+    """``FakeIfs`` model backed by a local server hosting the run ``RUN``, with ``.index`` files."""
+    monkeypatch.setattr(FakeIfs, "base_url_", server.url, raising=False)
+    for url, step in zip(FakeIfs._get_urls(date=RUN), FakeIfs.groups_):
+        path = server.root / url[len(server.url) + 1 :]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        index = write_grib(path, RUN, steps=[step])
+        with open(path.with_suffix(".index"), "w") as f:
+            f.write("\n".join(json.dumps(entry) for entry in index))
+    return FakeIfs
+
+
+@pytest.fixture
+def isolated(tmp_path, monkeypatch):
+    """Keep local state (layouts, cache) inside the test directory, disable test mode, decode with cfgrib."""
+    monkeypatch.setenv("METEOFETCH_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("METEOFETCH_TEST_MODE", raising=False)
+    monkeypatch.setenv("METEOFETCH_GRIB_ENGINE", "cfgrib")
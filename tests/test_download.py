@@ -0,0 +1,593 @@
+import asyncio
+import os
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.utils import formatdate
+from http.server import SimpleHTTPRequestHandler
+from pathlib import Path
+
+import pandas as pd
+import pytest
+import requests
+import xarray as xr
+from conftest import RUN, RangeRequestHandler, write_grib
+
+from meteofetch import ForecastNotAvailableError, RetryPolicy, cache_info, disable_cache, set_base_url, set_cache
+from meteofetch._cache import RunCache
+from meteofetch._cli import main
+from meteofetch._retry import CircuitOpenError
+
+pytestmark = pytest.mark.usefixtures("isolated")
+
+
+def grib_requests(server):
+    return [(method, ranged) for method, path, ranged in server.requests if path.endswith(".grib2")]
+
+
+def test_byte_range_ecmwf_uses_index(fake_ifs, server):
+    datasets = fake_ifs.get_forecast(date=RUN, variables=["t2m", "u10"], byte_range=True)
+
+    assert sorted(datasets) == ["t2m", "u10"]
+    assert datasets["t2m"].time.size == len(fake_ifs.groups_)
+    requests = grib_requests(server)
+    assert requests and all(ranged is not None for _, ranged in requests)
+
+
+def test_byte_range_meteofrance_learns_layout(fake_arome, server):
+    full = fake_arome.get_forecast(date=RUN, variables=["msl"], byte_range=True)
+    assert all(ranged is None for _, ranged in grib_requests(server))
+
+    server.requests.clear()
+    partial = fake_arome.get_forecast(date=RUN, variables=["msl"], byte_range=True)
+    assert all(ranged is not None for _, ranged in grib_requests(server))
+    assert list(partial) == ["msl"]
+    assert partial["msl"].equals(full["msl"])
+
+
+@pytest.mark.parametrize("backend", ["threads", "async"])
+def test_byte_range_falls_back_when_server_ignores_ranges(fake_ifs, server, monkeypatch, backend):
+    if backend == "async":
+        pytest.importorskip("httpx")
+    expected = fake_ifs.get_forecast(date=RUN, variables=["t2m"])
+    server.requests.clear()
+    monkeypatch.setattr(RangeRequestHandler, "send_head", SimpleHTTPRequestHandler.send_head)
+    datasets = fake_ifs.get_forecast(date=RUN, variables=["t2m"], byte_range=True, backend=backend)
+
+    assert datasets["t2m"].equals(expected["t2m"])
+    assert len(grib_requests(server)) == 2 * len(fake_ifs.groups_)
+
+
+def test_scan_grib_offsets_checks_file_size(fake_arome, server):
+    from meteofetch._index import scan_grib_offsets
+
+    url = fake_arome._get_urls(paquet="SP1", date=f"{RUN:%Y-%m-%dT%H}")[0]
+    remote = server.root / url[len(server.url) + 1 :]
+    offsets = scan_grib_offsets(url, timeout=10)
+    assert sum(length for _, length in offsets) == remote.stat().st_size
+
+    remote.write_bytes(remote.read_bytes()[:-4])
+    with pytest.raises(ValueError, match="end at byte"):
+        scan_grib_offsets(url, timeout=10)
+
+
+def test_cache_serves_repeated_downloads(fake_arome, server, tmp_path):
+    set_cache(tmp_path / "runs", max_size_gb=1)
+    try:
+        first = fake_arome.get_forecast(date=RUN)
+        server.requests.clear()
+        second = fake_arome.get_forecast(date=RUN)
+        info = cache_info()
+    finally:
+        disable_cache()
+
+    assert grib_requests(server) == []
+    assert info["hits"] == info["misses"] == len(fake_arome.groups_)
+    assert info["files"] == len(fake_arome.groups_)
+    assert second["t2m"].equals(first["t2m"])
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = RunCache(tmp_path / "runs", max_size_gb=8 / 1024**3)
+    for i, name in enumerate(("a", "b", "c")):
+        source = tmp_path / name
+        source.write_bytes(b"12345")
+        cache.put(cache.key("Model", f"https://host/{name}"), source)
+        os.utime(cache.key("Model", f"https://host/{name}"), (i, i))
+
+    cache.evict()
+    assert sorted(path.name for path, _ in cache._files()) == ["c"]
+
+
+def test_cache_entries_are_copies(tmp_path):
+    cache = RunCache(tmp_path / "runs", max_size_gb=1)
+    key = cache.key("Model", "https://host/a")
+    source = tmp_path / "source"
+    source.write_bytes(b"12345")
+    cache.put(key, source)
+    source.write_bytes(b"edited")
+
+    target = tmp_path / "target"
+    assert cache.get(key, target)
+    with open(target, "r+b") as f:
+        f.write(b"0")
+    assert cache.get(key, tmp_path / "again")
+    assert (tmp_path / "again").read_bytes() == b"12345"
+
+
+def test_async_cache_downloads_each_file_once(fake_arome, server, tmp_path):
+    pytest.importorskip("httpx")
+    set_cache(tmp_path / "runs", max_size_gb=1)
+
+    async def fetch_twice():
+        return await asyncio.gather(
+            fake_arome.aget_forecast(date=RUN, variables=["t2m"]),
+            fake_arome.aget_forecast(date=RUN, variables=["t2m"]),
+        )
+
+    try:
+        first, second = asyncio.run(fetch_twice())
+    finally:
+        disable_cache()
+
+    assert len(grib_requests(server)) == len(fake_arome.groups_)
+    assert second["t2m"].equals(first["t2m"])
+
+
+def test_async_backend_matches_threads(fake_arome):
+    pytest.importorskip("httpx")
+    threads = fake_arome.get_forecast(date=RUN)
+    async_ = fake_arome.get_forecast(date=RUN, backend="async")
+
+    assert sorted(async_) == sorted(threads)
+    assert async_["msl"].equals(threads["msl"])
+
+
+def test_aget_forecast_shares_client(fake_arome, fake_ifs):
+    pytest.importorskip("httpx")
+    from meteofetch._aio import make_client
+
+    async def fetch_both():
+        async with make_client() as client:
+            return await asyncio.gather(
+                fake_arome.aget_forecast(date=RUN, variables=["t2m"], client=client),
+                fake_ifs.aget_forecast(date=RUN, variables=["t2m"], byte_range=True, client=client),
+            )
+
+    arome, ifs = asyncio.run(fetch_both())
+    assert list(arome) == list(ifs) == ["t2m"]
+    assert arome["t2m"].time.size == ifs["t2m"].time.size == 3
+
+
+def test_shared_client_bounds_requests_per_host(fake_arome, tmp_path, monkeypatch):
+    pytest.importorskip("httpx")
+    from meteofetch import _aio
+
+    active, peak = 0, 0
+
+    async def download(cls, client, url, path, num_retries, variables):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        return Path(path) / os.path.basename(url)
+
+    monkeypatch.setattr(_aio, "aurl_to_file", download)
+    urls = fake_arome._get_urls(paquet="SP1", date=f"{RUN:%Y-%m-%dT%H}")
+
+    async def fetch_twice():
+        async with _aio.make_client() as client:
+            return await asyncio.gather(
+                *(_aio.adownload_urls(fake_arome, urls, str(tmp_path), 1, client=client) for _ in range(2))
+            )
+
+    assert all(all(paths) for paths in asyncio.run(fetch_twice()))
+    assert peak == 1
+
+
+def test_pipeline_matches_download_then_read(fake_arome):
+    sequential = fake_arome.get_forecast(date=RUN)
+    pipelined = fake_arome.get_forecast(date=RUN, pipeline=True)
+
+    assert sorted(pipelined) == sorted(sequential)
+    for field in sequential:
+        assert pipelined[field].equals(sequential[field])
+
+
+def test_pipeline_fails_when_a_download_raises(fake_arome, monkeypatch):
+    fetch_url = fake_arome._fetch_url.__func__
+
+    def failing(cls, url, *args):
+        if "__01H__" in url:
+            raise KeyError("corrupt index")
+        return fetch_url(cls, url, *args)
+
+    monkeypatch.setattr(fake_arome, "_fetch_url", classmethod(failing))
+    # Exécuté à part pour qu'un blocage fasse échouer le test au lieu de le suspendre
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(fake_arome.get_forecast, date=RUN, pipeline=True)
+    executor.shutdown(wait=False)
+    with pytest.raises(KeyError, match="corrupt index"):
+        future.result(timeout=60)
+
+
+def test_latest_forecast_time_probes_last_file_and_caches(fake_arome, server, monkeypatch):
+    candidates = [RUN + pd.Timedelta(hours=3), RUN, RUN - pd.Timedelta(hours=3)]
+    monkeypatch.setattr(fake_arome, "_iter_run_dates", classmethod(lambda cls: candidates))
+
+    assert fake_arome.get_latest_forecast_time(paquet="SP1") == RUN
+    assert [method for method, _, _ in server.requests] == ["HEAD", "HEAD"]
+    assert all("02H" in path for _, path, _ in server.requests)
+
+    server.requests.clear()
+    assert fake_arome.get_latest_forecast_time(paquet="SP1") == RUN
+    assert len(server.requests) == 1 and "T03" in server.requests[0][1]
+
+    server.requests.clear()
+    assert fake_arome.get_latest_forecast_time(paquet="SP1", verify=True) == RUN
+    assert len(server.requests) == 2 + len(fake_arome.groups_)
+
+
+@pytest.mark.parametrize("backend", ["threads", "async"])
+def test_latest_forecast_falls_back_to_previous_run(fake_arome, server, monkeypatch, backend):
+    newer = RUN + pd.Timedelta(hours=3)
+    monkeypatch.setattr(fake_arome, "_iter_run_dates", classmethod(lambda cls: [newer, RUN]))
+    # Seul le dernier fichier du run le plus récent est publié
+    url = fake_arome._get_urls(paquet="SP1", date=f"{newer:%Y-%m-%dT%H}")[-1]
+    path = server.root / url[len(server.url) + 1 :]
+    path.parent.mkdir(parents=True)
+    write_grib(path, newer, steps=[2])
+
+    if backend == "threads":
+        datasets = fake_arome.get_latest_forecast(variables=["t2m"])
+    else:
+        pytest.importorskip("httpx")
+        datasets = asyncio.run(fake_arome.aget_latest_forecast(variables=["t2m"]))
+    assert datasets["t2m"].equals(fake_arome.get_forecast(date=RUN, variables=["t2m"])["t2m"])
+
+
+def test_availability_probes_every_file_once(fake_arome, fake_ifs, server, monkeypatch):
+    candidates = [RUN + pd.Timedelta(hours=3), RUN]
+    monkeypatch.setattr(fake_arome, "_iter_run_dates", classmethod(lambda cls: candidates))
+
+    availability = fake_arome.availability()
+    assert list(availability.columns) == ["SP1"]
+    assert availability["SP1"].tolist() == [False, True]
+    assert len(server.requests) == len(candidates) * len(fake_arome.groups_)
+
+    dates = fake_arome.availability_paquet("SP1", return_date=True)
+    assert dates.name == "SP1" and dates.iloc[0] is False and isinstance(dates.iloc[1], datetime)
+
+    monkeypatch.setattr(fake_ifs, "_iter_run_dates", classmethod(lambda cls: [RUN]))
+    assert fake_ifs.availability().tolist() == [True]
+
+
+def test_fetch_many_shares_pools_and_orders_by_priority(fake_arome, fake_ifs, server):
+    from meteofetch import FetchRequest, fetch_many
+
+    ret = fetch_many(
+        [
+            FetchRequest(fake_arome, date=RUN, variables=["t2m"]),
+            FetchRequest(fake_ifs, date=RUN, variables=["msl"], priority=1),
+            FetchRequest(fake_arome, date=RUN + pd.Timedelta(hours=3), name="missing"),
+        ],
+        num_workers=1,
+        num_processes=2,
+        max_bandwidth=100,
+    )
+
+    assert list(ret) == ["FakeArome", "FakeIfs", "missing"]
+    assert ret["FakeArome"]["t2m"].equals(fake_arome.get_forecast(date=RUN, variables=["t2m"])["t2m"])
+    assert list(ret["FakeIfs"]) == ["msl"] and ret["FakeIfs"]["msl"].time.size == len(fake_ifs.groups_)
+    assert ret["missing"] == {}
+    first = next(path for method, path, _ in server.requests if method == "GET")
+    assert "ifs" in first
+
+
+def test_fetch_many_bandwidth_leaves_global_limit_alone(fake_arome, monkeypatch):
+    from meteofetch import FetchRequest, fetch_many
+    from meteofetch._misc import get_rate_limiter
+
+    fetch_url = fake_arome._fetch_url.__func__
+    limiters = []
+
+    def recording(cls, url, path, num_retries, variables, limiter):
+        limiters.append((get_rate_limiter(), limiter))
+        return fetch_url(cls, url, path, num_retries, variables, limiter)
+
+    monkeypatch.setattr(fake_arome, "_fetch_url", classmethod(recording))
+    fetch_many([FetchRequest(fake_arome, date=RUN)], num_workers=2, max_bandwidth=100)
+
+    assert len(limiters) == len(fake_arome.groups_)
+    assert all(current is None and limiter.max_bandwidth == 100e6 for current, limiter in limiters)
+
+
+def test_rate_limiter_spaces_chunks():
+    from meteofetch._misc import RateLimiter
+
+    limiter = RateLimiter(max_bandwidth=1000)
+    delays = [limiter.reserve(500) for _ in range(3)]
+    assert [round(delay, 1) for delay in delays] == [0.5, 1.0, 1.5]
+
+
+@pytest.mark.parametrize("backend", ["threads", "async"])
+def test_download_resumes_part_file(fake_arome, server, tmp_path, backend):
+    url = fake_arome._get_urls(paquet="SP1", date=f"{RUN:%Y-%m-%dT%H}")[0]
+    remote = (server.root / url[len(server.url) + 1 :]).read_bytes()
+    target = tmp_path / "dl" / os.path.basename(url).replace(":", "-")
+    target.parent.mkdir()
+    target.with_name(target.name + ".part").write_bytes(remote[:100])
+
+    if backend == "threads":
+        local_path = fake_arome._url_to_file(url, target.parent)
+    else:
+        pytest.importorskip("httpx")
+        from meteofetch._aio import adownload_urls
+
+        local_path = asyncio.run(adownload_urls(fake_arome, [url], target.parent, num_workers=1))[0]
+
+    assert local_path == target and target.read_bytes() == remote
+    assert list(target.parent.iterdir()) == [target]
+    assert [ranged for _, ranged in grib_requests(server)] == ["bytes=100-"]
+
+
+@pytest.mark.parametrize("backend", ["threads", "async"])
+@pytest.mark.parametrize("changed", [False, True])
+def test_resume_restarts_when_remote_file_changed(fake_arome, server, tmp_path, backend, changed):
+    url = fake_arome._get_urls(paquet="SP1", date=f"{RUN:%Y-%m-%dT%H}")[0]
+    remote = server.root / url[len(server.url) + 1 :]
+    target = tmp_path / "dl" / os.path.basename(url).replace(":", "-")
+    target.parent.mkdir()
+    part = target.with_name(target.name + ".part")
+    part.write_bytes(b"\0" * 100 if changed else remote.read_bytes()[:100])
+    validator = "Wed, 01 Jan 2020 00:00:00 GMT" if changed else formatdate(remote.stat().st_mtime, usegmt=True)
+    part.with_name(part.name + ".validator").write_text(validator)
+
+    if backend == "threads":
+        local_path = fake_arome._url_to_file(url, target.parent)
+    else:
+        pytest.importorskip("httpx")
+        from meteofetch._aio import adownload_urls
+
+        local_path = asyncio.run(adownload_urls(fake_arome, [url], target.parent, num_workers=1))[0]
+
+    assert local_path == target and target.read_bytes() == remote.read_bytes()
+    assert list(target.parent.iterdir()) == [target]
+
+
+def test_full_download_never_resumes_byte_range_part(fake_ifs, server, tmp_path, monkeypatch):
+    url = fake_ifs._get_urls(date=RUN)[0]
+    remote = (server.root / url[len(server.url) + 1 :]).read_bytes()
+    target = tmp_path / os.path.basename(url)
+    # Téléchargement par plages interrompu après la première plage (la seconde est hors du fichier)
+    ranges = [(0, 99), (len(remote) + 100, len(remote) + 199)]
+    monkeypatch.setattr(fake_ifs, "_get_ranges", classmethod(lambda cls, url, variables: ranges))
+    assert fake_ifs._url_to_file(url, tmp_path, num_retries=0, variables=["t2m"]) is False
+    assert not target.with_name(target.name + ".part").exists()
+
+    server.requests.clear()
+    assert fake_ifs._url_to_file(url, tmp_path) == target and target.read_bytes() == remote
+    assert [ranged for _, ranged in grib_requests(server)] == [None]
+
+
+def test_truncated_download_is_not_renamed(tmp_path):
+    from meteofetch._resume import IncompleteDownloadError, finalize
+
+    target = tmp_path / "file.grib2"
+    part = tmp_path / "file.grib2.part"
+    part.write_bytes(b"GRIB" + b"\0" * 10)
+    with pytest.raises(IncompleteDownloadError):
+        finalize(part, target, size=100)
+    assert part.exists() and not target.exists()
+
+    with pytest.raises(IncompleteDownloadError):
+        finalize(part, target, size=None)
+    assert not target.exists()
+
+    part.write_bytes(b"GRIB" + b"\0" * 10 + b"7777")
+    assert finalize(part, target, size=18) == target and not part.exists()
+
+
+def test_retry_policy_skips_client_errors_and_opens_circuit(fake_arome, server, tmp_path):
+    from meteofetch import set_retry_policy
+
+    policy = RetryPolicy(backoff=0, failure_threshold=2, cooldown=60)
+    previous = set_retry_policy(policy)
+    try:
+        # 404 : pas de nouvelle tentative
+        assert fake_arome._url_to_file(f"{server.url}/missing.grib2", tmp_path, num_retries=3) is False
+        assert len(server.requests) == 1
+
+        # Connexion refusée : le circuit s'ouvre après deux échecs, puis les appels échouent sans requête
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        url = f"http://127.0.0.1:{port}/file.grib2"
+        assert fake_arome._url_to_file(url, tmp_path, num_retries=5) is False
+        assert policy._host(url).failures == 2
+        with pytest.raises(CircuitOpenError):
+            policy.wait_time(url)
+    finally:
+        set_retry_policy(previous)
+
+
+def test_circuit_breaker_is_opt_in_and_probes_once(monkeypatch):
+    from types import SimpleNamespace
+
+    assert RetryPolicy().failure_threshold is None and RetryPolicy().backoff == 0
+    now = [0.0]
+    monkeypatch.setattr("meteofetch._retry.time", SimpleNamespace(monotonic=lambda: now[0]))
+    policy = RetryPolicy(failure_threshold=1, cooldown=10)
+    url = "https://host/a"
+    assert policy.record_failure(url, ConnectionError())
+    with pytest.raises(CircuitOpenError):
+        policy.wait_time(url)
+
+    # Demi-ouvert : une seule requête de sonde, qui rouvre le circuit si elle échoue
+    now[0] = 11
+    assert policy.wait_time(url) == 0
+    with pytest.raises(CircuitOpenError):
+        policy.wait_time("https://host/b")
+    policy.record_failure(url, ConnectionError())
+    now[0] = 15
+    with pytest.raises(CircuitOpenError):
+        policy.wait_time(url)
+
+    now[0] = 22
+    assert policy.wait_time(url) == 0
+    policy.record_success(url)
+    assert policy.wait_time(url) == policy.wait_time("https://host/b") == 0
+
+
+def test_retry_after_pauses_host():
+    from meteofetch._retry import retry_after
+
+    class Response:
+        status_code = 429
+        headers = {"Retry-After": "3"}
+
+    error = requests.HTTPError(response=Response())
+    policy = RetryPolicy(max_delay=2)
+    assert retry_after(error) == 3 and policy.record_failure("https://host/a", error)
+    assert 1.5 < policy.wait_time("https://host/b") <= 2
+    assert policy.wait_time("https://other/a") == 0
+
+    Response.status_code = 404
+    assert not policy.record_failure("https://host/a", error)
+
+
+def test_multi_paquet_fetch_merges_fields(fake_arome, server, monkeypatch):
+    monkeypatch.setattr(fake_arome, "paquets_", ("SP1", "SP2"))
+    date = f"{RUN:%Y-%m-%dT%H}"
+    for url, group in zip(fake_arome._get_urls(paquet="SP2", date=date), fake_arome.groups_):
+        path = server.root / url[len(server.url) + 1 :]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_grib(path, RUN, steps=[int(group[:-1])], fields=("msl", "sp"))
+    candidates = [RUN + pd.Timedelta(hours=3), RUN]
+    monkeypatch.setattr(fake_arome, "_iter_run_dates", classmethod(lambda cls: candidates))
+
+    datasets = fake_arome.get_latest_forecast(paquets=["SP1", "SP2"])
+    assert sorted(datasets) == ["msl_SP1", "msl_SP2", "sp", "t2m", "u10", "v10"]
+    assert datasets["msl_SP2"].name == "msl_SP2"
+    assert datasets["msl_SP1"].equals(fake_arome.get_forecast(date=RUN, paquet="SP1")["msl"].rename("msl_SP1"))
+    # Seul le dernier fichier de chaque paquet est sondé, puis les deux paquets sont téléchargés
+    heads = [path for method, path, _ in server.requests if method == "HEAD"]
+    assert len(heads) == 4 and all("02H" in path for path in heads)
+    assert sum(method == "GET" for method, _, _ in server.requests) == 3 * len(fake_arome.groups_)
+
+    with pytest.raises(ValueError):
+        fake_arome.get_forecast(date=RUN, paquets=["SP1", "HP1"])
+
+
+def test_steps_select_groups_and_leads(fake_arome, fake_ifs, server):
+    ifs = fake_ifs.get_forecast(date=RUN, variables=["t2m"], steps=slice(3, 6))
+    assert len(grib_requests(server)) == 2
+    assert (ifs["t2m"].time.values == (RUN + pd.to_timedelta([3, 6], "h")).values).all()
+
+    server.requests.clear()
+    times = [t for t, _ in fake_arome.iter_forecast(date=f"{RUN:%Y-%m-%dT%H}", max_lead=1)]
+    assert times == [RUN, RUN + pd.Timedelta(hours=1)] and len(grib_requests(server)) == 2
+
+    with pytest.raises(ValueError):
+        fake_ifs.get_forecast(date=RUN, steps=slice(3, 6), max_lead=6)
+    with pytest.raises(ValueError):
+        fake_ifs.get_forecast(date=RUN, steps=slice(100, None))
+
+
+def test_steps_map_onto_multi_hour_groups():
+    from meteofetch import Arome0025, Arpege01
+
+    # groups_ des modèles réels est tronqué par test_models.py : groupes complets en dur
+    arome = ("00H06H", "07H12H", "13H18H", "19H24H", "25H30H", "31H36H", "37H42H", "43H48H", "49H51H")
+    arpege = ("000H012H", "013H024H", "025H036H", "037H048H", "049H060H")
+    assert Arome0025._select_groups(arome, slice(12, 48)) == arome[1:8]
+    assert Arpege01._select_groups(arpege, slice(None, 24)) == arpege[:2]
+    assert Arome0025._select_groups(arome, slice(0, 48, 24)) == ("00H06H", "19H24H", "43H48H")
+
+    time = RUN + pd.to_timedelta(range(7, 13), "h")
+    fields = {"t2m": xr.DataArray(range(6), coords={"time": time}, dims="time")}
+    assert Arome0025._select_leads(fields, RUN, slice(12, 48))["t2m"].values.tolist() == [5]
+
+
+def test_watch_run_yields_groups_as_published(fake_arome, server, monkeypatch):
+    date = f"{RUN:%Y-%m-%dT%H}"
+    last = server.root / fake_arome._get_urls(paquet="SP1", date=date)[-1][len(server.url) + 1 :]
+    hidden = last.with_name("hidden")
+    last.rename(hidden)
+
+    watched = fake_arome.watch_run(date=date, variables=["t2m"], poll_interval=0.05, timeout=0.3)
+    assert [next(watched)[0], next(watched)[0]] == [RUN, RUN + pd.Timedelta(hours=1)]
+    with pytest.raises(ForecastNotAvailableError):
+        next(watched)
+
+    candidates = [RUN + pd.Timedelta(hours=3), RUN]
+    monkeypatch.setattr(fake_arome, "_iter_run_dates", classmethod(lambda cls: candidates))
+    timer = threading.Timer(0.5, hidden.rename, (last,))
+    timer.start()
+    try:
+        times = [t for t, fields in fake_arome.follow_latest(variables=["t2m"], poll_interval=0.05, timeout=10)]
+    finally:
+        timer.cancel()
+    assert times == [RUN + pd.Timedelta(hours=h) for h in range(3)]
+
+
+def test_sync_run_downloads_only_changed_files(fake_arome, server, tmp_path):
+    date = f"{RUN:%Y-%m-%dT%H}"
+    mirror = tmp_path / "mirror"
+    result = fake_arome.sync_run(mirror, date=date)
+    assert result.updated == result.paths and all(p.exists() for p in result.paths)
+
+    server.requests.clear()
+    assert fake_arome.sync_run(mirror, date=date).updated == []
+    assert {method for method, _, _ in server.requests} == {"HEAD"}
+
+    url = fake_arome._get_urls(paquet="SP1", date=date)[1]
+    write_grib(server.root / url[len(server.url) + 1 :], RUN, steps=[1], fields=("2t", "10u"))
+    result.paths[2].unlink()
+    result = fake_arome.sync_run(mirror, date=date)
+    assert result.updated == result.paths[1:]
+
+
+def test_sync_run_bypasses_cache_for_changed_files(fake_arome, server, tmp_path):
+    date = f"{RUN:%Y-%m-%dT%H}"
+    mirror = tmp_path / "mirror"
+    set_cache(tmp_path / "runs", max_size_gb=1)
+    try:
+        fake_arome.get_forecast(date=date)
+        path = fake_arome.sync_run(mirror, date=date).paths[1]
+        url = fake_arome._get_urls(paquet="SP1", date=date)[1]
+        remote = server.root / url[len(server.url) + 1 :]
+        write_grib(remote, RUN, steps=[1], fields=("2t", "10u"))
+        assert fake_arome.sync_run(mirror, date=date).updated == [path]
+    finally:
+        disable_cache()
+    assert path.read_bytes() == remote.read_bytes()
+
+
+def test_mirror_is_read_through_file_url(fake_arome, fake_ifs, server, tmp_path, capsys, monkeypatch):
+    date = f"{RUN:%Y-%m-%dT%H}"
+    mirror = tmp_path / "mirror"
+    assert main(["mirror", str(mirror), "FakeArome:SP1", "FakeIfs", "--date", date]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "FakeArome:SP1: 3 of 3 file(s) updated",
+        "FakeIfs: 6 of 6 file(s) updated",
+    ]
+    url = fake_arome._get_urls(paquet="SP1", date=date)[0]
+    assert (mirror / url[len(server.url) + 1 :]).exists()
+
+    expected = fake_ifs.get_forecast(date=date, variables=["t2m"])["t2m"]
+    set_base_url(mirror.as_uri())
+    try:
+        server.requests.clear()
+        assert fake_ifs._get_urls(date=date)[0].startswith("file://")
+        assert fake_arome.get_forecast(date=date, paquet="SP1", variables=["t2m"])["t2m"].sizes["time"] == 3
+        xr.testing.assert_identical(
+            fake_ifs.get_forecast(date=date, variables=["t2m"], byte_range=True)["t2m"], expected
+        )
+        monkeypatch.setattr(fake_ifs, "_iter_run_dates", classmethod(lambda cls: [RUN]))
+        assert fake_ifs.availability().tolist() == [True]
+        assert server.requests == []
+    finally:
+        set_base_url(None)
@@ -0,0 +1,360 @@
+import os
+from pathlib import Path
+
+import pytest
+import xarray as xr
+from conftest import RUN
+
+import meteofetch
+
+pytestmark = pytest.mark.usefixtures("isolated")
+
+
+def test_iter_forecast_yields_each_valid_time(fake_arome):
+    full = fake_arome.get_forecast(date=RUN, variables=["t2m", "msl"])
+    steps = list(fake_arome.iter_forecast(date=RUN, variables=["t2m", "msl"]))
+
+    assert [valid_time for valid_time, _ in steps] == list(full["t2m"].time.to_index())
+    for field in ("t2m", "msl"):
+        pieces = [fields[field] for _, fields in steps]
+        assert xr.concat(pieces, dim="time", coords="minimal", compat="override").equals(full[field])
+    assert steps[0][1]["t2m"].encoding["grid_mapping"] == "spatial_ref"
+
+
+def test_lazy_returns_dask_arrays(fake_arome, tmp_path):
+    pytest.importorskip("dask")
+    eager = fake_arome.get_forecast(date=RUN)
+    lazy = fake_arome.get_forecast(date=RUN, lazy=True)
+
+    assert sorted(lazy) == sorted(eager)
+    assert lazy["t2m"].chunks is not None
+    assert lazy["t2m"].isel(time=-1).compute().equals(eager["t2m"].isel(time=-1))
+    assert list((tmp_path / "cache" / "lazy" / fake_arome.__name__).glob("*/*.grib2"))
+
+
+def test_lazy_calls_keep_their_own_files(fake_arome, tmp_path):
+    pytest.importorskip("dask")
+    root = tmp_path / "cache" / "lazy" / fake_arome.__name__
+    abandoned = root / "abandoned"
+    abandoned.mkdir(parents=True)
+    os.utime(abandoned, (0, 0))
+
+    first = fake_arome.get_forecast(date=RUN, variables=["t2m"], lazy=True)
+    second = fake_arome.get_forecast(date=RUN, variables=["msl"], lazy=True)
+    assert len(list(root.iterdir())) == 2 and not abandoned.exists()
+    assert first["t2m"].compute().equals(fake_arome.get_forecast(date=RUN, variables=["t2m"])["t2m"])
+    assert second["msl"].chunks is not None
+
+
+def test_bbox_crops_fields(fake_arome):
+    full = fake_arome.get_forecast(date=RUN, variables=["t2m"])["t2m"]
+    cropped = fake_arome.get_forecast(date=RUN, variables=["t2m"], bbox=(4.5, 10, 12, 20))["t2m"]
+
+    assert list(cropped.longitude.values) == [6, 8, 10, 12]
+    assert list(cropped.latitude.values) == [10, 12, 14, 16, 18, 20]
+    assert cropped.equals(full.sel(longitude=slice(4.5, 12), latitude=slice(10, 20)))
+
+
+def test_points_select_nearest_grid_points(fake_arome):
+    full = fake_arome.get_forecast(date=RUN, variables=["t2m"])["t2m"]
+    points = [(2.2, 47.9), (29.0, 0.4), (-10.0, 45.0)]
+    at_points = fake_arome.get_forecast(date=RUN, variables=["t2m"], points=points)["t2m"]
+
+    assert at_points.dims == ("time", "point")
+    assert list(at_points.longitude.values[:2]) == [2, 28]
+    assert (at_points.isel(point=0).values == full.sel(longitude=2, latitude=48).values).all()
+    assert at_points.isel(point=2).isnull().all()
+
+
+def test_extract_points_nearest_and_bilinear(fake_arome):
+    from meteofetch import extract_points
+
+    full = fake_arome.get_forecast(date=RUN, variables=["t2m", "msl"])
+    sites = [(2.2, 47.9), (3.0, 47.0), (-10.0, 45.0)]
+    nearest = extract_points(full, sites, names=["a", "b", "out"])
+    bilinear = extract_points(full["t2m"], sites, method="bilinear", names=["a", "b", "out"], as_dataframe=True)
+
+    t2m = full["t2m"]
+    assert nearest["t2m"].dims == ("time", "site")
+    assert nearest["t2m"].dtype == extract_points(t2m, sites[:2], method="bilinear").dtype == t2m.dtype
+    assert list(nearest["msl"].site.values) == ["a", "b", "out"]
+    assert (nearest["t2m"].sel(site="a").values == t2m.sel(longitude=2, latitude=48).values).all()
+    assert nearest["t2m"].sel(site="out").isnull().all()
+
+    corners = t2m.sel(longitude=[2, 4], latitude=[46, 48])
+    expected = 0.25 * corners.sum(["longitude", "latitude"])
+    assert bilinear.shape == (t2m.time.size, 3)
+    assert abs(bilinear["b"] - expected.to_pandas()).max() < 1e-3
+    assert bilinear.iloc[:, 2].isnull().all()
+
+
+@pytest.mark.parametrize("format, module", [("zarr", "zarr"), ("netcdf", "netCDF4")])
+def test_to_store_appends_each_valid_time(fake_arome, tmp_path, format, module):
+    pytest.importorskip(module)
+    full = fake_arome.get_forecast(date=RUN, variables=["t2m", "msl"])
+    store = fake_arome.to_store(
+        tmp_path / "store", format=format, compressor="zstd", date=RUN, variables=["t2m", "msl"]
+    )
+
+    for field in ("t2m", "msl"):
+        if format == "zarr":
+            stored = xr.open_zarr(store, group=field)[field]
+        else:
+            stored = xr.open_dataset(store / f"{field}.nc")[field]
+        assert stored.time.size == full[field].time.size
+        assert (stored.values == full[field].values).all()
+        assert (stored.time.values == full[field].time.values).all()
+
+
+def worker_pids(decode_pool):
+    return {process.pid for process in decode_pool.ensure_started()._pool}
+
+
+def test_decode_pool_is_reused_across_calls(fake_arome, fake_ifs, monkeypatch):
+    from meteofetch import DecodePool
+
+    expected = fake_arome.get_forecast(date=RUN, variables=["t2m"])
+    with DecodePool(processes=2) as decode_pool:
+        pids = worker_pids(decode_pool)
+        arome = fake_arome.get_forecast(date=RUN, variables=["t2m"])
+        ifs = fake_ifs.get_forecast(date=RUN, variables=["t2m"], pipeline=True)
+        assert worker_pids(decode_pool) <= pids
+
+        monkeypatch.setenv("ECCODES_DEFINITION_PATH", str(Path(meteofetch.__file__).parent / "gribdefs"))
+        assert not worker_pids(decode_pool) & pids
+
+    assert arome["t2m"].equals(expected["t2m"])
+    assert ifs["t2m"].time.size == len(fake_ifs.groups_)
+
+
+def test_decode_pool_follows_settings_of_the_parent(fake_arome, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from meteofetch import DecodePool
+
+    decode_pool = DecodePool(processes=2)
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            pools = list(executor.map(lambda _: decode_pool.ensure_started(), range(8)))
+        assert all(pool is pools[0] for pool in pools)
+
+        with decode_pool:
+            monkeypatch.setenv("METEOFETCH_TEST_MODE", "1")
+            masks = fake_arome.get_forecast(date=RUN, variables=["t2m"])
+        assert masks["t2m"].dtype == bool
+    finally:
+        decode_pool.close()
+
+
+def test_fields_are_transferred_through_shared_memory(fake_arome, monkeypatch):
+    from meteofetch import _transfer
+
+    pickled = fake_arome.get_forecast(date=RUN, variables=["t2m", "msl"])
+    before = set(_transfer.shared_dir().glob("meteofetch_*.npy"))
+    monkeypatch.setattr(_transfer, "MIN_SHARED_BYTES", 0)
+    shared = fake_arome.get_forecast(date=RUN, variables=["t2m", "msl"])
+
+    for field in ("t2m", "msl"):
+        assert shared[field].equals(pickled[field])
+        assert shared[field].attrs == pickled[field].attrs
+    assert set(_transfer.shared_dir().glob("meteofetch_*.npy")) == before
+
+
+def test_shared_memory_is_released_when_a_decode_fails(fake_arome, tmp_path, monkeypatch):
+    from meteofetch import _transfer
+
+    paths = fake_arome.get_forecast(date=RUN, path=str(tmp_path), return_data=False)
+    read_fields = fake_arome._read_fields.__func__
+
+    def failing(cls, path, *args, **kwargs):
+        if "__01H__" in str(path):
+            raise ValueError("corrupt file")
+        return read_fields(cls, path, *args, **kwargs)
+
+    before = set(_transfer.shared_dir().glob("meteofetch_*.npy"))
+    monkeypatch.setattr(_transfer, "MIN_SHARED_BYTES", 0)
+    monkeypatch.setattr(fake_arome, "_read_fields", classmethod(failing))
+    with pytest.raises(ValueError, match="corrupt"):
+        fake_arome.get_forecast(date=RUN, variables=["t2m", "msl"])
+    with pytest.raises(ValueError, match="corrupt"):
+        fake_arome._read_multiple_gribs(paths, variables=["t2m", "msl"], num_workers=2)
+    assert set(_transfer.shared_dir().glob("meteofetch_*.npy")) == before
+
+
+def test_eccodes_engine_matches_cfgrib(fake_arome, tmp_path):
+    import eccodes
+    import numpy as np
+
+    from meteofetch import set_grib_engine
+    from meteofetch._eccodes import open_datasets
+
+    def write(path, messages):
+        with open(path, "wb") as f:
+            for sample, keys in messages:
+                h = eccodes.codes_grib_new_from_samples(sample)
+                eccodes.codes_set_key_vals(h, keys)
+                values = np.arange(eccodes.codes_get(h, "numberOfPoints"), dtype=float) + keys.get("level", 0)
+                values += keys["step"]
+                values[0] = 9999
+                eccodes.codes_set(h, "bitmapPresent", 1)
+                eccodes.codes_set_values(h, values)
+                eccodes.codes_write(h, f)
+                eccodes.codes_release(h)
+
+    # Plusieurs variables, types de niveau, niveaux (dans le désordre) et échéances
+    path = tmp_path / "levels.grib2"
+    messages = []
+    for step in (0, 3, 1):
+        for short_name in ("t", "u"):
+            for level in (850, 500, 1000):
+                messages.append(("regular_ll_pl_grib2", {"shortName": short_name, "level": level, "step": step}))
+        for sample in ("regular_ll_sfc_grib2", "regular_gg_sfc_grib2"):
+            messages.append((sample, {"shortName": "2t" if "ll" in sample else "msl", "step": step}))
+    write(path, messages)
+    expected = fake_arome._read_grib(path, engine="cfgrib")
+    decoded = fake_arome._read_grib(path, engine="eccodes")
+    assert len(decoded) == len(expected) == 3
+    for ds, expected_ds in zip(decoded, expected):
+        assert ds.identical(expected_ds)
+    t = next(ds["t"] for ds in decoded if "t" in ds)
+    assert t.shape[:2] == (3, 3) and list(t.isobaricInhPa) == [1000, 850, 500]
+    assert t.isel(latitude=0, longitude=0).isnull().all()
+
+    # Grille non prise en charge : lecture par cfgrib
+    path = tmp_path / "reduced.grib2"
+    write(path, [("reduced_gg_sfc_grib2", {"shortName": "2t", "step": 0})])
+    assert open_datasets(path) is None
+    assert fake_arome._read_grib(path, engine="eccodes")[0].identical(fake_arome._read_grib(path, engine="cfgrib")[0])
+
+    cfgrib_fields = fake_arome.get_forecast(date=RUN)
+    set_grib_engine("eccodes")
+    eccodes_fields = fake_arome.get_forecast(date=RUN)
+    assert sorted(eccodes_fields) == sorted(cfgrib_fields)
+    for field, da in cfgrib_fields.items():
+        assert eccodes_fields[field].identical(da)
+
+
+def test_field_buffer_matches_concat():
+    import numpy as np
+    import pandas as pd
+
+    from meteofetch._buffer import FieldBuffer
+
+    def piece(i, n=1, longitude=(0, 1, 2)):
+        time = pd.date_range(RUN, periods=n, freq="h") + pd.Timedelta(hours=2 * i)
+        return xr.DataArray(
+            np.full((n, 2, len(longitude)), i, dtype=np.float32),
+            dims=("time", "latitude", "longitude"),
+            coords={"time": time, "step": ("time", time - RUN), "latitude": [0, 1], "longitude": list(longitude)},
+            attrs={"units": "K"},
+            name="t2m",
+        )
+
+    def assemble(pieces, capacity):
+        buffer = FieldBuffer(capacity)
+        for da in pieces:
+            buffer.append(da)
+        return buffer.result()
+
+    pieces = [piece(0), piece(1, n=2), piece(2)]
+    expected = xr.concat(pieces, dim="time", coords="minimal", compat="override")
+    assert assemble(pieces, capacity=4).identical(expected)
+    assert assemble(pieces, capacity=1).identical(expected)
+
+    pieces.append(piece(3, longitude=(0, 1, 3)))
+    expected = xr.concat(pieces, dim="time", coords="minimal", compat="override")
+    assert assemble(pieces, capacity=4).identical(expected)
+
+
+def test_common_process_matches_wrap_and_sortby():
+    import numpy as np
+
+    from meteofetch.meteofrance import _grid_order, common_process
+
+    def reference(ds):
+        ds["longitude"] = xr.where(ds["longitude"] <= 180.0, ds["longitude"], ds["longitude"] - 360.0, keep_attrs=True)
+        ds = ds.sortby("longitude").sortby("latitude")
+        ds.attrs["Packaged by"] = "meteofetch"
+        return ds
+
+    def field(longitude, latitude):
+        data = np.random.rand(2, len(latitude), len(longitude)).astype(np.float32)
+        coords = {"latitude": latitude, "longitude": ("longitude", longitude, {"units": "degrees_east"})}
+        return xr.DataArray(data, dims=("time", "latitude", "longitude"), coords=coords, name="t2m")
+
+    _grid_order.cache_clear()
+    for longitude, latitude in [(np.arange(0, 360, 30.0), [60.0, 30.0, 0.0]), (np.arange(-10, 20, 5.0), [0.0, 1.0])]:
+        for _ in range(2):
+            da = field(longitude, latitude)
+            assert common_process(da.copy()).identical(reference(da.copy()))
+    assert _grid_order.cache_info().hits == 2
+
+
+def test_dtype_and_packing(fake_arome, tmp_path):
+    pytest.importorskip("netCDF4")
+    full = fake_arome.get_forecast(date=RUN, variables=["t2m"])["t2m"]
+    half = fake_arome.get_forecast(date=RUN, variables=["t2m"], dtype="float16")["t2m"]
+    assert half.dtype == "float16"
+    assert (half.astype("float32") == full).all()
+
+    packed = fake_arome.get_forecast(date=RUN, variables=["t2m"], packing="int16")["t2m"]
+    encoding = packed.encoding
+    assert packed.dtype == full.dtype
+    assert encoding["dtype"] == "int16" and encoding["_FillValue"] == -32768
+    assert "packing" not in encoding
+
+    packed.to_netcdf(tmp_path / "t2m.nc")
+    with xr.open_dataset(tmp_path / "t2m.nc", mask_and_scale=False) as raw:
+        assert raw["t2m"].dtype == "int16"
+    with xr.open_dataset(tmp_path / "t2m.nc") as ds:
+        assert abs(ds["t2m"] - full).max() <= encoding["scale_factor"] / 2 + 1e-6
+
+
+@pytest.mark.parametrize("format, module", [("zarr", "zarr"), ("netcdf", "netCDF4")])
+def test_to_store_keeps_packing(fake_arome, tmp_path, format, module):
+    pytest.importorskip(module)
+    full = fake_arome.get_forecast(date=RUN, variables=["t2m"])["t2m"]
+    offsets = {
+        fields["t2m"].encoding["add_offset"]
+        for _, fields in fake_arome.iter_forecast(date=RUN, variables=["t2m"], packing="int16")
+    }
+    assert len(offsets) == 1
+
+    def open_store(store, **kwargs):
+        if format == "zarr":
+            return xr.open_zarr(store, group="t2m", **kwargs)["t2m"]
+        return xr.open_dataset(store / "t2m.nc", **kwargs)["t2m"]
+
+    store = fake_arome.to_store(tmp_path / "first", format=format, date=RUN, variables=["t2m"], packing="int16")
+    assert open_store(store, mask_and_scale=False).dtype == "int16"
+    # Échelle du premier fichier : les valeurs plus grandes des échéances suivantes sont écrêtées
+    stored = open_store(store)
+    assert float(stored.max()) <= float(full.isel(time=0).max()) + stored.encoding["scale_factor"]
+
+    store = fake_arome.to_store(
+        tmp_path / "range",
+        format=format,
+        date=RUN,
+        variables=["t2m"],
+        packing="int16",
+        packing_range={"t2m": (0, 1000)},
+    )
+    stored = open_store(store)
+    assert open_store(store, mask_and_scale=False).dtype == "int16"
+    assert stored.encoding["scale_factor"] == pytest.approx(1000 / 65534)
+    assert abs(stored - full).max() <= stored.encoding["scale_factor"] / 2 + 1e-6
+
+
+def test_fields_are_pickled_when_shared_memory_is_full(fake_arome, monkeypatch):
+    from meteofetch import _transfer
+
+    def full(path, values):
+        Path(path).write_bytes(b"\0" * 10)
+        raise OSError(28, "No space left on device")
+
+    expected = fake_arome.get_forecast(date=RUN, variables=["t2m"])
+    before = set(_transfer.shared_dir().glob("meteofetch_*.npy"))
+    monkeypatch.setattr(_transfer, "MIN_SHARED_BYTES", 0)
+    monkeypatch.setattr(_transfer.np, "save", full)
+    assert fake_arome.get_forecast(date=RUN, variables=["t2m"])["t2m"].equals(expected["t2m"])
+    assert set(_transfer.shared_dir().glob("meteofetch_*.npy")) == before